@@ -0,0 +1,23 @@
+import argparse
+import numpy as np
+
+
+def main(seed_id: int, num_iters: int = 20, size: int = 1024):
+    """CPU-bound 'training' job - repeated BLAS matrix multiplications."""
+    rng = np.random.default_rng(seed_id)
+    a = rng.standard_normal((size, size))
+    for _ in range(num_iters):
+        a = np.tanh(a @ a / size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multiply some matrices.")
+    parser.add_argument(
+        "-exp_dir", "--experiment_dir", type=str, default="experiments/"
+    )
+    parser.add_argument(
+        "-config", "--config_fname", type=str, default="base_config_1.yaml"
+    )
+    parser.add_argument("-seed", "--seed_id", type=int, default=1)
+    args = vars(parser.parse_args())
+    main(args["seed_id"])
@@ -0,0 +1,43 @@
+import os
+import time
+import shutil
+import logging
+from mle_scheduler import MLEQueue
+from mle_scheduler.local import LocalResourcePool
+
+
+def run_sweep(job_arguments: dict, num_seeds: int) -> float:
+    """Run a local sweep of matmul jobs & return its makespan in seconds."""
+    start_t = time.time()
+    queue = MLEQueue(
+        resource_to_run="local",
+        job_filename="matmul.py",
+        config_filenames=["base_config_1.yaml"],
+        random_seeds=list(range(num_seeds)),
+        experiment_dir="logs_pinning",
+        job_arguments=job_arguments,
+        max_running_jobs=num_seeds,
+        logger_level=logging.WARNING,
+        # Admit all jobs at once - compare thread/core contention only
+        resource_pool=LocalResourcePool(num_cores=num_seeds),
+    )
+    queue.run()
+    shutil.rmtree("logs_pinning", ignore_errors=True)
+    return time.time() - start_t
+
+
+def main():
+    # One seed per core - each job declares a single core
+    num_seeds = len(os.sched_getaffinity(0))
+    settings = {
+        "default BLAS threads": {"limit_threads": False},
+        "1 thread per job": {"num_logical_cores": 1},
+        "1 thread per job + pinning": {"num_logical_cores": 1, "pin_cpus": True},
+    }
+    for name, job_arguments in settings.items():
+        makespan = run_sweep(job_arguments, num_seeds)
+        print(f"{name:<28} - {num_seeds} jobs - makespan: {makespan:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
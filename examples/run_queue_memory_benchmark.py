@@ -0,0 +1,73 @@
+import os
+import time
+import logging
+import tracemalloc
+from mle_scheduler import MLEJob, MLEQueue
+
+
+def dict_queue(config_fname: str, random_seeds: list, experiment_dir: str):
+    """Queue entries as plain dicts (baseline layout before `QueueEntry`)."""
+    base_str = os.path.split(config_fname)[1].split(".")[0]
+    sub_experiment_dir = os.path.join(experiment_dir, base_str)
+    return [
+        {
+            "config_fname": config_fname,
+            "seed_id": seed_id,
+            "base_str": base_str,
+            "experiment_dir": sub_experiment_dir,
+            "log_dir": os.path.join(sub_experiment_dir, "/logs"),
+            "status": -1,
+            "job": None,
+            "job_id": None,
+            "merged_logs": False,
+        }
+        for seed_id in random_seeds
+    ]
+
+
+def measure(fn):
+    """Run `fn` & return its output, peak traced memory (MB) & runtime."""
+    tracemalloc.start()
+    start_t = time.time()
+    out = fn()
+    run_time = time.time() - start_t
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, peak / 1024**2, run_time
+
+
+def main(num_entries: int = 1_000_000, num_jobs: int = 1_000):
+    # 1. Memory of 1M queue entries - slot records vs. plain dicts
+    random_seeds = list(range(num_entries))
+    _, dict_mb, dict_t = measure(
+        lambda: dict_queue("base_config_1.yaml", random_seeds, "logs_memory")
+    )
+    queue, queue_mb, queue_t = measure(
+        lambda: MLEQueue(
+            resource_to_run="local",
+            job_filename="train.py",
+            config_filenames=["base_config_1.yaml"],
+            random_seeds=random_seeds,
+            experiment_dir="logs_memory",
+            logger_level=logging.WARNING,
+        )
+    )
+    print(f"dict entries  - {num_entries} jobs - {dict_mb:.1f}MB, {dict_t:.2f}s")
+    print(f"MLEQueue      - {num_entries} jobs - {queue_mb:.1f}MB, {queue_t:.2f}s")
+
+    # 2. Per-job construction cost - per-job vs. shared queue context
+    _, _, job_t = measure(
+        lambda: [
+            MLEJob("local", "train.py", {}, "base_config_1.yaml", "logs", i)
+            for i in range(num_jobs)
+        ]
+    )
+    _, _, shared_t = measure(
+        lambda: [queue.create_job(i) for i in range(num_jobs)]
+    )
+    print(f"MLEJob        - {1e6 * job_t / num_jobs:.0f}us per job")
+    print(f"queue context - {1e6 * shared_t / num_jobs:.0f}us per job")
+
+
+if __name__ == "__main__":
+    main()
@@ -41,5 +41,11 @@ if __name__ == "__main__":
         "-config", "--config_fname", type=str, default="base_config_1.yaml"
     )
     parser.add_argument("-seed", "--seed_id", type=int, default=1)
+    # Batch of seeds run by one process (MLEQueue `seeds_per_job`)
+    parser.add_argument("-seeds", "--seed_ids", type=str, default=None)
     args = vars(parser.parse_args())
-    main(args["experiment_dir"], args["config_fname"], args["seed_id"])
+    if args["seed_ids"] is not None:
+        for seed_id in args["seed_ids"].split(","):
+            main(args["experiment_dir"], args["config_fname"], int(seed_id))
+    else:
+        main(args["experiment_dir"], args["config_fname"], args["seed_id"])
@@ -1,10 +1,14 @@
 from ._version import __version__
 from .job import MLEJob
+from .job_handle import JobHandle
 from .job_queue import MLEQueue
+from .job_queue_async import AsyncMLEQueue
 
 
 __all__ = [
     "__version__",
     "MLEJob",
+    "JobHandle",
     "MLEQueue",
+    "AsyncMLEQueue",
 ]
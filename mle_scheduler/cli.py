@@ -0,0 +1,88 @@
+import os
+import json
+import logging
+import argparse
+from .daemon import MLEDaemon, DaemonClient
+from .daemon.server_daemon import detach
+
+
+def load_queue_spec(fname: str) -> dict:
+    """Load MLEQueue kwargs from .json or .yaml file."""
+    with open(fname) as f:
+        if os.path.splitext(fname)[1] in [".yaml", ".yml"]:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError(
+                    "You need to install `pyyaml` to submit .yaml queue files."
+                )
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mle-scheduler", description="Background MLEQueue scheduler daemon."
+    )
+    parser.add_argument(
+        "--socket", default=None, help="Unix socket path of the daemon."
+    )
+    commands = parser.add_subparsers(dest="command")
+    start = commands.add_parser("start", help="Start daemon in background.")
+    start.add_argument(
+        "--foreground", action="store_true", help="Don't detach from terminal."
+    )
+    start.add_argument("--log", default=None, help="Daemon log file.")
+    commands.add_parser("stop", help="Cancel running queues & stop daemon.")
+    submit = commands.add_parser("submit", help="Submit queue from .json/.yaml.")
+    submit.add_argument("spec", help="File with MLEQueue arguments.")
+    status = commands.add_parser("status", help="Status of queue(s).")
+    status.add_argument("queue_id", nargs="?", default=None)
+    cancel = commands.add_parser("cancel", help="Cancel queue.")
+    cancel.add_argument("queue_id")
+    tail = commands.add_parser("tail", help="Tail logs of a local job.")
+    tail.add_argument("queue_id")
+    tail.add_argument("--job", type=int, default=0, help="Index of job in queue.")
+    tail.add_argument("-n", type=int, default=20, help="Number of lines.")
+    return parser
+
+
+def main(argv=None) -> None:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return
+    client = DaemonClient(args.socket)
+    if args.command == "start":
+        try:
+            client.status()
+            print(f"Daemon is already running - {client.socket_path}")
+            return
+        except ConnectionError:
+            pass
+        print(f"Starting daemon - {client.socket_path}")
+        if not args.foreground:
+            log_fname = args.log or os.path.join(
+                os.path.dirname(client.socket_path), "daemon.log"
+            )
+            detach(log_fname)
+        logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(message)s")
+        MLEDaemon(client.socket_path).serve_forever()
+    elif args.command == "stop":
+        client.shutdown()
+    elif args.command == "submit":
+        print(client.submit(**load_queue_spec(args.spec)))
+    elif args.command == "status":
+        print(json.dumps(client.status(args.queue_id), indent=2))
+    elif args.command == "cancel":
+        print(json.dumps(client.cancel(args.queue_id), indent=2))
+    elif args.command == "tail":
+        logs = client.tail(args.queue_id, args.job, args.n)
+        print(logs["out"], end="")
+        if logs["err"]:
+            print(logs["err"], end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,15 @@
-from .gcp import submit_gcp, monitor_gcp, clean_up_gcp
+from .gcp import (
+    submit_gcp,
+    submit_gcp_batch,
+    monitor_gcp,
+    clean_up_gcp,
+    GCPStatusCache,
+)
 
-__all__ = ["submit_gcp", "monitor_gcp", "clean_up_gcp"]
+__all__ = [
+    "submit_gcp",
+    "submit_gcp_batch",
+    "monitor_gcp",
+    "clean_up_gcp",
+    "GCPStatusCache",
+]
@@ -1,10 +1,20 @@
-from .job_manage_gcp import submit_gcp, monitor_gcp, clean_up_gcp
+from .job_manage_gcp import (
+    submit_gcp,
+    submit_gcp_batch,
+    monitor_gcp,
+    clean_up_gcp,
+    gcp_phase_timings,
+)
+from .status_cache_gcp import GCPStatusCache
 from .file_manage_gcp import send_dir_gcp, copy_dir_gcp, delete_dir_gcp
 
 __all__ = [
     "submit_gcp",
+    "submit_gcp_batch",
     "monitor_gcp",
     "clean_up_gcp",
+    "gcp_phase_timings",
+    "GCPStatusCache",
     "send_dir_gcp",
     "copy_dir_gcp",
     "delete_dir_gcp",
@@ -0,0 +1,95 @@
+import os
+import json
+from typing import List, Union
+from ...local.async_local import run_cmd_async
+from .helpers_launch_gcp import (
+    gcp_get_list_cmd,
+    gcp_get_delete_cmd,
+    gcp_completion_marker_path,
+)
+from .job_manage_gcp import (
+    gcp_vm_name,
+    gcp_prepare_submission,
+    gcp_parse_marker_check,
+)
+from .status_cache_gcp import GCPStatusCache, gcp_parse_vm_list
+from .zones_gcp import zone_selector, gcp_candidate_zones, gcp_is_capacity_error
+
+
+async def submit_gcp_async(
+    filename: str,
+    cmd_line_arguments: str,
+    experiment_dir: str,
+    job_arguments: dict,
+    cloud_settings: dict,
+    status_cache: Union[GCPStatusCache, None] = None,
+) -> Union[str, int]:
+    """Create VM in first candidate zone with capacity (-1 on error)."""
+    vm_name = gcp_vm_name()
+    for zone in zone_selector.order(gcp_candidate_zones(job_arguments)):
+        job_arguments["zone"] = zone
+        gcp_launch_cmd, startup_fname = gcp_prepare_submission(
+            vm_name,
+            filename,
+            cmd_line_arguments,
+            experiment_dir,
+            job_arguments,
+            cloud_settings,
+            status_cache,
+        )
+        try:
+            returncode, _, err = await run_cmd_async(gcp_launch_cmd)
+        finally:
+            os.remove(startup_fname)
+        if returncode == 0:
+            zone_selector.record_success(zone)
+            if status_cache is not None:
+                status_cache.add_zone(zone, job_arguments["use_tpus"])
+            return vm_name
+        if not gcp_is_capacity_error(err):
+            print(err, returncode)
+            return -1
+        zone_selector.record_failure(zone)
+    return -1
+
+
+async def list_gcp_vms_async(
+    use_tpus: bool = False,
+    queue_id: Union[str, None] = None,
+    zones: Union[List[str], None] = None,
+) -> Union[dict, None]:
+    """Get dict of VM name -> status info (None if listing failed)."""
+    if not use_tpus or not zones:
+        zones = [None]
+    vms = []
+    for zone in zones:
+        returncode, out, err = await run_cmd_async(
+            gcp_get_list_cmd(use_tpus, queue_id, zone)
+        )
+        if returncode != 0:
+            print(err, returncode)
+            return None
+        vms += json.loads(out or b"[]")
+    return gcp_parse_vm_list(vms, use_tpus)
+
+
+async def check_completion_marker_async(
+    vm_name: str, cloud_settings: dict
+) -> Union[bool, None]:
+    """Check if VM wrote its completion marker (None if check failed)."""
+    marker_path = gcp_completion_marker_path(vm_name, cloud_settings)
+    try:
+        returncode, _, err = await run_cmd_async(["gsutil", "stat", marker_path])
+    except OSError as e:
+        print(e)
+        return None
+    return gcp_parse_marker_check(returncode, err)
+
+
+async def delete_gcp_vm_async(vm_name: str, job_arguments: dict) -> None:
+    """Quietly delete VM instance in its zone."""
+    await run_cmd_async(
+        gcp_get_delete_cmd(
+            vm_name, job_arguments.get("use_tpus", 0), job_arguments.get("zone")
+        )
+    )
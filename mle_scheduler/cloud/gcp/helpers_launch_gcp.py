@@ -4,15 +4,24 @@ from dotmap import DotMap
 from typing import Union, Tuple
 from .startup_script_gcp import (
     tmux_setup,
+    phase_timer,
     clone_gcp_bucket_dir,
+    download_code_dir,
     install_venv,
+    wait_for_install,
     install_additional_setup,
     jax_gpu_build,
     jax_tpu_build,
+    resume_env,
+    sync_results_from_dir,
     exec_python,
     exec_bash,
-    sync_results_from_dir,
+    final_sync_results,
+    report_timings,
+    completion_marker,
+    shutdown_vm,
 )
+from .machine_types_gcp import select_machine_type
 
 
 cores_to_machine_type = {
@@ -56,20 +65,40 @@ tpu_gcp_args = dict(
 
 
 def gcp_get_submission_cmd(
-    vm_name: str, job_args: DotMap, startup_fname: str
+    vm_name: str,
+    job_args: DotMap,
+    startup_fname: str,
+    labels: Union[dict, None] = None,
 ) -> Tuple[list, dict]:
     """Construct gcloud VM instance creation cmd to execute via cmd line."""
     if job_args["use_tpus"]:
-        job_gcp_args = tpu_gcp_args
+        job_gcp_args = dict(tpu_gcp_args)
     else:
-        job_gcp_args = base_gcp_args
-        # job_gcp_args.MACHINE_TYPE = cores_to_machine_type[
-        #                                 job_args.num_logical_cores]
+        job_gcp_args = dict(base_gcp_args)
         if job_args["num_gpus"] > 0:
             assert job_args["gpu_type"] in valid_gpu_types
             job_gcp_args["ACCELERATOR_TYPE"] = job_args["gpu_type"]
             job_gcp_args["ACCELERATOR_COUNT"] = job_args["num_gpus"]
 
+        # Pick machine type w. most completed jobs per dollar - 2 vCPUs
+        # per logical core. Choice is recorded in the job arguments.
+        if job_args.get("machine_type") is None:
+            num_cores = job_args["num_logical_cores"]
+            machine = select_machine_type(
+                2 * num_cores,
+                job_args.get("memory_per_job", 4096 + 2048 * num_cores),
+                # GPUs can only be attached to N1 machines
+                ["n1"]
+                if job_args["num_gpus"] > 0
+                else job_args.get("machine_families"),
+            )
+            job_args["machine_type"] = machine["name"]
+        job_gcp_args["MACHINE_TYPE"] = job_args["machine_type"]
+
+    # Zone chosen from list of candidate zones (default zone otherwise)
+    if job_args.get("zone") is not None:
+        job_gcp_args["ZONE"] = job_args["zone"]
+
     if job_args["use_tpus"]:
         # TPU VM Alpha gcloud create CMD
         gcp_launch_cmd = [
@@ -99,9 +128,7 @@ def gcp_get_submission_cmd(
             f"{vm_name}",
             "--preemptible",
             f"--zone={job_gcp_args['ZONE']}",
-            f"--custom-cpu={2*job_args['num_logical_cores']}",
-            f"--custom-memory={4096 + 2048*job_args['num_logical_cores']}MB",
-            "--custom-vm-type=n1",
+            f"--machine-type={job_gcp_args['MACHINE_TYPE']}",
             f"--image={job_gcp_args['IMAGE_NAME']}",
             f"--image-project={job_gcp_args['IMAGE_PROJECT']}",
             f"--metadata-from-file=startup-script={startup_fname}",
@@ -125,9 +152,41 @@ def gcp_get_submission_cmd(
                 f"count={job_gcp_args['ACCELERATOR_COUNT']}",
             ]
 
+    # Label VMs (e.g. with queue id) to allow for filtered status listing
+    if labels is not None:
+        gcp_launch_cmd.append(
+            "--labels=" + ",".join(f"{k}={v}" for k, v in labels.items())
+        )
     return gcp_launch_cmd, job_gcp_args
 
 
+def gcp_get_list_cmd(
+    use_tpus: bool = False,
+    queue_id: Union[str, None] = None,
+    zone: Union[str, None] = None,
+) -> list:
+    """Construct gcloud JSON listing cmd (optionally filtered by queue)."""
+    if use_tpus:
+        # TPU VMs can only be listed per zone
+        if zone is None:
+            zone = tpu_gcp_args["ZONE"]
+        list_cmd = [
+            "gcloud",
+            "alpha",
+            "compute",
+            "tpus",
+            "tpu-vm",
+            "list",
+            f"--zone={zone}",
+        ]
+    else:
+        list_cmd = ["gcloud", "compute", "instances", "list"]
+    if queue_id is not None:
+        list_cmd.append(f"--filter=labels.mle_queue={queue_id}")
+    list_cmd += ["--format=json", "--verbosity", "critical"]
+    return list_cmd
+
+
 def gcp_generate_startup_file(
     remote_code_dir: str,
     gcp_bucket_name: str,
@@ -138,32 +197,60 @@ def gcp_generate_startup_file(
     extra_install_fname: Union[None, str],
     use_tpus: bool = False,
     use_cuda: bool = False,
+    marker_path: Union[str, None] = None,
+    num_preemptions: int = 0,
+    timings_path: Union[str, None] = None,
 ) -> None:
     """Generate bash script template to launch at VM startup."""
     # Build the start job execution script
     # 1. Connecting to tmux via: gcloud compute ssh $VM -- /sudo_tmux_a.sh
-    # 2a. Launch venv & install dependencies from requirements.txt
+    # 2a. Launch venv & install requirements.txt while downloading code
     # 2b. [OPTIONAL] Setup JAX TPU/GPU build
-    # 3. Separate tmux split for rsync of results to GCS bucket
+    # 3. Background rsync of results to GCS bucket started with job
+    # 4. Final sync, report timings & marker - shut down directly after
+    if use_tpus:
+        # Install TPU version JAX
+        accelerator_build = jax_tpu_build
+    elif use_cuda:
+        # Install GPU version JAX
+        accelerator_build = jax_gpu_build
+    else:
+        accelerator_build = ""
+
     startup_script_content = (
         "#!/bin/bash"
         + tmux_setup
+        + phase_timer
         + clone_gcp_bucket_dir.format(
             remote_dir=remote_code_dir, gcp_bucket_name=gcp_bucket_name
         )
-        + install_venv.format(remote_dir=remote_code_dir)
+        + install_venv.format(
+            remote_dir=remote_code_dir, accelerator_build=accelerator_build
+        )
+        + download_code_dir.format(
+            remote_dir=remote_code_dir, gcp_bucket_name=gcp_bucket_name
+        )
+        + wait_for_install
     )
 
     if extra_install_fname is not None:
         # Bash execute .sh file for additional requirements (if specified)
-        startup_script_content += install_additional_setup.format(extra_install_fname)
+        startup_script_content += install_additional_setup.format(
+            remote_dir=remote_code_dir, extra_install_fname=extra_install_fname
+        )
 
-    if use_tpus:
-        # Install TPU version JAX
-        startup_script_content += jax_tpu_build
-    elif use_cuda:
-        # Install GPU version JAX
-        startup_script_content += jax_gpu_build
+    # Resubmission after preemption - export resume info for job
+    if num_preemptions > 0:
+        startup_script_content += resume_env.format(
+            num_preemptions=num_preemptions
+        )
+
+    # Start syncing results together with job execution
+    startup_script_content += sync_results_from_dir.format(
+        remote_code_dir=remote_code_dir,
+        gcp_bucket_name=gcp_bucket_name,
+        experiment_dir=experiment_dir,
+    )
 
     # Write the desired python/bash execution to slurm job submission file
     f_name, f_extension = os.path.splitext(job_filename)
@@ -186,20 +273,53 @@ def gcp_generate_startup_file(
             " are so far implemented. Please open an issue."
         )
 
-    startup_script_content += sync_results_from_dir.format(
-        remote_code_dir=remote_code_dir,
-        gcp_bucket_name=gcp_bucket_name,
-        experiment_dir=experiment_dir,
-    )
+    startup_script_content += final_sync_results
+
+    # Report phase timings & store exit code in GCS bucket before shutdown
+    if timings_path is not None:
+        startup_script_content += report_timings.format(
+            timings_path=timings_path
+        )
+    if marker_path is not None:
+        startup_script_content += completion_marker.format(
+            marker_path=marker_path
+        )
+    startup_script_content += shutdown_vm
 
     # Write startup script to physical file
     with open(startup_fname, "w", encoding="utf8") as f:
         f.write(startup_script_content)
 
 
-def gcp_delete_vm_instance(vm_name: str, use_tpus: bool = False) -> None:
+def gcp_completion_marker_path(vm_name: str, cloud_settings: dict) -> str:
+    """GCS path of marker file which the VM writes once its job finished."""
+    return (
+        f"gs://{cloud_settings['bucket_name']}/"
+        f"{cloud_settings['remote_dir']}/.mle_status/{vm_name}.done"
+    )
+
+
+def gcp_timings_path(vm_name: str, cloud_settings: dict) -> str:
+    """GCS path of startup phase timings reported by the VM."""
+    return (
+        f"gs://{cloud_settings['bucket_name']}/"
+        f"{cloud_settings['remote_dir']}/.mle_status/{vm_name}.timings"
+    )
+
+
+def gcp_delete_vm_instance(
+    vm_name: str, use_tpus: bool = False, vm_zone: Union[str, None] = None
+) -> None:
     """Quitely delete job by its name + zone. TODO: Add robustness check."""
-    vm_zone = "europe-west4-a" if use_tpus else "us-west1-a"
+    sp.run(gcp_get_delete_cmd(vm_name, use_tpus, vm_zone))
+
+
+def gcp_get_delete_cmd(
+    vm_name: str, use_tpus: bool = False, vm_zone: Union[str, None] = None
+) -> list:
+    """Construct quiet gcloud VM/TPU deletion cmd."""
+    if vm_zone is None:
+        vm_zone = tpu_gcp_args["ZONE"] if use_tpus else base_gcp_args["ZONE"]
     if not use_tpus:
         gcp_delete_cmd = [
             "gcloud",
@@ -230,4 +350,4 @@ def gcp_delete_vm_instance(vm_name: str, use_tpus: bool = False) -> None:
             "--verbosity",
             "error",
         ]
-    sp.run(gcp_delete_cmd)
+    return gcp_delete_cmd
@@ -4,22 +4,36 @@ import datetime
 import os
 import random
 import re
+from typing import List, Union
 from .helpers_launch_gcp import (
     gcp_generate_startup_file,
     gcp_get_submission_cmd,
     gcp_delete_vm_instance,
+    gcp_completion_marker_path,
+    gcp_timings_path,
 )
+from .status_cache_gcp import GCPStatusCache, gcp_list_vms
+from .zones_gcp import zone_selector, gcp_candidate_zones, gcp_is_capacity_error
 
 
-def submit_gcp(
+def gcp_vm_name() -> str:
+    """Create VM Name - Timestamp + Random 4 digit id."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    random_str = str(random.randrange(1000, 9999))
+    vm_name = "-".join(["mle", timestamp, random_str])
+    return re.sub(r"[^a-z0-9-]", "-", vm_name)
+
+
+def gcp_prepare_submission(
+    vm_name: str,
     filename: str,
     cmd_line_arguments: str,
     experiment_dir: str,
     job_arguments: dict,
-    debug_mode: bool,
     cloud_settings: dict,
+    status_cache: Union[GCPStatusCache, None] = None,
 ):
-    """Create a GCP VM job & submit it based on provided file to execute."""
+    """Write startup file & construct VM creation cmd for a single job."""
     if "job_name" not in job_arguments:
         job_arguments["job_name"] = "job"
 
@@ -29,13 +43,7 @@ def submit_gcp(
     if "num_gpus" not in job_arguments:
         job_arguments["num_gpus"] = 0
 
-    # 0. Create VM Name - Timestamp + Random 4 digit id
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    random_str = str(random.randrange(1000, 9999))
-    vm_name = "-".join(["mle", timestamp, random_str])
-    vm_name = re.sub(r"[^a-z0-9-]", "-", vm_name)
-
-    # 1. Generate GCP startup file with provided arguments
+    # Generate GCP startup file with provided arguments
     startup_fname = vm_name + "-startup.sh"
     if "extra_install_fname" in job_arguments:
         extra_install_fname = job_arguments["extra_install_fname"]
@@ -52,84 +60,308 @@ def submit_gcp(
         extra_install_fname,
         job_arguments["use_tpus"],
         job_arguments["num_gpus"] > 0,
+        gcp_completion_marker_path(vm_name, cloud_settings),
+        job_arguments.get("num_preemptions", 0),
+        gcp_timings_path(vm_name, cloud_settings),
     )
 
-    # 2. Generate GCP submission command (`gcloud compute instance create ...`)
+    # Generate GCP submission command (`gcloud compute instance create ...`)
+    labels = None if status_cache is None else status_cache.labels
     gcp_launch_cmd, job_gcp_args = gcp_get_submission_cmd(
-        vm_name, job_arguments, startup_fname
+        vm_name, job_arguments, startup_fname, labels
     )
+    return gcp_launch_cmd, startup_fname
 
-    if debug_mode:
-        gcp_launch_cmd += " 2>>err.err 1>>log.txt"
-
-    # 3. Launch GCP VM Instance - Everything handled by startup file
-    sp.run(gcp_launch_cmd)
-
-    # 4. Wait until job is listed as running (ca. 2 minute!)
-    while True:
-        try:
-            job_running = monitor_gcp(vm_name, job_arguments)
-            if job_running == 1:
-                # Delete statup bash file
-                try:
-                    os.remove(startup_fname)
-                except Exception:
-                    pass
-                return vm_name
-            time.sleep(10)
-        except sp.CalledProcessError as e:
-            stderr = e.stderr
-            return_code = e.returncode
-            print(stderr, return_code)
-            time.sleep(2)
-
-    # Return -1 if job was not listed as starting/running within 100 seconds!
-    return -1
 
-
-def monitor_gcp(vm_name: str, job_arguments: dict):
-    """Monitor status of job based on vm_name. Requires stable connection."""
-    # Check VM status from command line
-    while True:
-        try:
-            check_cmd = (
-                [
-                    "gcloud",
-                    "alpha",
-                    "compute",
-                    "tpus",
-                    "--zone",
-                    "europe-west4-a",
-                    "--verbosity",
-                    "critical",
-                ]
-                if job_arguments["use_tpus"]
-                else [
-                    "gcloud",
-                    "compute",
-                    "instances",
-                    "list",
-                    "--verbosity",
-                    "critical",
-                ]
+def gcp_create_vms(
+    vm_names: List[str],
+    filenames: List[str],
+    cmd_line_arguments: List[str],
+    experiment_dir: str,
+    job_arguments: List[dict],
+    cloud_settings: dict,
+    status_cache: Union[GCPStatusCache, None] = None,
+) -> List[Union[str, int]]:
+    """
+    Concurrently create VMs w. fallback to next candidate zone on capacity
+    or quota errors. Chosen zone is stored in `job_arguments[i]["zone"]`.
+    """
+    # Order candidate zones of each job - recently successful zones first
+    zones_to_try = [
+        zone_selector.order(gcp_candidate_zones(job_args))
+        for job_args in job_arguments
+    ]
+    job_ids = [-1] * len(vm_names)
+    pending = list(range(len(vm_names)))
+    while len(pending) > 0:
+        # 1. Generate startup files & fire off all creation cmds at once
+        procs, startup_fnames = {}, []
+        for i in pending:
+            job_arguments[i]["zone"] = zones_to_try[i].pop(0)
+            gcp_launch_cmd, startup_fname = gcp_prepare_submission(
+                vm_names[i],
+                filenames[i],
+                cmd_line_arguments[i],
+                experiment_dir,
+                job_arguments[i],
+                cloud_settings,
+                status_cache,
             )
-            out = sp.check_output(check_cmd)
+            startup_fnames.append(startup_fname)
+            procs[i] = sp.Popen(gcp_launch_cmd, stderr=sp.PIPE)
+
+        # 2. Collect creation results - retry capacity errors in next zone
+        pending = []
+        for i, proc in procs.items():
+            _, err = proc.communicate()
+            zone = job_arguments[i]["zone"]
+            if proc.returncode == 0:
+                zone_selector.record_success(zone)
+                if status_cache is not None:
+                    status_cache.add_zone(zone, job_arguments[i]["use_tpus"])
+                job_ids[i] = vm_names[i]
+            elif gcp_is_capacity_error(err) and len(zones_to_try[i]) > 0:
+                zone_selector.record_failure(zone)
+                pending.append(i)
+            else:
+                if gcp_is_capacity_error(err):
+                    zone_selector.record_failure(zone)
+                print(err, proc.returncode)
+
+        # Delete statup bash files
+        for startup_fname in startup_fnames:
+            try:
+                os.remove(startup_fname)
+            except Exception:
+                pass
+    return job_ids
+
+
+def submit_gcp(
+    filename: str,
+    cmd_line_arguments: str,
+    experiment_dir: str,
+    job_arguments: dict,
+    cloud_settings: dict,
+    status_cache: Union[GCPStatusCache, None] = None,
+    check_interval: float = 10,
+    running_timeout: float = 900,
+    wait_running: bool = True,
+):
+    """Create a GCP VM job & submit it based on provided file to execute."""
+    # 0. Create VM Name - Timestamp + Random 4 digit id
+    vm_name = gcp_vm_name()
+
+    # 1. Generate GCP startup file & launch GCP VM Instance in first zone
+    # with free capacity - Everything else handled by startup file
+    job_id = gcp_create_vms(
+        [vm_name],
+        [filename],
+        [cmd_line_arguments],
+        experiment_dir,
+        [job_arguments],
+        cloud_settings,
+        status_cache,
+    )[0]
+    if job_id == -1 or not wait_running:
+        return job_id
+
+    # 2. Wait until job is listed as running (ca. 2 minute!)
+    return gcp_wait_running(
+        [vm_name],
+        [job_arguments],
+        cloud_settings,
+        status_cache,
+        check_interval,
+        running_timeout,
+    )[0]
+
+
+def submit_gcp_batch(
+    filenames: List[str],
+    cmd_line_arguments: List[str],
+    experiment_dir: str,
+    job_arguments: List[dict],
+    cloud_settings: dict,
+    status_cache: Union[GCPStatusCache, None] = None,
+    check_interval: float = 10,
+    running_timeout: float = 900,
+) -> List[Union[str, int]]:
+    """Create a wave of GCP VM jobs concurrently & wait for them together."""
+    # 0. Create unique VM names for all jobs in the wave
+    vm_names = []
+    while len(vm_names) < len(filenames):
+        vm_name = gcp_vm_name()
+        if vm_name not in vm_names:
+            vm_names.append(vm_name)
+
+    # 1. Generate all startup files & fire off all creation cmds at once
+    # Failed creations (in all candidate zones) are marked with -1
+    job_ids = gcp_create_vms(
+        vm_names,
+        filenames,
+        cmd_line_arguments,
+        experiment_dir,
+        job_arguments,
+        cloud_settings,
+        status_cache,
+    )
+
+    # 2. Wait until all VMs are listed as running - one list call per tick
+    return gcp_wait_running(
+        job_ids,
+        job_arguments,
+        cloud_settings,
+        status_cache,
+        check_interval,
+        running_timeout,
+    )
+
+
+def gcp_wait_running(
+    job_ids: List[Union[str, int]],
+    job_arguments: List[dict],
+    cloud_settings: dict,
+    status_cache: Union[GCPStatusCache, None] = None,
+    check_interval: float = 10,
+    running_timeout: float = 900,
+) -> List[Union[str, int]]:
+    """
+    Wait until created VMs are listed as staging/running (one listing call
+    per tick). VMs which are not listed before `running_timeout` secs are
+    kept if their job already finished & deleted otherwise (job id -1).
+    """
+    job_ids = list(job_ids)
+    deadline = time.time() + running_timeout
+    waiting = [i for i in range(len(job_ids)) if job_ids[i] != -1]
+    while len(waiting) > 0:
+        if time.time() >= deadline:
+            for i in waiting:
+                job_ids[i] = gcp_resolve_unlisted_vm(
+                    job_ids[i], job_arguments[i], cloud_settings
+                )
             break
-        except sp.CalledProcessError as e:
-            stderr = e.stderr
-            return_code = e.returncode
-            print(stderr, return_code)
-            time.sleep(1)
-
-    # Clean up and check if vm_name is in list of all jobs
-    job_info = out.split(b"\n")[1:-1]
-    running_job_names = []
-    for i in range(len(job_info)):
-        decoded_job_info = job_info[i].decode("utf-8").split()
-        if decoded_job_info[-1] in ["STAGING", "RUNNING"]:
-            running_job_names.append(decoded_job_info[0])
-    job_status = vm_name in running_job_names
-    return job_status
+        running = set()
+        for use_tpus in set(job_arguments[i]["use_tpus"] for i in waiting):
+            # List VMs/TPUs only in zones of this group's waiting jobs
+            group = [i for i in waiting if job_arguments[i]["use_tpus"] == use_tpus]
+            zones = list(set(job_arguments[i]["zone"] for i in group))
+            running.update(
+                gcp_running_vm_names(
+                    use_tpus, status_cache, force_refresh=True, zones=zones
+                )
+            )
+        waiting = [i for i in waiting if job_ids[i] not in running]
+        if len(waiting) > 0:
+            time.sleep(check_interval)
+    return job_ids
+
+
+def gcp_resolve_unlisted_vm(
+    vm_name: str, job_arguments: dict, cloud_settings: dict
+) -> Union[str, int]:
+    """VM never listed as running (e.g. preempted in staging/early exit)."""
+    # Job finished before it was seen (or marker state unknown) - monitor
+    # reports it as done or preempted once the bucket can be checked
+    if gcp_check_completion_marker(vm_name, cloud_settings) is not False:
+        return vm_name
+    print(f"VM {vm_name} not running before timeout - deleting it")
+    gcp_delete_vm_instance(
+        vm_name, job_arguments["use_tpus"], job_arguments.get("zone")
+    )
+    return -1
+
+
+def gcp_running_vm_names(
+    use_tpus: bool = False,
+    status_cache: Union[GCPStatusCache, None] = None,
+    force_refresh: bool = False,
+    zones: Union[List[str], None] = None,
+) -> List[str]:
+    """Get names of all VMs/TPUs listed as staging/running in one call."""
+    if status_cache is not None:
+        vm_info = status_cache.refresh(use_tpus, force=force_refresh)
+    else:
+        vm_info = gcp_list_vms(use_tpus, zones=zones)
+    return [name for name, info in vm_info.items() if info["running"]]
+
+
+def monitor_gcp(
+    vm_name: str,
+    job_arguments: dict,
+    status_cache: Union[GCPStatusCache, None] = None,
+    cloud_settings: Union[dict, None] = None,
+):
+    """
+    Monitor status of job based on vm_name. Requires stable connection.
+    Returns 1 if running, 0 if finished & 2 if the VM was preempted. The
+    latter is only detected if `cloud_settings` (bucket info) are provided.
+    """
+    # Serve lookup from queue-level cache (one listing call per tick)
+    if status_cache is not None:
+        job_status = status_cache.is_running(
+            vm_name, job_arguments["use_tpus"]
+        )
+    else:
+        # Check if vm_name is in list of all jobs
+        running_job_names = gcp_running_vm_names(
+            job_arguments["use_tpus"], zones=[job_arguments.get("zone")]
+        )
+        job_status = vm_name in running_job_names
+
+    # VM is gone/stopped - preempted if job did not write completion marker
+    if not job_status and cloud_settings is not None:
+        finished = gcp_check_completion_marker(vm_name, cloud_settings)
+        if finished is None:
+            # Marker state unknown (e.g. auth/network error) - check again
+            return 1
+        if not finished:
+            return 2
+    return int(job_status)
+
+
+def gcp_check_completion_marker(
+    vm_name: str, cloud_settings: dict
+) -> Union[bool, None]:
+    """
+    Check if VM wrote its completion marker to the GCS bucket. Returns None
+    if the bucket could not be checked (only a missing object is False).
+    """
+    marker_path = gcp_completion_marker_path(vm_name, cloud_settings)
+    try:
+        out = sp.run(["gsutil", "stat", marker_path], stdout=sp.DEVNULL, stderr=sp.PIPE)
+    except OSError as e:
+        print(e)
+        return None
+    return gcp_parse_marker_check(out.returncode, out.stderr)
+
+
+def gcp_parse_marker_check(returncode: int, stderr: bytes) -> Union[bool, None]:
+    """Completion marker exists, is missing or state is unknown (None)."""
+    if returncode == 0:
+        return True
+    if b"No URLs matched" in (stderr or b""):
+        return False
+    print(stderr, returncode)
+    return None
+
+
+def gcp_phase_timings(vm_name: str, cloud_settings: dict) -> dict:
+    """Get durations of VM startup phases (secs since previous phase)."""
+    out = sp.run(
+        ["gsutil", "cat", gcp_timings_path(vm_name, cloud_settings)],
+        stdout=sp.PIPE,
+        stderr=sp.DEVNULL,
+    )
+    if out.returncode != 0:
+        return {}
+    phase_timings, prev_time = {}, None
+    for line in out.stdout.decode("utf-8").splitlines():
+        phase, timestamp = line.split()
+        if prev_time is not None:
+            phase_timings[phase] = float(timestamp) - prev_time
+        prev_time = float(timestamp)
+    return phase_timings
 
 
 def clean_up_gcp(
@@ -140,4 +372,6 @@ def clean_up_gcp(
 ):
     """Delete VM instance and code GCS directory."""
     # Delete GCP Job after it terminated (avoid storage billing)
-    gcp_delete_vm_instance(vm_name, job_arguments["use_tpus"])
+    gcp_delete_vm_instance(
+        vm_name, job_arguments["use_tpus"], job_arguments.get("zone")
+    )
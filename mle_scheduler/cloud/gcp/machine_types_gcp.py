@@ -0,0 +1,134 @@
+from typing import List, Union
+
+
+# Preemptible on-demand prices (USD per hour, us-west1 snapshot) per vCPU &
+# GB memory & relative per-vCPU throughput of the machine families. Custom
+# machine types come with a price premium. Update to match your region!
+machine_price_table = {
+    "n1": {"vcpu": 0.00698, "memory_gb": 0.00094, "perf": 1.0},
+    "n2": {"vcpu": 0.00765, "memory_gb": 0.00103, "perf": 1.2},
+    "e2": {"vcpu": 0.00670, "memory_gb": 0.00090, "perf": 1.0},
+    "c2": {"vcpu": 0.00835, "memory_gb": 0.00112, "perf": 1.4},
+}
+custom_price_premium = 1.05
+
+# Predefined machine types: family -> series -> (GB per vCPU, vCPU sizes)
+predefined_machine_types = {
+    "n1": {
+        "standard": (3.75, [1, 2, 4, 8, 16, 32, 64, 96]),
+        "highcpu": (0.9, [2, 4, 8, 16, 32, 64, 96]),
+        "highmem": (6.5, [2, 4, 8, 16, 32, 64, 96]),
+    },
+    "n2": {
+        "standard": (4, [2, 4, 8, 16, 32, 48, 64, 80, 96, 128]),
+        "highcpu": (1, [2, 4, 8, 16, 32, 48, 64, 80, 96]),
+        "highmem": (8, [2, 4, 8, 16, 32, 48, 64, 80, 96, 128]),
+    },
+    "e2": {
+        "standard": (4, [2, 4, 8, 16, 32]),
+        "highcpu": (1, [2, 4, 8, 16, 32]),
+        "highmem": (8, [2, 4, 8, 16]),
+    },
+    "c2": {
+        "standard": (4, [4, 8, 16, 30, 60]),
+    },
+}
+
+# Custom machine types: family -> (max vCPUs, min/max GB per vCPU)
+custom_machine_limits = {
+    "n1": (96, 0.9, 6.5),
+    "n2": (80, 0.5, 8),
+    "e2": (32, 0.5, 8),
+}
+
+
+def machine_price(family: str, vcpus: int, memory_gb: float, custom: bool):
+    """Hourly price of a machine type based on the price table."""
+    prices = machine_price_table[family]
+    price = vcpus * prices["vcpu"] + memory_gb * prices["memory_gb"]
+    if custom:
+        price *= custom_price_premium
+    return price
+
+
+def custom_machine_name(family: str, vcpus: int, memory_mb: int) -> str:
+    """Custom machine type name accepted by `--machine-type`."""
+    if family == "n1":
+        return f"custom-{vcpus}-{memory_mb}"
+    return f"{family}-custom-{vcpus}-{memory_mb}"
+
+
+def candidate_machine_types(
+    num_vcpus: int, memory_mb: int, families: List[str]
+) -> List[dict]:
+    """Collect all predefined & custom types which fit the requirements."""
+    memory_gb = memory_mb / 1024
+    candidates = []
+    for family in families:
+        for series, (gb_per_vcpu, sizes) in predefined_machine_types.get(
+            family, {}
+        ).items():
+            for vcpus in sizes:
+                if vcpus >= num_vcpus and vcpus * gb_per_vcpu >= memory_gb:
+                    candidates.append(
+                        {
+                            "name": f"{family}-{series}-{vcpus}",
+                            "family": family,
+                            "custom": False,
+                            "vcpus": vcpus,
+                            "memory_mb": int(vcpus * gb_per_vcpu * 1024),
+                        }
+                    )
+                    break
+
+        if family in custom_machine_limits:
+            max_vcpus, min_gb, max_gb = custom_machine_limits[family]
+            # Custom vCPUs: 1 or even number (n1) & multiples of 2 otherwise
+            if family == "n1" and num_vcpus == 1:
+                vcpus = 1
+            else:
+                vcpus = num_vcpus + num_vcpus % 2
+            # Memory in multiples of 256MB within per-vCPU bounds
+            custom_mb = max(memory_mb, int(min_gb * vcpus * 1024))
+            custom_mb = -(-custom_mb // 256) * 256
+            if vcpus <= max_vcpus and custom_mb <= max_gb * vcpus * 1024:
+                candidates.append(
+                    {
+                        "name": custom_machine_name(family, vcpus, custom_mb),
+                        "family": family,
+                        "custom": True,
+                        "vcpus": vcpus,
+                        "memory_mb": custom_mb,
+                    }
+                )
+    return candidates
+
+
+def select_machine_type(
+    num_vcpus: int,
+    memory_mb: int,
+    families: Union[List[str], None] = None,
+) -> dict:
+    """
+    Select machine type which maximizes completed jobs per dollar, i.e. the
+    family's relative throughput per hourly price. Ties go to fewer vCPUs.
+    """
+    if families is None:
+        families = list(machine_price_table.keys())
+    candidates = candidate_machine_types(num_vcpus, memory_mb, families)
+    if len(candidates) == 0:
+        raise ValueError(
+            f"No GCP machine type in {families} provides {num_vcpus} vCPUs"
+            f" & {memory_mb}MB memory."
+        )
+    for machine in candidates:
+        machine["price"] = machine_price(
+            machine["family"],
+            machine["vcpus"],
+            machine["memory_mb"] / 1024,
+            machine["custom"],
+        )
+        machine["jobs_per_dollar"] = (
+            machine_price_table[machine["family"]]["perf"] / machine["price"]
+        )
+    return max(candidates, key=lambda m: (m["jobs_per_dollar"], -m["vcpus"]))
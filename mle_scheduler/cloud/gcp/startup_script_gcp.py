@@ -1,18 +1,13 @@
 # Useful string lego building blocks for GCP startup file formatting
-#   1. Copy code directory from GCS bucket
-#   2. Setting up tmux session (a) htop (b) startup exec (c) GCS rsync results
+#   1. Phase timer - timestamps of startup phases are reported to GCS bucket
+#   2. Copy code directory from GCS bucket while installing requirements
 #   3. Installation of venv, requirements and jaxlib accelerator dependencies
-#   4. Python Base Job File Execution
-#   5. Sync Results with GCS bucket
+#   4. Incremental upload of results to GCS bucket - starts with the job
+#   5. Python/Bash Base Job File Execution
+#   6. Final sync, write completion marker to GCS bucket & shut down directly
 
 # Inspired by the flax GCP example: https://github.com/google/flax/tree/main/examples/cloud
 
-clone_gcp_bucket_dir = """
-mkdir {remote_dir}
-sudo chmod 777 {remote_dir}
-gsutil cp -r gs://{gcp_bucket_name}/{remote_dir} .
-"""
-
 tmux_setup = """
 # Login directly with:
 # gcloud compute ssh $VM -- sudo_tmux_a.sh
@@ -22,82 +17,156 @@ echo -e '#!/bin/bash\ntmux a' > tmux_a.sh
 chmod a+x /tmux_a.sh
 """
 
-install_venv = """# Setup virtual env + install base required packages
-tmux new-session -s gcp_exp -d htop ENTER
-tmux split-window
-tmux send "
+phase_timer = """
+# Record unix timestamps of startup phases (reported to GCS bucket at exit)
+MLE_TIMINGS=/mle_phase_timings.txt
+mle_phase() {
+    echo "$1 $(date +%s.%N)" >> $MLE_TIMINGS
+}
+mle_phase boot
+"""
+
+clone_gcp_bucket_dir = """
+mkdir {remote_dir}
+sudo chmod 777 {remote_dir}
+# Fetch requirements first - dependency install overlaps with code download
+gsutil -q cp gs://{gcp_bucket_name}/{remote_dir}/requirements.txt {remote_dir}/ || true
+"""
+
+download_code_dir = """
+gsutil -m -q cp -r gs://{gcp_bucket_name}/{remote_dir} .
+mle_phase code_downloaded
+"""
+
+install_venv = """# Setup virtual env + install base required packages (in background)
+(
     set -x
-    [ -d gcp_exp ] || (
     cd {remote_dir}
     python3 -m pip install virtualenv
     python3 -m virtualenv env
     . env/bin/activate
     pip install -U pip
-    pip install -r requirements.txt
-    ) 2>&1 | tee -a log_startup.txt
-"
+    [ -f requirements.txt ] && pip install -r requirements.txt
+    # File events trigger result uploads (falls back to polling w/o them)
+    command -v inotifywait || sudo apt-get -qq install -y inotify-tools
+{accelerator_build}) >> /log_startup.txt 2>&1 &
+MLE_INSTALL_PID=$!
+"""
+
+wait_for_install = """
+wait $MLE_INSTALL_PID
+mle_phase dependencies_installed
 """
 
-install_additional_setup = """# Setup virtual env + install base required packages
-tmux send "
+install_additional_setup = """# Run additional setup script (requires downloaded code)
+(
     cd {remote_dir}
     . env/bin/activate
     bash {extra_install_fname}
-    "
+) >> /log_startup.txt 2>&1
+mle_phase additional_setup
 """
 
-jax_tpu_build = """# Install jaxlib for TPU
-tmux send "
-    cd {remote_dir}
-    . env/bin/activate
+jax_tpu_build = """    # Install jaxlib for TPU
     PYTHON_VERSION=cp36  # Supported python versions: cp36, cp37, cp38
     pip install --upgrade --user https://storage.googleapis.com/jax-releases/tpu/jaxlib-0.1.55+tpu-$PYTHON_VERSION-none-manylinux2010_x86_64.whl
     pip install --upgrade --user jax
-    "
 """
 
-jax_gpu_build = """# Install jaxlib for GPU
-tmux send "
-    cd {remote_dir}
-    . env/bin/activate
+jax_gpu_build = """    # Install jaxlib for GPU
     pip install --upgrade jax jaxlib==0.1.64+cuda110 -f https://storage.googleapis.com/jax-releases/jax_releases.html
-    "
+"""
+
+# Job is resubmitted after preemption - results (incl. checkpoints) are
+# restored via the code directory clone. Signal resume via env variable.
+resume_env = """
+export MLE_RESUME=1
+export MLE_NUM_PREEMPTIONS={num_preemptions}
+"""
+
+sync_results_from_dir = """
+# Incrementally upload new/changed result files to GCS bucket. Files newer
+# than the last upload stamp are batched per directory (one `gsutil -m cp`
+# call each). Uploads are triggered by file events (inotify) if available.
+MLE_RESULTS_DIR={remote_code_dir}/{experiment_dir}
+MLE_RESULTS_GCS=gs://{gcp_bucket_name}/{remote_code_dir}/{experiment_dir}
+MLE_STAMP=/mle_upload_stamp
+mkdir -p $MLE_RESULTS_DIR
+touch -d @0 $MLE_STAMP
+mle_sync_results() {{
+    touch $MLE_STAMP.next
+    local failed=0
+    while read -r dir; do
+        find "$dir" -maxdepth 1 -type f -newer $MLE_STAMP |
+            gsutil -m -q cp -I "$MLE_RESULTS_GCS${{dir#$MLE_RESULTS_DIR}}/" ||
+            failed=1
+    done < <(find $MLE_RESULTS_DIR -type f -newer $MLE_STAMP -printf '%h\\n' | sort -u)
+    # Only advance stamp if all uploads succeeded (otherwise retry files)
+    if [ $failed -eq 0 ]; then
+        mv $MLE_STAMP.next $MLE_STAMP
+    fi
+}}
+mle_upload_loop() {{
+    while true; do
+        if command -v inotifywait > /dev/null; then
+            # Block until result files are written & batch bursts of files
+            inotifywait -qq -r -e close_write,moved_to -t 60 $MLE_RESULTS_DIR
+            sleep 2
+        else
+            sleep 10
+        fi
+        mle_sync_results
+    done
+}}
+mle_upload_loop &
+MLE_SYNC_PID=$!
 """
 
 exec_python = """
-tmux send "
+# Attach to job output via tmux (see login instructions above)
+touch {remote_dir}/log.txt
+tmux new-session -s gcp_exp -d "tail -F {remote_dir}/log.txt"
+mle_phase job_start
 (
   cd {remote_dir} &&
   . env/bin/activate &&
   python3 {filename} {cmd_line_arguments}
 ) 2>&1 | tee -a {remote_dir}/log.txt
-
-echo WILL SHUT DOWN IN 5 MIN ...
-sleep 100 && sudo shutdown now
-"
+MLE_EXIT_CODE=${{PIPESTATUS[0]}}
+mle_phase job_end
 """
 
 exec_bash = """
-tmux send "
+# Attach to job output via tmux (see login instructions above)
+touch {remote_dir}/log.txt
+tmux new-session -s gcp_exp -d "tail -F {remote_dir}/log.txt"
+mle_phase job_start
 (
   cd {remote_dir} &&
   . env/bin/activate &&
   bash {filename} {cmd_line_arguments}
 ) 2>&1 | tee -a {remote_dir}/log.txt
+MLE_EXIT_CODE=${{PIPESTATUS[0]}}
+mle_phase job_end
+"""
 
-echo WILL SHUT DOWN IN 5 MIN ...
-sleep 100 && sudo shutdown now
-"
+final_sync_results = """
+# Stop continuous sync & do final flush of results
+kill $MLE_SYNC_PID
+wait $MLE_SYNC_PID 2>/dev/null
+mle_sync_results
+mle_phase results_synced
 """
 
-sync_results_from_dir = """
-# Wait for experiment startup before continuous rsync
-sleep 120
-tmux split-window -h
-tmux send "
-while true; do
-    gsutil rsync -x 'env' -r {remote_code_dir}/{experiment_dir} gs://{gcp_bucket_name}/{remote_code_dir}/{experiment_dir}
-    sleep 10
-done
-" ENTER
+report_timings = """
+gsutil -q cp $MLE_TIMINGS {timings_path}
+"""
+
+# Exit code of job is stored in marker - missing marker = VM was preempted
+completion_marker = """
+echo $MLE_EXIT_CODE | gsutil -q cp - {marker_path}
+"""
+
+shutdown_vm = """
+sudo shutdown now
 """
@@ -0,0 +1,116 @@
+import json
+import time
+import threading
+import subprocess as sp
+from typing import List, Union
+from .helpers_launch_gcp import gcp_get_list_cmd
+
+
+# VM/TPU states which count as a scheduled & running job
+running_vm_states = ["STAGING", "RUNNING"]
+running_tpu_states = ["CREATING", "STARTING", "READY", "RESTARTING"]
+
+
+def zone_from_name(name: str) -> str:
+    """Extract zone from TPU resource path (projects/p/locations/z/...)."""
+    parts = name.split("/")
+    if "locations" in parts:
+        return parts[parts.index("locations") + 1]
+    return ""
+
+
+def gcp_list_vms(
+    use_tpus: bool = False,
+    queue_id: Union[str, None] = None,
+    zones: Union[List[str], None] = None,
+):
+    """Get dict of VM name -> status info from one JSON listing call."""
+    # VM instances are listed across all zones - TPUs one call per zone
+    if not use_tpus or not zones:
+        zones = [None]
+
+    vms = []
+    for zone in zones:
+        check_cmd = gcp_get_list_cmd(use_tpus, queue_id, zone)
+        while True:
+            try:
+                out = sp.check_output(check_cmd)
+                break
+            except sp.CalledProcessError as e:
+                stderr = e.stderr
+                return_code = e.returncode
+                print(stderr, return_code)
+                time.sleep(1)
+        vms += json.loads(out or b"[]")
+    return gcp_parse_vm_list(vms, use_tpus)
+
+
+def gcp_parse_vm_list(vms: List[dict], use_tpus: bool = False) -> dict:
+    """Get dict of VM name -> status info from JSON listing output."""
+    vm_info = {}
+    for vm in vms:
+        # TPU VMs are listed with full resource path & 'state' key
+        name = vm["name"].split("/")[-1]
+        if use_tpus:
+            status = vm.get("state", "")
+            running = status in running_tpu_states
+        else:
+            status = vm.get("status", "")
+            running = status in running_vm_states
+        zone = vm.get("zone", zone_from_name(vm["name"]))
+        vm_info[name] = {
+            "status": status,
+            "running": running,
+            "zone": zone.split("/")[-1],
+        }
+    return vm_info
+
+
+class GCPStatusCache(object):
+    """
+    Queue-level cache of GCP VM states. All VMs of a queue are labelled with
+    `mle_queue=<queue_id>` & the cache is refreshed with one filtered listing
+    call per tick - independent of the number of jobs or project size.
+    """
+
+    def __init__(self, queue_id: str, refresh_interval: float = 10):
+        self.queue_id = queue_id  # label value attached to all queue VMs
+        self.refresh_interval = refresh_interval  # min. secs between lists
+        self.vm_info = {}  # use_tpus -> {vm_name: status info}
+        self.last_refresh = {}  # use_tpus -> time of last listing call
+        self.tpu_zones = []  # zones with TPU VMs of this queue
+        self.lock = threading.Lock()  # cache can be shared by queue threads
+
+    @property
+    def labels(self) -> dict:
+        """Labels to attach to VMs at creation time."""
+        return {"mle_queue": self.queue_id}
+
+    def refresh(self, use_tpus: bool = False, force: bool = False) -> dict:
+        """Re-list queue VMs if cached states are outdated (or forced)."""
+        with self.lock:
+            last_refresh = self.last_refresh.get(use_tpus)
+            if (
+                force
+                or last_refresh is None
+                or time.time() - last_refresh >= self.refresh_interval
+            ):
+                self.vm_info[use_tpus] = gcp_list_vms(
+                    use_tpus, self.queue_id, self.tpu_zones
+                )
+                self.last_refresh[use_tpus] = time.time()
+            return self.vm_info[use_tpus]
+
+    def add_zone(self, zone: str, use_tpus: bool = False) -> None:
+        """Register zone in which a VM of this queue was created."""
+        if use_tpus and zone not in self.tpu_zones:
+            self.tpu_zones.append(zone)
+
+    def get(self, vm_name: str, use_tpus: bool = False) -> Union[dict, None]:
+        """Get cached status info of a VM (None if it is not listed)."""
+        return self.refresh(use_tpus).get(vm_name)
+
+    def is_running(self, vm_name: str, use_tpus: bool = False) -> bool:
+        """Check if a VM is listed as staging/running."""
+        vm_info = self.get(vm_name, use_tpus)
+        return vm_info is not None and vm_info["running"]
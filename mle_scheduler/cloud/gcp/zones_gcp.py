@@ -0,0 +1,77 @@
+import time
+from typing import List, Union
+from .helpers_launch_gcp import base_gcp_args, tpu_gcp_args
+
+
+# gcloud error messages which indicate that a zone is out of capacity/quota
+capacity_error_markers = [
+    "ZONE_RESOURCE_POOL_EXHAUSTED",
+    "ZONE_RESOURCE_POOL_EXHAUSTED_WITH_DETAILS",
+    "QUOTA_EXCEEDED",
+    "does not have enough resources available",
+    "stockout",
+    "Quota '",
+]
+
+
+def gcp_is_capacity_error(stderr: Union[bytes, str, None]) -> bool:
+    """Check if VM creation failed due to missing zone capacity/quota."""
+    if stderr is None:
+        return False
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode("utf-8", errors="ignore")
+    return any(marker in stderr for marker in capacity_error_markers)
+
+
+def gcp_candidate_zones(job_arguments: dict) -> List[str]:
+    """Get list of candidate zones for a job (default: single base zone)."""
+    zones = job_arguments.get("zones")
+    if zones is None:
+        if job_arguments.get("use_tpus", 0):
+            return [tpu_gcp_args["ZONE"]]
+        return [base_gcp_args["ZONE"]]
+    if isinstance(zones, str):
+        return [zones]
+    return list(zones)
+
+
+class GCPZoneSelector(object):
+    """
+    Orders candidate zones by recent launch outcomes: Zones that recently
+    succeeded come first (most recent first), then untried zones & zones
+    that recently ran out of capacity last (oldest failure first) until
+    `failure_timeout` passed.
+    """
+
+    def __init__(self, failure_timeout: float = 600):
+        self.failure_timeout = failure_timeout  # secs to deprioritize zone
+        self.last_success = {}  # zone -> time of last successful creation
+        self.last_failure = {}  # zone -> time of last capacity error
+
+    def record_success(self, zone: str) -> None:
+        """Store successful VM creation in zone."""
+        self.last_success[zone] = time.time()
+        self.last_failure.pop(zone, None)
+
+    def record_failure(self, zone: str) -> None:
+        """Store capacity/quota error of VM creation in zone."""
+        self.last_failure[zone] = time.time()
+
+    def order(self, zones: List[str]) -> List[str]:
+        """Sort candidate zones - preferred ones first (stable otherwise)."""
+        now = time.time()
+
+        def rank(zone: str):
+            failed = now - self.last_failure.get(zone, -float("inf"))
+            if failed < self.failure_timeout:
+                # Zone which failed longest ago is most likely to recover
+                return (2, self.last_failure[zone])
+            if zone in self.last_success:
+                return (0, -self.last_success[zone])
+            return (1, 0)
+
+        return sorted(zones, key=rank)
+
+
+# Process-wide selector - zone preferences are shared across jobs & queues
+zone_selector = GCPZoneSelector()
@@ -1,4 +1,11 @@
-from .sge import submit_sge, monitor_sge
-from .slurm import submit_slurm, monitor_slurm
+from .sge import submit_sge, monitor_sge, cancel_sge
+from .slurm import submit_slurm, monitor_slurm, cancel_slurm
 
-__all__ = ["submit_sge", "monitor_sge", "submit_slurm", "monitor_slurm"]
+__all__ = [
+    "submit_sge",
+    "monitor_sge",
+    "cancel_sge",
+    "submit_slurm",
+    "monitor_slurm",
+    "cancel_slurm",
+]
@@ -0,0 +1,57 @@
+import os
+from typing import Set, Union
+from ..local.async_local import run_cmd_async
+from .slurm.manage_slurm import slurm_prepare_submission
+from .sge.manage_sge import sge_prepare_submission
+
+
+async def submit_cluster_async(
+    resource_to_run: str,
+    filename: str,
+    cmd_line_arguments: str,
+    job_arguments: dict,
+    clean_up: bool = True,
+) -> int:
+    """Submit Slurm/SGE job via sbatch/qsub subprocess (-1 on error)."""
+    if resource_to_run == "slurm-cluster":
+        base = slurm_prepare_submission(filename, cmd_line_arguments, job_arguments)
+        submit_fname, cmd = base + ".sh", ["sbatch"]
+    else:
+        base = sge_prepare_submission(filename, cmd_line_arguments, job_arguments)
+        # Terse output only contains the job id
+        submit_fname, cmd = base + ".qsub", ["qsub", "-terse"]
+    try:
+        returncode, out, err = await run_cmd_async(cmd, submit_fname)
+    finally:
+        if clean_up:
+            os.remove(submit_fname)
+    if returncode != 0:
+        print(out, err)
+        return -1
+    if resource_to_run == "slurm-cluster":
+        return int(out.decode("utf-8").split()[-1])
+    return int(out.decode("utf-8").strip().split(".")[0])
+
+
+async def list_cluster_jobs_async(
+    resource_to_run: str, user_name: str
+) -> Union[Set[str], None]:
+    """Ids of all pending/running jobs of user - one squeue/qstat call."""
+    if resource_to_run == "slurm-cluster":
+        cmd, num_header_lines = ["squeue", "-h", "-u", user_name, "-o", "%i"], 0
+    else:
+        cmd, num_header_lines = ["qstat", "-u", user_name], 2
+    returncode, out, err = await run_cmd_async(cmd)
+    if returncode != 0:
+        # Status unknown (e.g. scheduler busy) - retry at next tick
+        print(err, returncode)
+        return None
+    job_info = out.decode("utf-8").splitlines()[num_header_lines:]
+    # Array jobs are listed as <job_id>_<task_id> by Slurm
+    return set(line.split()[0].split("_")[0] for line in job_info if line.strip())
+
+
+async def cancel_cluster_async(resource_to_run: str, job_id: int) -> None:
+    """Cancel pending/running job via scancel/qdel."""
+    cmd = "scancel" if resource_to_run == "slurm-cluster" else "qdel"
+    await run_cmd_async([cmd, str(job_id)])
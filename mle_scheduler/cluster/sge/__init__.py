@@ -1,4 +1,4 @@
-from .manage_sge import submit_sge, monitor_sge
+from .manage_sge import submit_sge, monitor_sge, cancel_sge
 
 
-__all__ = ["submit_sge", "monitor_sge"]
+__all__ = ["submit_sge", "monitor_sge", "cancel_sge"]
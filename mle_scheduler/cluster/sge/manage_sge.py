@@ -6,15 +6,10 @@ from ...local import submit_subprocess, random_id
 from .helpers_launch_sge import sge_generate_startup_file
 
 
-def submit_sge(
-    filename: str,
-    cmd_line_arguments: str,
-    job_arguments: dict,
-    user_name: str,
-    debug_mode: bool,
-    clean_up: bool = True,
+def sge_prepare_submission(
+    filename: str, cmd_line_arguments: str, job_arguments: dict
 ) -> str:
-    """Create a qsub job & submit it based on provided file to execute."""
+    """Write sge job submission file (.qsub) & return its base name."""
     # Create base string of job id
     base = "submit_{0}".format(random_id())
 
@@ -57,6 +52,19 @@ def submit_sge(
 
     # Write grid engine scheduling script to qsub file
     open(base + ".qsub", "w").write(sge_job_template.format(**job_arguments))
+    return base
+
+
+def submit_sge(
+    filename: str,
+    cmd_line_arguments: str,
+    job_arguments: dict,
+    user_name: str,
+    debug_mode: bool,
+    clean_up: bool = True,
+) -> str:
+    """Create a qsub job & submit it based on provided file to execute."""
+    base = sge_prepare_submission(filename, cmd_line_arguments, job_arguments)
 
     # Submit the job via subprocess call
     command = "qsub < " + base + ".qsub " + "&>/dev/null"
@@ -121,3 +129,12 @@ def monitor_sge(job_id: Union[list, int], user_name: str) -> bool:
     S2 = set(running_job_ids)
     job_status = len(S1.intersection(S2)) > 0
     return job_status
+
+
+def cancel_sge(job_id: Union[list, int]) -> None:
+    """Cancel pending/running job(s) via `qdel`."""
+    if type(job_id) == int:
+        job_id = [job_id]
+    sp.run(
+        ["qdel"] + [str(i) for i in job_id], stdout=sp.DEVNULL, stderr=sp.DEVNULL
+    )
@@ -1,4 +1,4 @@
-from .manage_slurm import submit_slurm, monitor_slurm
+from .manage_slurm import submit_slurm, monitor_slurm, cancel_slurm
 
 
-__all__ = ["submit_slurm", "monitor_slurm"]
+__all__ = ["submit_slurm", "monitor_slurm", "cancel_slurm"]
@@ -6,15 +6,10 @@ from ...local import submit_subprocess, random_id
 from .helpers_launch_slurm import slurm_generate_startup_file
 
 
-def submit_slurm(
-    filename: str,
-    cmd_line_arguments: str,
-    job_arguments: dict,
-    user_name: str,
-    debug_mode: bool,
-    clean_up: bool = True,
+def slurm_prepare_submission(
+    filename: str, cmd_line_arguments: str, job_arguments: dict
 ) -> str:
-    """Create a qsub job & submit it based on provided file to execute."""
+    """Write slurm job submission file (.sh) & return its base name."""
     # Create base string of job id
     base = "submit_{0}".format(random_id())
 
@@ -54,6 +49,19 @@ def submit_slurm(
 
     # Write slurm scheduling script to bash file
     open(base + ".sh", "w").write(slurm_job_template.format(**job_arguments))
+    return base
+
+
+def submit_slurm(
+    filename: str,
+    cmd_line_arguments: str,
+    job_arguments: dict,
+    user_name: str,
+    debug_mode: bool,
+    clean_up: bool = True,
+) -> str:
+    """Create a qsub job & submit it based on provided file to execute."""
+    base = slurm_prepare_submission(filename, cmd_line_arguments, job_arguments)
 
     # Submit the job via subprocess call
     command = "sbatch < " + base + ".sh"
@@ -112,3 +120,12 @@ def monitor_slurm(job_id: Union[list, int], user_name: str) -> bool:
     S2 = set(running_job_ids)
     job_status = len(S1.intersection(S2)) > 0
     return job_status
+
+
+def cancel_slurm(job_id: Union[list, int]) -> None:
+    """Cancel pending/running job(s) via `scancel`."""
+    if type(job_id) == int:
+        job_id = [job_id]
+    sp.run(
+        ["scancel"] + [str(i) for i in job_id], stdout=sp.DEVNULL, stderr=sp.DEVNULL
+    )
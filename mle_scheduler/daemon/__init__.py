@@ -0,0 +1,5 @@
+from .server_daemon import MLEDaemon, default_socket_path
+from .client_daemon import DaemonClient
+
+
+__all__ = ["MLEDaemon", "DaemonClient", "default_socket_path"]
@@ -0,0 +1,47 @@
+import os
+import json
+import socket
+from typing import Union
+from .server_daemon import default_socket_path
+
+
+class DaemonClient(object):
+    """Talk to a running `MLEDaemon` via its Unix socket."""
+
+    def __init__(self, socket_path: Union[str, None] = None):
+        self.socket_path = socket_path or default_socket_path()
+
+    def request(self, cmd: str, **kwargs):
+        """Send one JSON request & return result (raise daemon errors)."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                raise ConnectionError(
+                    f"No mle-scheduler daemon listening on {self.socket_path}."
+                    " Start one with `mle-scheduler start`."
+                )
+            sock.sendall(json.dumps(dict(kwargs, cmd=cmd)).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def submit(self, **queue_kwargs) -> str:
+        """Submit queue (MLEQueue kwargs) & return its id."""
+        return self.request("submit", queue=queue_kwargs, cwd=os.getcwd())
+
+    def status(self, queue_id: Union[str, None] = None) -> dict:
+        return self.request("status", queue_id=queue_id)
+
+    def cancel(self, queue_id: str) -> dict:
+        return self.request("cancel", queue_id=queue_id)
+
+    def tail(self, queue_id: str, job_index: int = 0, num_lines: int = 20) -> dict:
+        return self.request(
+            "tail", queue_id=queue_id, job_index=job_index, num_lines=num_lines
+        )
+
+    def shutdown(self) -> None:
+        self.request("shutdown")
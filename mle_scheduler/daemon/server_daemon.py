@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import logging
+import threading
+import traceback
+import socketserver
+from typing import Union
+from ..job_queue import MLEQueue
+from ..local import LocalResourcePool, random_id, declares_resources
+from ..local.log_stream_local import read_log_tail
+from ..cloud import GCPStatusCache
+
+
+def default_socket_path() -> str:
+    """Socket of the daemon (`MLE_SCHEDULER_SOCKET` or ~/.mle_scheduler)."""
+    return os.environ.get(
+        "MLE_SCHEDULER_SOCKET",
+        os.path.join(os.path.expanduser("~"), ".mle_scheduler", "daemon.sock"),
+    )
+
+
+# Queue arguments which are paths relative to the submitting process
+path_arguments = ["job_filename", "config_filenames", "experiment_dir"]
+
+
+def absolute_paths(queue_kwargs: dict, cwd: str) -> dict:
+    """Resolve relative paths of queue w.r.t. submitting working dir."""
+    queue_kwargs = queue_kwargs.copy()
+    for key in path_arguments:
+        value = queue_kwargs.get(key)
+        if isinstance(value, str):
+            queue_kwargs[key] = os.path.join(cwd, value)
+        elif isinstance(value, list):
+            queue_kwargs[key] = [os.path.join(cwd, v) for v in value]
+    return queue_kwargs
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line -> one JSON response per line."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                response = self.server.mle_daemon.handle(json.loads(line))
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response, default=str).encode() + b"\n")
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server - one thread per client connection."""
+
+    daemon_threads = True
+
+
+class MLEDaemon(object):
+    """
+    Background scheduler which owns several queues & serves a local Unix
+    socket API (submit, status, cancel, tail). Local queues share one
+    resource pool & GCP queues share one VM status cache, so backend
+    capacity & listing calls are batched across all submitted queues.
+    """
+
+    def __init__(
+        self,
+        socket_path: Union[str, None] = None,
+        resource_pool: Union[LocalResourcePool, None] = None,
+    ):
+        self.socket_path = socket_path or default_socket_path()
+        self.resource_pool = resource_pool
+        self.cloud_status_cache = None
+        self.queues = {}  # queue_id -> queue, thread & state
+        self.lock = threading.Lock()
+        self.server = None
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, queue_kwargs: dict, cwd: Union[str, None] = None) -> str:
+        """Create queue from MLEQueue kwargs & run it in background."""
+        queue_kwargs = absolute_paths(queue_kwargs, cwd or os.getcwd())
+        resource_to_run = queue_kwargs.get("resource_to_run")
+        with self.lock:
+            job_arguments = queue_kwargs.get("job_arguments", {})
+            if resource_to_run == "local" and declares_resources(job_arguments):
+                if self.resource_pool is None:
+                    self.resource_pool = LocalResourcePool()
+                queue_kwargs.setdefault("resource_pool", self.resource_pool)
+            elif resource_to_run == "gcp-cloud":
+                if self.cloud_status_cache is None:
+                    self.cloud_status_cache = GCPStatusCache(random_id().lower())
+                queue_kwargs.setdefault("cloud_status_cache", self.cloud_status_cache)
+        queue = MLEQueue(**queue_kwargs)
+        queue_id = random_id().lower()
+        entry = {
+            "queue": queue,
+            "state": "running",
+            "error": None,
+            "submitted": time.time(),
+        }
+        entry["thread"] = threading.Thread(
+            target=self.run_queue, args=(entry,), daemon=True
+        )
+        with self.lock:
+            self.queues[queue_id] = entry
+        entry["thread"].start()
+        self.logger.info(f"Submitted queue {queue_id} - {queue.num_total_jobs} jobs")
+        return queue_id
+
+    def run_queue(self, entry: dict) -> None:
+        """Run queue in thread & record its final state."""
+        queue = entry["queue"]
+        try:
+            queue.run(show_progress=False)
+            entry["state"] = "cancelled" if queue.cancel_event.is_set() else "done"
+        except Exception:
+            entry["state"] = "failed"
+            entry["error"] = traceback.format_exc()
+
+    def get_queue(self, queue_id: str) -> dict:
+        with self.lock:
+            if queue_id not in self.queues:
+                raise KeyError(f"Unknown queue {queue_id}")
+            return self.queues[queue_id]
+
+    def status(self, queue_id: Union[str, None] = None) -> dict:
+        """Summary of all queues or per-job states of one queue."""
+        if queue_id is None:
+            with self.lock:
+                queue_ids = list(self.queues.keys())
+            return {
+                queue_id: self.queue_summary(self.get_queue(queue_id))
+                for queue_id in queue_ids
+            }
+        entry = self.get_queue(queue_id)
+        summary = self.queue_summary(entry)
+        summary["jobs"] = [
+            {
+                "config_fname": job["config_fname"],
+                "seed_id": job["seed_id"],
+                "status": job["status"],
+                "job_id": (
+                    job["job_id"] if isinstance(job["job_id"], (int, str)) else None
+                ),
+            }
+            for _, job in entry["queue"].entries()
+        ]
+        return summary
+
+    def queue_summary(self, entry: dict) -> dict:
+        queue = entry["queue"]
+        status = queue.get_status()
+        return {
+            "state": entry["state"],
+            "resource": queue.resource_to_run,
+            "job_filename": str(queue.job_filename),
+            "total": status["total"],
+            "completed": status["completed"],
+            "running": status["running"],
+            "submitted": entry["submitted"],
+            "error": entry["error"],
+        }
+
+    def cancel(self, queue_id: str) -> dict:
+        """Stop queue - running jobs are cancelled, pending ones dropped."""
+        entry = self.get_queue(queue_id)
+        entry["queue"].cancel()
+        entry["thread"].join()
+        return self.queue_summary(entry)
+
+    def tail(self, queue_id: str, job_index: int = 0, num_lines: int = 20) -> dict:
+        """Last lines of stdout/stderr log files of a local job."""
+        queue = self.get_queue(queue_id)["queue"]
+        if not 0 <= job_index < queue.num_total_jobs:
+            raise KeyError(f"No such job {job_index} in queue {queue_id}")
+        try:
+            job = queue.queue[job_index]["job"]
+        except (KeyError, IndexError):
+            # Completed entry of a spilling queue (outputs are in journal)
+            job = None
+        if job is None:
+            return {"out": "", "err": ""}
+        log_fname = job.get_log_settings()["log_fname"]
+        if log_fname is None:
+            return {"out": "", "err": ""}
+        out, err = [
+            read_log_tail(log_fname + ext, num_lines).decode("utf-8", "replace")
+            for ext in [".log", ".err"]
+        ]
+        return {"out": out, "err": err}
+
+    def handle(self, request: dict) -> dict:
+        """Dispatch API request - {'cmd': ..., **kwargs}."""
+        cmd = request.pop("cmd")
+        if cmd == "submit":
+            result = self.submit(request["queue"], request.get("cwd"))
+        elif cmd == "status":
+            result = self.status(request.get("queue_id"))
+        elif cmd == "cancel":
+            result = self.cancel(request["queue_id"])
+        elif cmd == "tail":
+            result = self.tail(
+                request["queue_id"],
+                request.get("job_index", 0),
+                request.get("num_lines", 20),
+            )
+        elif cmd == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            result = None
+        else:
+            raise ValueError(f"Unknown command {cmd}")
+        return {"ok": True, "result": result}
+
+    def serve_forever(self) -> None:
+        """Listen on Unix socket until shutdown is requested."""
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.server = DaemonServer(self.socket_path, DaemonRequestHandler)
+        self.server.mle_daemon = self
+        os.chmod(self.socket_path, 0o600)
+        self.logger.info(f"Listening on {self.socket_path}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def shutdown(self) -> None:
+        """Cancel running queues & stop serving requests."""
+        with self.lock:
+            queue_ids = [
+                queue_id
+                for queue_id, entry in self.queues.items()
+                if entry["state"] == "running"
+            ]
+        for queue_id in queue_ids:
+            self.cancel(queue_id)
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def detach(log_fname: str) -> None:
+    """Double-fork into background (survives terminal exit)."""
+    if os.fork() > 0:
+        os._exit(0)
+    os.setsid()
+    if os.fork() > 0:
+        os._exit(0)
+    os.makedirs(os.path.dirname(log_fname) or ".", exist_ok=True)
+    log_fd = os.open(log_fname, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    null_fd = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null_fd, 0)
+    os.dup2(log_fd, 1)
+    os.dup2(log_fd, 2)
@@ -4,17 +4,46 @@ import time
 import logging
 from rich.logging import RichHandler
 import getpass
-from typing import Union
-from .local import submit_local, submit_venv, submit_conda
-from .ssh import submit_ssh, monitor_ssh
-from .cluster import submit_sge, monitor_sge, submit_slurm, monitor_slurm
-from .cloud import submit_gcp, monitor_gcp, clean_up_gcp
+from typing import Callable, List, Union
+from .local import submit_local, submit_venv, submit_conda, submit_forkserver
+from .local import LocalResourcePool, ResourceSampler, submit_callable
+from .ssh import submit_ssh, monitor_ssh, cancel_ssh
+from .cluster import submit_sge, monitor_sge, cancel_sge
+from .cluster import submit_slurm, monitor_slurm, cancel_slurm
+from .cloud import submit_gcp, monitor_gcp, clean_up_gcp, GCPStatusCache
+from .job_handle import JobHandle
 
 
 # Overview of implemented remote resources in addition to local processes
 cluster_resources = ["sge-cluster", "slurm-cluster"]
 cloud_resources = ["gcp-cloud"]
 other_resources = ["ssh-node", "local"]
+# Thread pools of numerical libraries limited to the job's cores
+thread_env_vars = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"]
+
+
+def check_job_filename(resource_to_run: str, job_filename) -> None:
+    """Callable jobs run on the local process pool only."""
+    if callable(job_filename) and resource_to_run != "local":
+        raise ValueError(
+            f"Callable jobs can only be run locally - not on {resource_to_run}."
+            " Please provide a .py/.sh script as `job_filename`."
+        )
+
+
+def job_context(logger_level: int = logging.WARNING) -> dict:
+    """Per-process state shared by jobs - user name & connected logger."""
+    # Instantiate/connect a logger
+    FORMAT = "%(message)s"
+    logging.basicConfig(
+        level=logger_level,
+        format=FORMAT,
+        datefmt="[%X]",
+        handlers=[RichHandler()],
+    )
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logger_level)
+    return {"user_name": getpass.getuser(), "logger": logger}
 
 
 class MLEJob(object):
@@ -27,7 +56,9 @@ class MLEJob(object):
     Args:
         resource_to_run (str): Compute resource to execute job on.
 
-        job_filename (str): filepath to .py script to be executed for job.
+        job_filename (str, Callable): filepath to .py script to be executed
+            for job. Local jobs can also be a picklable callable which is run
+            on a process pool as fn(experiment_dir, config_fname, seed_id).
 
         config_filename (str): filepath to .json file specifying configuration
             of experiment to be executed in this job.
@@ -36,6 +67,9 @@ class MLEJob(object):
 
         experiment_dir (str): set path for logging & unique storage of results.
 
+        seed_id (int, List[int]): random seed passed as -seed. A list of
+            seeds is run by a single process & passed as -seeds 1,2,3.
+
         cmd_line_input (dict): provides standardized cmd input to .py file in
             job submission. Includes -config, -exp_dir, -seed.
 
@@ -45,41 +79,67 @@ class MLEJob(object):
 
         logger_level (str): control logger verbosity of individual experiment.
 
+        cloud_status_cache (GCPStatusCache): queue-level cache of VM states
+            used to serve the cloud job status lookups.
+
+        resource_pool (LocalResourcePool): local cores/memory/GPU slots.
+            Local jobs wait until their declared resources are available.
+
+        context (dict): user name & logger shared by the jobs of a queue
+            (see `job_context`) - created per job if not provided.
+
     Methods:
         run: Executes job, logs it & returns status if job done
+        submit: Schedules job & returns handle (status, wait, result, cancel)
         schedule: Schedules job locally or remotely
         schedule_local: Schedules job locally on your machine
+        get_env_vars: Env variables of local jobs (e.g. GPU devices)
+        get_log_settings: Per-job stdout/stderr log files of local jobs
         schedule_cluster: Schedules job remotely on SGE/Slurm clusters
         monitor: Monitors job locally or remotely
         monitor_local: Monitors job locally on your machine
+        release_resources: Frees reserved local resources after job exit
+        close_process: Releases pipes/sentinels of finished local process
         monitor_cluster: Monitors job remotely on SGE/Slurm clusters
+        cancel: Stops running job on any of the resources
     """
 
     def __init__(
         self,
         resource_to_run: str,
-        job_filename: str,
+        job_filename: Union[str, Callable],
         job_arguments: dict = {},
         config_filename: Union[None, str] = None,
         experiment_dir: Union[None, str] = None,
-        seed_id: Union[None, int] = None,
+        seed_id: Union[None, int, List[int]] = None,
         extra_cmd_line_input: Union[None, dict] = None,
         delete_config: bool = False,
         debug_mode: bool = False,
         cloud_settings: Union[dict, None] = None,
         ssh_settings: Union[dict, None] = None,
         logger_level: int = logging.WARNING,
+        cloud_status_cache: Union[GCPStatusCache, None] = None,
+        resource_pool: Union[LocalResourcePool, None] = None,
+        context: Union[dict, None] = None,
     ):
+        check_job_filename(resource_to_run, job_filename)
         # Init job class with relevant info
         self.resource_to_run = resource_to_run  # compute resource for job
         self.job_filename = job_filename  # path to train script
         self.config_filename = config_filename  # path to config json
         self.job_arguments = job_arguments.copy()  # Job resource configuration
         self.experiment_dir = experiment_dir  # main results dir (create)
-        self.seed_id = seed_id  # random seed to be passed as cmd-line arg
+        self.seed_id = seed_id  # random seed(s) to be passed as cmd-line arg
         self.delete_config = delete_config  # Option to delete config file after run
         self.debug_mode = debug_mode  # Pipe stdout and stderr to files
-        self.user_name = getpass.getuser()
+        self.extra_cmd_line_input = extra_cmd_line_input  # kwargs of callable
+        self.result = None  # Return value of callable job
+        self.exit_code = None  # Exit code of local process
+        self.start_deadline = None  # Resubmitted VM not yet listed as running
+        if context is None:
+            context = job_context(logger_level)
+        self.user_name = context["user_name"]
+        self.logger = context["logger"]
 
         # Create command line arguments for job to schedule (passed to .py)
         self.cmd_line_args = self.generate_cmd_line_args()
@@ -93,22 +153,17 @@ class MLEJob(object):
         if self.resource_to_run in cloud_resources:
             assert cloud_settings is not None
         self.cloud_settings = cloud_settings
+        self.cloud_status_cache = cloud_status_cache  # queue-level VM states
 
         if self.resource_to_run == "ssh-node":
             assert ssh_settings is not None
         self.ssh_settings = ssh_settings
 
-        # Instantiate/connect a logger
-        FORMAT = "%(message)s"
-        logging.basicConfig(
-            level=logger_level,
-            format=FORMAT,
-            datefmt="[%X]",
-            handlers=[RichHandler()],
-        )
-
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logger_level)
+        # Local admission control - allocation is reserved until job exits
+        self.resource_pool = resource_pool
+        self.resources = None
+        # Background sampling of local job's RSS, CPU time & I/O
+        self.sampler = None
 
     def run(self) -> bool:
         """Schedule experiment, monitor and clean up afterwards."""
@@ -117,10 +172,19 @@ class MLEJob(object):
         # Monitor status of job based on identifier
         status_out = self.monitor(job_id, continuous=True)
         # If they exist - remove log & error file
+        # Note: Job id may have changed due to resubmission after preemption
         if not self.debug_mode:
-            self.clean_up(job_id)
+            self.clean_up(self.job_id)
         return status_out
 
+    def submit(self) -> JobHandle:
+        """
+        Schedule job & return future-like handle. GCP jobs still block until
+        their VM is listed as running (bounded by `running_timeout`).
+        """
+        job_id = self.schedule()
+        return JobHandle(self, job_id)
+
     def schedule(self) -> str:
         """Schedule job on cluster (sge/slurm), cloud (gcp) or locally."""
         if self.resource_to_run in cluster_resources:
@@ -173,6 +237,7 @@ class MLEJob(object):
         else:
             raise ValueError(f"{self.resource_to_run} is not implemented.")
         # Return sge/slurm - job_id (qstat/squeue), gcp - vm_name, ssh/local - proc
+        self.job_id = job_id
         return job_id
 
     def monitor(self, job_id: str, continuous: bool = True) -> bool:
@@ -204,6 +269,11 @@ class MLEJob(object):
                     f"VM Name: {job_id} - Cloud job completed -"
                     f" {self.config_filename}"
                 )
+            elif status_out == 2:
+                self.logger.info(
+                    f"VM Name: {job_id} - Cloud job preempted -"
+                    f" {self.config_filename}"
+                )
         elif self.resource_to_run == "ssh-node":
             if continuous:
                 self.logger.info(
@@ -232,35 +302,113 @@ class MLEJob(object):
 
     def schedule_local(self):
         """Schedules job locally on your machine."""
-        if "use_conda_venv" in self.job_arguments.keys():
-            if self.job_arguments["use_conda_venv"]:
-                proc = submit_conda(
-                    self.job_filename,
-                    self.cmd_line_args,
-                    self.job_arguments,
-                    self.debug_mode,
-                )
-            else:
-                proc = submit_local(
-                    self.job_filename, self.cmd_line_args, self.debug_mode
-                )
-        elif "use_venv_venv" in self.job_arguments.keys():
-            if self.job_arguments["use_venv_venv"]:
-                proc = submit_venv(
-                    self.job_filename,
-                    self.cmd_line_args,
-                    self.job_arguments,
-                    self.debug_mode,
-                )
-            else:
-                proc = submit_local(
-                    self.job_filename, self.cmd_line_args, self.debug_mode
-                )
+        if self.resource_pool is not None and self.resources is None:
+            self.resources = self.resource_pool.acquire(self.job_arguments)
+        if callable(self.job_filename):
+            # Run callable on shared process pool - no interpreter launch
+            proc = submit_callable(
+                self.job_filename,
+                self.experiment_dir,
+                self.config_filename,
+                self.seed_id,
+                self.job_arguments,
+                self.extra_cmd_line_input,
+            )
+            self.job_status = 1
+            return proc
+
+        log_settings = self.get_log_settings()
+        env_vars = self.get_env_vars()
+        cpus = self.get_cpus()
+        if self.job_arguments.get("use_forkserver", False):
+            # Fork .py job from warm interpreter w. pre-imported modules
+            proc = submit_forkserver(
+                self.job_filename,
+                self.cmd_line_args,
+                self.job_arguments,
+                log_settings,
+                env_vars,
+                cpus,
+            )
+        elif self.job_arguments.get("use_conda_venv", False):
+            proc = submit_conda(
+                self.job_filename,
+                self.cmd_line_args,
+                self.job_arguments,
+                self.debug_mode,
+                log_settings,
+                env_vars,
+                cpus,
+            )
+        elif self.job_arguments.get("use_venv_venv", False):
+            proc = submit_venv(
+                self.job_filename,
+                self.cmd_line_args,
+                self.job_arguments,
+                self.debug_mode,
+                log_settings,
+                env_vars,
+                cpus,
+            )
         else:
-            proc = submit_local(self.job_filename, self.cmd_line_args, self.debug_mode)
+            proc = submit_local(
+                self.job_filename,
+                self.cmd_line_args,
+                self.debug_mode,
+                log_settings,
+                env_vars,
+                cpus,
+            )
+        sample_interval = self.job_arguments.get("resource_sample_interval")
+        if sample_interval is not None:
+            self.sampler = ResourceSampler(proc.pid, sample_interval)
+
         self.job_status = 1
         return proc
 
+    def get_env_vars(self) -> dict:
+        """Env variables of local job - GPU devices & BLAS/OpenMP threads."""
+        env_vars = {}
+        if self.resources is not None and self.resources["gpus"] > 0:
+            env_vars["CUDA_VISIBLE_DEVICES"] = ",".join(self.resources["devices"])
+
+        # Limit threads to explicitly declared cores (unless set by user) -
+        # avoids oversubscription when many jobs run at once
+        num_threads = self.job_arguments.get("num_logical_cores")
+        if num_threads is not None and self.resources is not None:
+            num_threads = self.resources["cores"]
+        if num_threads is not None and self.job_arguments.get("limit_threads", True):
+            for var in thread_env_vars:
+                if var not in os.environ:
+                    env_vars[var] = str(num_threads)
+        return env_vars
+
+    def get_cpus(self) -> Union[List[int], None]:
+        """Cores the local job is pinned to (inside child before exec)."""
+        if self.resources is None or len(self.resources["cpus"]) == 0:
+            return None
+        return self.resources["cpus"]
+
+    def get_log_settings(self) -> dict:
+        """Per-job stdout/stderr log files (.log/.err) in <experiment_dir>/logs."""
+        if self.experiment_dir is None:
+            log_fname = None
+        else:
+            base_str = "job"
+            if self.config_filename is not None:
+                config_base = os.path.basename(self.config_filename)
+                base_str = os.path.splitext(config_base)[0]
+            if self.seed_id is not None:
+                base_str += f"_seed_{self.seed_str}"
+            log_fname = os.path.join(self.experiment_dir, "logs", base_str)
+        return {
+            "log_fname": log_fname,
+            "max_bytes": self.job_arguments.get("log_max_bytes"),
+            "backup_count": self.job_arguments.get("log_backup_count", 3),
+            "compress": self.job_arguments.get("log_compress", True),
+            "tail_lines": self.job_arguments.get("log_tail_lines", 100),
+        }
+
     def schedule_ssh(self):
         """Schedules job on SSH servers."""
         proc = submit_ssh(
@@ -299,7 +447,7 @@ class MLEJob(object):
             self.job_status = 1
         return job_id
 
-    def schedule_cloud(self) -> int:
+    def schedule_cloud(self, wait_running: bool = True) -> int:
         """Schedules job to run remotely on GCP cloud."""
         if self.resource_to_run == "gcp-cloud":
             # Submit VM Creation + Startup exec
@@ -308,8 +456,9 @@ class MLEJob(object):
                 self.cmd_line_args,
                 self.experiment_dir,
                 self.job_arguments,
-                self.debug_mode,
                 self.cloud_settings,
+                self.cloud_status_cache,
+                wait_running=wait_running,
             )
         if job_id == -1:
             self.job_status = 0
@@ -321,17 +470,16 @@ class MLEJob(object):
         """Monitors job locally on your machine."""
         # Poll status of local process & change status when done
         if continuous:
-            while self.job_status:
-                poll = proc.poll()
-                if poll is None:
-                    continue
-                else:
-                    self.job_status = 0
-                # Sleep until next status check
-                time.sleep(1)
+            # Output is drained to log files - waiting can't block on pipes
+            proc.wait()
+            self.job_status = 0
+            self.release_resources()
+            self.result = getattr(proc, "result", None)
+            self.exit_code = proc.returncode
 
-            # Get output & error messages (if there is an error)
+            # Get tails of output & error messages (if there is an error)
             out, err = proc.communicate()
+            self.close_process(proc)
             # Return -1 if job failed & 0 otherwise
             if proc.returncode != 0:
                 print(out, err)
@@ -339,15 +487,30 @@ class MLEJob(object):
             else:
                 return 0
         else:
-            poll = proc.poll()
-
-            # Get output & error messages (if there is an error)
-            out, err = proc.communicate()
-            if poll is None:
+            # Only collect output of finished jobs (never block on running)
+            if proc.poll() is None:
                 return 1
             else:
+                proc.communicate()
+                self.release_resources()
+                self.result = getattr(proc, "result", None)
+                self.exit_code = proc.returncode
+                self.close_process(proc)
                 return 0
 
+    def close_process(self, proc) -> None:
+        """Release OS handles (pipes, sentinels) of finished local process."""
+        if hasattr(proc, "close"):
+            proc.close()
+
+    def release_resources(self) -> None:
+        """Return reserved local resources to the pool & stop sampling."""
+        if self.resource_pool is not None and self.resources is not None:
+            self.resource_pool.release(self.resources)
+            self.resources = None
+        if self.sampler is not None:
+            self.sampler.stop()
+
     def monitor_ssh(self, proc, continuous: bool = True) -> int:
         """Monitors job remotely on SSH server."""
         # Poll status of local process & change status when done
@@ -381,12 +544,95 @@ class MLEJob(object):
         if continuous:
             while self.job_status:
                 if self.resource_to_run == "gcp-cloud":
-                    self.job_status = monitor_gcp(job_id, self.job_arguments)
+                    self.job_status = self.monitor_gcp(job_id)
+                # Resubmit preempted VM job & continue monitoring new VM
+                if self.job_status == 2:
+                    if self.can_resubmit:
+                        job_id = self.resubmit(job_id)
+                        # Failed resubmission - no VM left to monitor
+                        if job_id == -1:
+                            self.job_status = 0
+                    else:
+                        self.job_status = 0
                 time.sleep(10)
             return 0
         else:
             if self.resource_to_run == "gcp-cloud":
-                return monitor_gcp(job_id, self.job_arguments)
+                return self.monitor_gcp(job_id)
+
+    def monitor_gcp(self, vm_name: str) -> int:
+        """Status of VM - resubmitted VMs count as running until listed."""
+        if self.start_deadline is not None:
+            # Listing only (no bucket check) - served by queue status cache
+            use_tpus = self.job_arguments["use_tpus"]
+            if self.cloud_status_cache is not None:
+                listed = self.cloud_status_cache.is_running(vm_name, use_tpus)
+            else:
+                listed = monitor_gcp(vm_name, self.job_arguments) == 1
+            if not listed and time.time() < self.start_deadline:
+                return 1
+            self.start_deadline = None
+        return monitor_gcp(
+            vm_name,
+            self.job_arguments,
+            self.cloud_status_cache,
+            self.cloud_settings,
+        )
+
+    @property
+    def can_resubmit(self) -> bool:
+        """Check if preemption retry budget of cloud job is not used up."""
+        if self.cloud_settings is None:
+            return False
+        max_retries = self.cloud_settings.get("max_preemption_retries", 3)
+        return self.job_arguments.get("num_preemptions", 0) < max_retries
+
+    def resubmit(self, job_id: str) -> str:
+        """Delete preempted VM & resubmit job to resume from checkpoint."""
+        clean_up_gcp(
+            job_id,
+            self.job_arguments,
+            self.experiment_dir,
+            self.cloud_settings,
+        )
+        num_preemptions = self.job_arguments.get("num_preemptions", 0) + 1
+        self.job_arguments["num_preemptions"] = num_preemptions
+        # Pass resume flag to script (optional - startup sets MLE_RESUME=1)
+        resume_flag = self.cloud_settings.get("resume_flag")
+        if resume_flag is not None and num_preemptions == 1:
+            self.cmd_line_args += f" -{resume_flag}"
+        self.logger.info(
+            f"VM Name: {job_id} - Resubmit preempted job "
+            f"({num_preemptions}) - {self.config_filename}"
+        )
+        # Don't block the polling loop - new VM is confirmed by `monitor`
+        job_id = self.schedule_cloud(wait_running=False)
+        if job_id != -1:
+            running_timeout = self.cloud_settings.get("running_timeout", 900)
+            self.start_deadline = time.time() + running_timeout
+        return job_id
+
+    def cancel(self, job_id) -> None:
+        """Stop job - terminate local process, cancel cluster job or VM."""
+        if self.resource_to_run == "local":
+            job_id.terminate()
+            self.release_resources()
+            job_id = job_id.pid
+        elif self.resource_to_run == "sge-cluster":
+            cancel_sge(job_id)
+        elif self.resource_to_run == "slurm-cluster":
+            cancel_slurm(job_id)
+        elif self.resource_to_run == "gcp-cloud":
+            clean_up_gcp(
+                job_id,
+                self.job_arguments,
+                self.experiment_dir,
+                self.cloud_settings,
+            )
+        elif self.resource_to_run == "ssh-node":
+            cancel_ssh(job_id, self.ssh_settings)
+        self.job_status = 0
+        self.logger.info(f"Job ID: {job_id} - Cancelled - {self.config_filename}")
 
     def clean_up(self, job_id: str) -> None:
         """Remove error and log files at end of training."""
@@ -404,7 +650,8 @@ class MLEJob(object):
             self.logger.info("Cleaned up log, error, results files")
 
         # Delete VM instance and code directory stored in data bucket
-        if self.resource_to_run == "gcp-cloud":
+        # (No VM left if job could not be (re)submitted)
+        if self.resource_to_run == "gcp-cloud" and job_id != -1:
             clean_up_gcp(
                 job_id,
                 self.job_arguments,
@@ -430,14 +677,26 @@ class MLEJob(object):
             cmd_line_args += " -config " + self.config_filename
 
         if self.seed_id is not None:
-            cmd_line_args += " -seed " + str(self.seed_id)
+            # Batch of seeds is run by a single process: -seeds 1,2,3
+            if isinstance(self.seed_id, list):
+                seeds = ",".join(str(seed_id) for seed_id in self.seed_id)
+                cmd_line_args += " -seeds " + seeds
+            else:
+                cmd_line_args += " -seed " + str(self.seed_id)
             # Update the job argument details with the seed-job-id
             if "job_name" in self.job_arguments.keys():
-                self.job_arguments["job_name"] += "-" + str(self.seed_id)
+                self.job_arguments["job_name"] += "-" + self.seed_str
             else:
-                self.job_arguments["job_name"] = str(self.seed_id)
+                self.job_arguments["job_name"] = self.seed_str
         return cmd_line_args
 
+    @property
+    def seed_str(self) -> str:
+        """Seed id(s) of job as string - e.g. '1' or '1_2_3' for batches."""
+        if isinstance(self.seed_id, list):
+            return "_".join(str(seed_id) for seed_id in self.seed_id)
+        return str(self.seed_id)
+
     def generate_extra_cmd_line_args(
         self, cmd_line_args: str, extra_cmd_line_input: Union[None, dict] = None
     ) -> str:
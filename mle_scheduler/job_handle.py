@@ -0,0 +1,83 @@
+import time
+import threading
+from concurrent.futures import CancelledError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Union
+
+
+class JobHandle(object):
+    """
+    Future-like handle of a submitted MLEJob. Status is polled from the
+    backend on access. Preempted cloud jobs are resubmitted (if retries
+    remain) & finished jobs are cleaned up (unless in debug mode).
+    """
+
+    def __init__(self, job, job_id, poll_interval: float = 1.0):
+        self.job = job
+        self.job_id = job_id
+        self.poll_interval = poll_interval  # secs between status checks
+        self.state = "running"  # running, done or cancelled
+        self.lock = threading.Lock()
+
+    def poll(self) -> str:
+        """Check job status once - 'running', 'done' or 'cancelled'."""
+        with self.lock:
+            if self.state != "running":
+                return self.state
+            status = self.job.monitor(self.job_id, continuous=False)
+            if status == 2 and self.job.can_resubmit:
+                self.job_id = self.job.resubmit(self.job_id)
+                # Failed resubmission - no VM left to monitor
+                if self.job_id == -1:
+                    self.state = "done"
+            elif not status or status == 2:
+                self.state = "done"
+                if not self.job.debug_mode:
+                    self.job.clean_up(self.job_id)
+            return self.state
+
+    @property
+    def status(self) -> str:
+        return self.poll()
+
+    def running(self) -> bool:
+        return self.poll() == "running"
+
+    def done(self) -> bool:
+        return self.poll() != "running"
+
+    def cancelled(self) -> bool:
+        return self.state == "cancelled"
+
+    @property
+    def exit_code(self) -> Union[int, None]:
+        """Exit code of local process (None for remote/running jobs)."""
+        return self.job.exit_code
+
+    def wait(self, timeout: Union[float, None] = None) -> bool:
+        """Block until job finished (or timeout) - return if it is done."""
+        end_time = None if timeout is None else time.time() + timeout
+        while not self.done():
+            if end_time is not None and time.time() >= end_time:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def result(self, timeout: Union[float, None] = None) -> Any:
+        """Return value of callable job or exit code of local process."""
+        if not self.wait(timeout):
+            raise FutureTimeoutError(f"Job {self.job_id} still running")
+        if self.cancelled():
+            raise CancelledError()
+        if callable(self.job.job_filename):
+            return self.job.result
+        return self.exit_code
+
+    def cancel(self) -> bool:
+        """Cancel running job - False if it already finished."""
+        with self.lock:
+            if self.state != "running":
+                return self.state == "cancelled"
+            self.job.cancel(self.job_id)
+            self.state = "cancelled"
+            return True
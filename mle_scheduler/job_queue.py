@@ -1,7 +1,11 @@
 import os
 import logging
 import time
-from typing import Union, List
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, ALL_COMPLETED
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Iterable, Union, List
 import numpy as np
 from rich.logging import RichHandler
 from rich.progress import (
@@ -11,9 +15,18 @@ from rich.progress import (
     TimeElapsedColumn,
     SpinnerColumn,
 )
-from mle_scheduler.job import MLEJob
+from mle_scheduler.job import MLEJob, job_context, check_job_filename
+from mle_scheduler.queue_entry import QueueEntry
+from mle_scheduler.queue_journal import QueueJournal
 from mle_scheduler.ssh import send_dir_ssh, copy_dir_ssh, delete_dir_ssh
-from mle_scheduler.cloud.gcp import send_dir_gcp, copy_dir_gcp, delete_dir_gcp
+from mle_scheduler.cloud.gcp import (
+    send_dir_gcp,
+    copy_dir_gcp,
+    delete_dir_gcp,
+    submit_gcp_batch,
+    GCPStatusCache,
+)
+from mle_scheduler.local import random_id, LocalResourcePool, declares_resources
 
 
 class MLEQueue(object):
@@ -25,13 +38,14 @@ class MLEQueue(object):
     def __init__(
         self,
         resource_to_run: str,
-        job_filename: str,
+        job_filename: Union[str, Callable],
         job_arguments: dict = {},
         config_filenames: Union[str, List[str], None] = None,
         experiment_dir: Union[str, None] = None,
         num_seeds: int = 1,
         default_seed: int = 0,
         random_seeds: Union[None, List[int]] = None,
+        seeds_per_job: int = 1,
         max_running_jobs: int = 10,
         automerge_seeds: bool = False,
         automerge_configs: bool = False,
@@ -45,7 +59,15 @@ class MLEQueue(object):
         slack_auth_token: Union[str, None] = None,
         protocol_db=None,
         logger_level: int = logging.WARNING,
+        resource_pool: Union[LocalResourcePool, None] = None,
+        cloud_status_cache: Union[GCPStatusCache, None] = None,
+        launch_concurrency: int = 1,
+        use_journal: bool = False,
+        resume: bool = False,
+        job_specs: Union[Iterable, None] = None,
+        spill_completed: bool = False,
     ):
+        check_job_filename(resource_to_run, job_filename)
         # Init experiment class with relevant info
         self.resource_to_run = resource_to_run  # compute resource for job
         self.job_filename = job_filename  # path to train script
@@ -53,6 +75,7 @@ class MLEQueue(object):
         self.experiment_dir = experiment_dir  # main results dir (create)
         self.job_arguments = job_arguments.copy()  # job-specific args
         self.num_seeds = num_seeds  # number seeds to run
+        self.seeds_per_job = seeds_per_job  # seeds run by a single process
         self.max_running_jobs = max_running_jobs  # number of sim running jobs
         self.delete_config = (
             delete_config  # Option to delete config file after run
@@ -90,12 +113,31 @@ class MLEQueue(object):
 
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logger_level)
+        # User name & job logger are set up once & shared by all jobs
+        self.job_context = job_context()
 
         if resource_to_run == "ssh-node":
             if self.ssh_settings["start_up_copy_dir"]:
                 send_dir_ssh(self.ssh_settings)
                 self.logger.info("Copied code directory to SSH server")
 
+        # Local jobs are admitted based on declared cores/memory/GPUs
+        # Pool can be shared between queues running on the same machine
+        # W/o declared resources only `max_running_jobs` limits concurrency
+        self.resource_pool = resource_pool
+        if (
+            resource_to_run == "local"
+            and self.resource_pool is None
+            and declares_resources(self.job_arguments)
+        ):
+            self.resource_pool = LocalResourcePool()
+
+        # Queue-level cache of VM states - one listing call per tick
+        # Cache can be shared between queues (e.g. by the daemon)
+        self.cloud_status_cache = cloud_status_cache
+        if resource_to_run == "gcp-cloud" and self.cloud_status_cache is None:
+            self.cloud_status_cache = GCPStatusCache(random_id().lower())
+
         if resource_to_run == "gcp-cloud":
             if self.cloud_settings["start_up_copy_dir"]:
                 send_dir_gcp(self.cloud_settings)
@@ -128,63 +170,223 @@ class MLEQueue(object):
                 self.extra_cmd_line_input = None
 
         # Make sure that config_filenames is list of strings to loop over
-        if type(self.config_filenames) != list:
+        if self.config_filenames is None and job_specs is not None:
+            self.config_filenames = []
+        elif type(self.config_filenames) != list:
             self.config_filenames = list(self.config_filenames)
 
         # Generate a list of jobs to be queued/executed on the resource
         # Recreate directory in which the results are stored - later merge
         # 3 status types: -1 - not started yet; 0 - completed, 1 - running
+        # (Preempted GCP jobs are resubmitted & stay in the running state)
         self.queue, self.mle_log_dirs, self.mle_run_ids = [], [], []
 
         for config_fname in self.config_filenames:
-            base_str = os.path.split(config_fname)[1].split(".")[0]
-            # Add mle log dir to storage list
-            sub_experiment_dir = os.path.join(experiment_dir, base_str)
+            # Add mle log dir to storage list (shared by entries of config)
+            sub_experiment_dir = self.config_dir(config_fname)
             self.mle_log_dirs.append(sub_experiment_dir)
-            self.mle_run_ids.append(base_str)
-            for seed_id in self.random_seeds:
-                self.queue.append(
-                    {
-                        "config_fname": config_fname,
-                        "seed_id": seed_id,
-                        "base_str": base_str,
-                        "experiment_dir": sub_experiment_dir,
-                        "log_dir": os.path.join(sub_experiment_dir, "/logs"),
-                        "status": -1,
-                        "job": None,
-                        "job_id": None,
-                        "merged_logs": False,
-                    }
-                )
+            self.mle_run_ids.append(os.path.basename(sub_experiment_dir))
+            # Group seeds into batches executed by one job (-seeds 1,2,3)
+            seed_groups = self.random_seeds
+            if self.seeds_per_job > 1:
+                seed_groups = [
+                    self.random_seeds[i : i + self.seeds_per_job]
+                    for i in range(0, len(self.random_seeds), self.seeds_per_job)
+                ]
+            self.queue.extend(
+                QueueEntry(config_fname, seed_id, sub_experiment_dir)
+                for seed_id in seed_groups
+            )
+        self.run_ids = set(self.mle_run_ids)
+
+        # Streamed (config, seed) specs are pulled lazily as slots free up
+        # More specs can be appended to a running queue via `add_jobs`
+        self.job_specs = deque()
+        if job_specs is not None:
+            self.job_specs.append(iter(job_specs))
+        self.closed = False  # All jobs completed - no more specs accepted
+        self.journaled = {}  # Journal records of resumed queue
 
         self.queue_counter = 0  # Next job to schedule
+        self.num_pending = len(self.queue)  # No. of jobs waiting for launch
+        self.running = {}  # Queue index -> entry of running jobs
+        self.launch_concurrency = launch_concurrency  # Parallel submissions
+        self.submitted, self.finished = False, False  # 1st wave & post-proc
+        self.lock = threading.RLock()  # Guards counters & entry states
+        self.thread, self.error = None, None  # Background run (if any)
+        self.cancel_event = threading.Event()  # Set to stop running queue
         self.num_completed_jobs = 0  # No. already completed jobs
         self.num_running_jobs = 0  # No. of currently running jobs
         self.num_total_jobs = len(self.queue)  # Queue is list of all jobs
 
         # If no limit of jobs is manually provided - schedule all of them
         if self.max_running_jobs is None:
+            if job_specs is not None:
+                raise ValueError("Streamed job_specs require max_running_jobs.")
             self.max_running_jobs = self.num_total_jobs
 
+        # Journal entries & status transitions to disk (SQLite in WAL mode)
+        # Resume skips completed jobs & reattaches to still running ones
+        self.journal = None
+        # Outputs of completed jobs are moved to the journal (w/o job handles)
+        self.spill_completed = spill_completed
+        if spill_completed and not use_journal:
+            raise ValueError("spill_completed requires use_journal=True.")
+        if resume and not use_journal:
+            raise ValueError("resume requires use_journal=True.")
+        if use_journal:
+            self.journal = QueueJournal(os.path.join(experiment_dir, "mle_queue.db"))
+            if resume:
+                self.resume_from_journal()
+            else:
+                self.journal.reset(list(enumerate(self.queue)), self.resource_to_run)
+                if self.cloud_status_cache is not None:
+                    self.journal.set_meta(
+                        "cloud_queue_id", self.cloud_status_cache.queue_id
+                    )
+        # Spilling queue only keeps pending/running entries (by queue index)
+        if spill_completed:
+            self.queue = {i: e for i, e in enumerate(self.queue) if e["status"] != 0}
+
         self.logger.info(
             "Queued: {} - {} seeds x {} configs".format(
                 self.resource_to_run, self.num_seeds, len(self.config_filenames)
             )
         )
 
-    def run(self) -> None:
-        """Schedule -> Monitor -> Merge individual logs."""
-        # 1. Spawn 1st batch of evals until limit of allowed usage is reached
-        while self.num_running_jobs < min(
-            self.max_running_jobs, self.num_total_jobs
-        ):
-            job, job_id = self.launch(self.queue_counter)
-            self.queue[self.queue_counter]["status"] = 1
-            self.queue[self.queue_counter]["job"] = job
-            self.queue[self.queue_counter]["job_id"] = job_id
-            self.num_running_jobs += 1
-            self.queue_counter += 1
-            time.sleep(self.time_between_launches)
+    def config_dir(self, config_fname: str) -> str:
+        """Results sub-directory of config (named after config file)."""
+        base_str = os.path.split(config_fname)[1].split(".")[0]
+        return os.path.join(self.experiment_dir, base_str)
+
+    def add_jobs(self, job_specs: Iterable) -> None:
+        """Append (config, seed) specs - pulled lazily (thread-safe)."""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Queue already completed all jobs.")
+            self.job_specs.append(iter(job_specs))
+
+    def pull_jobs(self, num_jobs: int) -> int:
+        """Pull specs until `num_jobs` entries wait for launch (or none left)."""
+        with self.lock:
+            pulled = []
+            while self.num_pending < num_jobs and self.job_specs:
+                try:
+                    config_fname, seed_id = next(self.job_specs[0])
+                except StopIteration:
+                    self.job_specs.popleft()
+                    continue
+                i = self.num_total_jobs
+                entry = QueueEntry(
+                    config_fname, seed_id, self.config_dir(config_fname)
+                )
+                if entry["base_str"] not in self.run_ids:
+                    self.run_ids.add(entry["base_str"])
+                    self.mle_run_ids.append(entry["base_str"])
+                    self.mle_log_dirs.append(entry["experiment_dir"])
+                self.num_total_jobs += 1
+                # Streamed jobs which completed before queue was resumed keep
+                # their queue index (journal key) but are not launched again
+                record = self.journaled.get(
+                    QueueJournal.entry_key(i, config_fname, seed_id)
+                )
+                if record is not None and record["status"] == 0:
+                    entry["status"] = 0
+                    self.num_completed_jobs += 1
+                    if not self.spill_completed:
+                        self.queue.append(entry)
+                    continue
+                if self.spill_completed:
+                    self.queue[i] = entry
+                else:
+                    self.queue.append(entry)
+                self.num_pending += 1
+                pulled.append((i, entry))
+            if self.journal is not None and len(pulled) > 0:
+                self.journal.add(pulled, self.resource_to_run)
+            return max(0, min(num_jobs, self.num_pending))
+
+    def all_completed(self) -> bool:
+        """Check if all jobs completed & no more specs are left to pull."""
+        with self.lock:
+            if self.num_completed_jobs < self.num_total_jobs:
+                return False
+            if self.pull_jobs(1) > 0:
+                return False
+            self.closed = True
+        # Release database file - reopened if outputs are loaded later
+        if self.journal is not None:
+            self.journal.close()
+        return True
+
+    def resume_from_journal(self) -> None:
+        """Restore completed/running entries - remaining ones are launched."""
+        journaled = self.journal.load()
+        self.journaled = journaled
+        # VMs of the resumed queue are labelled with the original queue id
+        queue_id = self.journal.get_meta("cloud_queue_id")
+        if queue_id is not None and self.cloud_status_cache is not None:
+            self.cloud_status_cache = GCPStatusCache(queue_id)
+        pending = []
+        for i, entry in enumerate(self.queue):
+            record = journaled.get(
+                QueueJournal.entry_key(i, entry["config_fname"], entry["seed_id"])
+            )
+            if record is not None and record["status"] == 0:
+                entry["status"] = 0
+                self.num_completed_jobs += 1
+            elif (
+                record is not None
+                and record["status"] == 1
+                and record["job_id"] is not None
+            ):
+                # Reattach to job id (cluster/SSH job id, VM name)
+                job = self.create_job(i)
+                job.job_arguments.update(record["job_arguments"] or {})
+                job.job_status, job.job_id = 1, record["job_id"]
+                zone = job.job_arguments.get("zone")
+                if self.cloud_status_cache is not None and zone is not None:
+                    self.cloud_status_cache.add_zone(
+                        zone, job.job_arguments.get("use_tpus", 0)
+                    )
+                entry.update(status=1, job=job, job_id=record["job_id"])
+                self.running[i] = entry
+                self.num_running_jobs += 1
+            else:
+                # Not started or not reattachable (e.g. local process)
+                pending.append((i, entry))
+        self.journal.add(pending, self.resource_to_run)
+        for i, entry in pending:
+            self.journal.update(i, entry["config_fname"], entry["seed_id"], -1)
+        # Remaining jobs are launched in their original queue order
+        self.num_pending = len(pending)
+        self.logger.info(
+            f"Resumed: {self.num_completed_jobs} completed,"
+            f" {self.num_running_jobs} running, {len(pending)} remaining jobs"
+        )
+
+    def journal_update(self, i: int, job: dict) -> None:
+        """Record status & job id of queue entry `i` in the journal."""
+        if self.journal is not None:
+            self.journal.update(
+                i,
+                job["config_fname"],
+                job["seed_id"],
+                job["status"],
+                job["job_id"],
+                None if job["job"] is None else job["job"].job_arguments,
+            )
+
+    def submit(self) -> None:
+        """Launch 1st wave of jobs without blocking (drive w. `step`)."""
+        if self.submitted:
+            return
+        self.submitted = True
+        # Spawn 1st batch of evals until limit of allowed usage is reached
+        self.launch_wave(
+            self.pull_jobs(self.max_running_jobs - self.num_running_jobs),
+            self.time_between_launches,
+        )
 
         self.logger.info(
             "Launched: {} - Set of {}/{} Jobs".format(
@@ -192,6 +394,186 @@ class MLEQueue(object):
             )
         )
 
+    def step(self) -> List[dict]:
+        """Check running jobs once, fill up free slots & return completed."""
+        completed = []
+        # Only check status of running jobs (not the whole queue)
+        for i, job in list(self.running.items()):
+            status = self.monitor(job["job"], job["job_id"], False)
+            # Relaunch preempted job or mark it as done
+            if status == 2:
+                if job["job"].can_resubmit:
+                    job["job_id"] = job["job"].resubmit(job["job_id"])
+                    if job["job_id"] != -1:
+                        self.journal_update(i, job)
+                        continue
+                    # No VM could be created - job is done (failed)
+                    self.logger.error(
+                        "Failed to resubmit preempted job -"
+                        f" {job['config_fname']} (seed {job['seed_id']})"
+                    )
+                status = 0
+            # If status changes to completed - update counters/state
+            if status == 0:
+                self.complete(i)
+                completed.append(job)
+        time.sleep(0.1)
+
+        # Once budget becomes available again - fill up with new jobs
+        self.launch_wave(
+            self.pull_jobs(self.max_running_jobs - self.num_running_jobs), 0.1
+        )
+        return completed
+
+    def complete(self, i: int) -> None:
+        """Store outputs of completed job & clean up after it."""
+        with self.lock:
+            job = self.running.pop(i)
+            # Return value of callable jobs & exit code of local processes
+            job["result"] = job["job"].result
+            job["exit_code"] = job["job"].exit_code
+            # Store sampled resource usage of local job
+            if job["job"].sampler is not None:
+                sampler = job["job"].sampler
+                job["resource_usage"] = sampler.time_series
+                job["resource_stats"] = sampler.stats
+            self.num_completed_jobs += 1
+            self.num_running_jobs -= 1
+            job["status"] = 0
+        self.journal_update(i, job)
+        # Clean up after job completion (e.g VM instance)
+        if not self.debug_mode:
+            job["job"].clean_up(job["job_id"])
+        if self.spill_completed:
+            self.spill(i)
+
+    def spill(self, i: int) -> None:
+        """Move outputs of completed job to journal & drop its queue entry."""
+        with self.lock:
+            job = self.queue.pop(i)
+            self.journal.add_outputs(
+                i,
+                job["config_fname"],
+                job["seed_id"],
+                {
+                    "index": i,
+                    "result": job["result"],
+                    "exit_code": job["exit_code"],
+                    "resource_usage": job["resource_usage"],
+                    "resource_stats": job["resource_stats"],
+                },
+            )
+
+    def entries(self) -> List[tuple]:
+        """(Queue index, entry) pairs - w/o entries spilled to the journal."""
+        with self.lock:
+            if self.spill_completed:
+                return list(self.queue.items())
+            return list(enumerate(self.queue))
+
+    def load_outputs(self) -> dict:
+        """Outputs of completed jobs (from journal if they were spilled)."""
+        with self.lock:
+            outputs = {}
+            if self.spill_completed:
+                for spilled in self.journal.load_outputs().values():
+                    outputs[spilled["index"]] = spilled
+            for i, job in self.entries():
+                if job["status"] != 0:
+                    continue
+                outputs[i] = {
+                    "result": job["result"],
+                    "exit_code": job["exit_code"],
+                    "resource_usage": job["resource_usage"],
+                    "resource_stats": job["resource_stats"],
+                }
+            return outputs
+
+    def as_completed(self, timeout: Union[float, None] = None):
+        """Yield queue entries as their jobs complete (drives the queue)."""
+        end_time = None if timeout is None else time.time() + timeout
+        self.submit()
+        for _, job in self.entries():
+            if job["status"] == 0:
+                yield job
+        while not self.all_completed():
+            if end_time is not None and time.time() > end_time:
+                raise FutureTimeoutError(
+                    f"{self.num_total_jobs - self.num_completed_jobs}"
+                    f" (of {self.num_total_jobs}) jobs unfinished"
+                )
+            for job in self.step():
+                yield job
+        self.finish()
+
+    def wait(
+        self, return_when: str = ALL_COMPLETED, timeout: Union[float, None] = None
+    ):
+        """Drive queue until first/all jobs completed - (done, not_done)."""
+        if return_when not in [FIRST_COMPLETED, ALL_COMPLETED]:
+            raise ValueError(f"Unsupported return_when {return_when}.")
+        end_time = None if timeout is None else time.time() + timeout
+        self.submit()
+        while not self.all_completed():
+            # Return right away if jobs already completed (e.g. earlier call)
+            if return_when == FIRST_COMPLETED and self.num_completed_jobs > 0:
+                break
+            if end_time is not None and time.time() > end_time:
+                break
+            self.step()
+        if self.closed:
+            self.finish()
+        entries = [job for _, job in self.entries()]
+        done = [job for job in entries if job["status"] == 0]
+        not_done = [job for job in entries if job["status"] != 0]
+        return done, not_done
+
+    def get_status(self) -> dict:
+        """Consistent snapshot of queue counters (safe during runs)."""
+        with self.lock:
+            return {
+                "total": self.num_total_jobs,
+                "completed": self.num_completed_jobs,
+                "running": self.num_running_jobs,
+                "pending": self.num_pending,
+            }
+
+    def get_results(self) -> dict:
+        """Results of jobs completed so far - queue index -> result."""
+        return {i: out["result"] for i, out in self.load_outputs().items()}
+
+    def run_background(self, show_progress: bool = True) -> None:
+        """Run queue in thread - errors are re-raised by `join`."""
+        try:
+            self.run(show_progress)
+        except Exception as e:
+            self.error = e
+
+    def join(self, timeout: Union[float, None] = None) -> None:
+        """Wait for background run to finish."""
+        if self.thread is not None:
+            self.thread.join(timeout)
+        if not self.is_running and self.journal is not None:
+            self.journal.close()
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def run(self, show_progress: bool = True, background: bool = False):
+        """Schedule -> Monitor -> Merge individual logs."""
+        # Return immediately & run scheduling loop in a thread (e.g. Jupyter)
+        if background:
+            self.thread = threading.Thread(
+                target=self.run_background, args=(show_progress,), daemon=True
+            )
+            self.thread.start()
+            return self.thread
+        # 1. Spawn 1st batch of evals until limit of allowed usage is reached
+        self.submit()
+
         # 2. Set up Progress Bar Counter of completed jobs (& slack bot)
         progress = Progress(
             SpinnerColumn(),
@@ -207,6 +589,7 @@ class MLEQueue(object):
             TextColumn("[progress.percentage]{task.percentage:>3.0f}% •"),
             TimeElapsedColumn(),
             TextColumn(":hourglass:", justify="right"),
+            disable=not show_progress,
         )
 
         if (
@@ -241,55 +624,41 @@ class MLEQueue(object):
 
         # 3. Monitor & launch new waiting jobs when resource available
         with progress:
-            task = progress.add_task("queue", total=self.num_total_jobs)
-            while self.num_completed_jobs < self.num_total_jobs:
-                # Once budget is fully allocated - start monitor running jobs
-                # Loop over all jobs in queue - check status of prev running
-                for job in self.queue:
-                    if job["status"] == 1:
-                        status = self.monitor(job["job"], job["job_id"], False)
-                        # If status changes to completed - update counters/state
-                        if status == 0:
-                            self.num_completed_jobs += 1
-                            self.num_running_jobs -= 1
-                            job["status"] = 0
-                            # Clean up after job completion (e.g VM instance)
-                            if not self.debug_mode:
-                                job["job"].clean_up(job["job_id"])
-                            # Update the rich progress bar after job completed
-                            progress.advance(task)
-
-                            # Update the slack progress bar
-                            if (
-                                self.use_slack_bot
-                                and self.slack_user_name is not None
-                                and self.slack_auth_token is not None
-                            ):
-                                try:
-                                    slackbot.update_pbar()
-                                except Exception:
-                                    pass
-
-                            # Update the protocol db progress bar
-                            if self.protocol_db is not None:
-                                self.protocol_db.update_progress_bar()
-                    time.sleep(0.1)
-
-                # Once budget becomes available again - fill up with new jobs
-                while self.num_running_jobs < min(
-                    self.max_running_jobs,
-                    self.num_total_jobs
-                    - self.num_completed_jobs
-                    - self.num_running_jobs,
-                ):
-                    job, job_id = self.launch(self.queue_counter)
-                    self.queue[self.queue_counter]["status"] = 1
-                    self.queue[self.queue_counter]["job"] = job
-                    self.queue[self.queue_counter]["job_id"] = job_id
-                    self.num_running_jobs += 1
-                    self.queue_counter += 1
-                    time.sleep(0.1)
-
+            task = progress.add_task(
+                "queue", total=self.num_total_jobs, completed=self.num_completed_jobs
+            )
+            while not self.all_completed():
+                if self.cancel_event.is_set():
+                    self.cancel_running()
+                    return
+                # Monitor running jobs & launch waiting ones into free slots
+                for job in self.step():
+                    # Update the rich progress bar after job completed
+                    # (Total grows as streamed job specs are pulled)
+                    progress.update(task, advance=1, total=self.num_total_jobs)
+
+                    # Update the slack progress bar
+                    if (
+                        self.use_slack_bot
+                        and self.slack_user_name is not None
+                        and self.slack_auth_token is not None
+                    ):
+                        try:
+                            slackbot.update_pbar()
+                        except Exception:
+                            pass
+
+                    # Update the protocol db progress bar
+                    if self.protocol_db is not None:
+                        self.protocol_db.update_progress_bar()
+
+        self.finish()
+
+    def finish(self) -> None:
+        """Pull remote results & merge logs once all jobs completed."""
+        if self.finished:
+            return
+        self.finished = True
         self.logger.info(
             "Completed: {} - {}/{} Jobs".format(
                 self.resource_to_run, self.num_total_jobs, self.num_total_jobs
@@ -341,9 +710,141 @@ class MLEQueue(object):
                 f"Merged seeds for log directories - {self.mle_log_dirs}"
             )
 
-    def launch(self, queue_counter):
-        """Launch a set of jobs for one configuration - one for each seed."""
-        # 1. Instantiate the experiment class and start a single seed
+    def cancel(self) -> None:
+        """Stop running queue - running jobs are cancelled by `run`."""
+        self.cancel_event.set()
+
+    def cancel_running(self) -> None:
+        """Cancel running jobs - they are rerun if the queue is resumed."""
+        for i, job in list(self.running.items()):
+            job["job"].cancel(job["job_id"])
+            with self.lock:
+                del self.running[i]
+                job["status"], job["job_id"] = -1, None
+                self.num_running_jobs -= 1
+                self.num_pending += 1
+            self.journal_update(i, job)
+        self.logger.info(
+            "Cancelled: {} - {}/{} Jobs completed".format(
+                self.resource_to_run, self.num_completed_jobs, self.num_total_jobs
+            )
+        )
+
+    def launch_wave(
+        self, num_jobs: int, time_between_launches: float = 0.1
+    ) -> None:
+        """Launch the next `num_jobs` jobs & update the queue bookkeeping."""
+        if num_jobs <= 0:
+            return
+        queue_counters = self.next_pending(num_jobs)
+        # GCP VMs of one wave are created concurrently & awaited together
+        if self.resource_to_run == "gcp-cloud" and num_jobs > 1:
+            launched = self.launch_gcp_batch(queue_counters)
+        else:
+            admitted = []
+            for queue_counter in queue_counters:
+                # Only launch local jobs whose resources are available
+                resources = None
+                if self.resource_pool is not None:
+                    resources = self.resource_pool.try_acquire(self.job_arguments)
+                    if resources is None:
+                        break
+                admitted.append((queue_counter, resources))
+            launched = self.launch_admitted(admitted, time_between_launches)
+
+        # Bookkeeping in queue order - independent of launch completion order
+        self.record_launched(launched)
+
+    def launch_admitted(self, admitted: list, time_between_launches: float):
+        """Launch jobs one by one or on a thread pool (`launch_concurrency`)."""
+        if self.launch_concurrency <= 1 or len(admitted) <= 1:
+            launched = []
+            for queue_counter, resources in admitted:
+                launched.append(self.launch(queue_counter, resources))
+                time.sleep(time_between_launches)
+            return launched
+
+        # Slow submissions (e.g. SSH tunnels, cluster CLIs) overlap
+        num_workers = min(self.launch_concurrency, len(admitted))
+        launched, error = [], None
+        with ThreadPoolExecutor(num_workers) as executor:
+            futures = []
+            for queue_counter, resources in admitted:
+                futures.append(executor.submit(self.launch, queue_counter, resources))
+                time.sleep(time_between_launches)
+            for (queue_counter, resources), future in zip(admitted, futures):
+                try:
+                    job, job_id = future.result()
+                except Exception as e:
+                    # Free reservation of job which failed to launch
+                    if resources is not None:
+                        self.resource_pool.release(resources)
+                    error = error or e
+                    continue
+                if error is None:
+                    launched.append((job, job_id))
+                else:
+                    # Keep queue order - cancel jobs launched after a failure
+                    job.cancel(job_id)
+        if error is not None:
+            self.record_launched(launched)
+            raise error
+        return launched
+
+    def record_launched(self, launched: list) -> None:
+        """Store launched jobs & ids in queue order (next pending entries)."""
+        for job, job_id in launched:
+            with self.lock:
+                self.queue_counter = self.next_pending(1)[0]
+                entry = self.queue[self.queue_counter]
+                entry.update(job=job, job_id=job_id, status=1)
+                self.running[self.queue_counter] = entry
+                self.num_running_jobs += 1
+                self.num_pending -= 1
+                i = self.queue_counter
+                self.queue_counter += 1
+            self.journal_update(i, entry)
+
+    def next_pending(self, num_jobs: int) -> List[int]:
+        """Indices of next jobs to launch (skips jobs restored by resume)."""
+        queue_counters, i = [], self.queue_counter
+        while len(queue_counters) < num_jobs and i < self.num_total_jobs:
+            # Completed entries of a spilling queue are no longer stored
+            spilled = self.spill_completed and i not in self.queue
+            if not spilled and self.queue[i]["status"] == -1:
+                queue_counters.append(i)
+            i += 1
+        return queue_counters
+
+    def launch_gcp_batch(self, queue_counters: List[int]):
+        """Launch a wave of GCP jobs with one concurrent VM creation call."""
+        jobs = [self.create_job(i) for i in queue_counters]
+        job_ids = submit_gcp_batch(
+            [job.job_filename for job in jobs],
+            [job.cmd_line_args for job in jobs],
+            self.experiment_dir,
+            [job.job_arguments for job in jobs],
+            self.cloud_settings,
+            self.cloud_status_cache,
+        )
+        for job, job_id in zip(jobs, job_ids):
+            job.job_status = int(job_id != -1)
+            if job.job_status == 1:
+                self.logger.info(
+                    f"VM Name: {job_id} - Cloud job scheduled"
+                    f" - {job.config_filename}"
+                )
+            else:
+                self.logger.info(
+                    f"VM Name: {job_id} - Error when scheduling "
+                    f"cloud job - {job.config_filename}"
+                )
+        return list(zip(jobs, job_ids))
+
+    def create_job(
+        self, queue_counter: int, resources: Union[dict, None] = None
+    ) -> MLEJob:
+        """Instantiate the experiment class for a single queue entry."""
         job = MLEJob(
             self.resource_to_run,
             self.job_filename,
@@ -356,7 +857,18 @@ class MLEQueue(object):
             self.debug_mode,
             self.cloud_settings,
             self.ssh_settings,
+            cloud_status_cache=self.cloud_status_cache,
+            resource_pool=self.resource_pool,
+            context=self.job_context,
         )
+        # Resources already reserved by queue admission
+        job.resources = resources
+        return job
+
+    def launch(self, queue_counter: int, resources: Union[dict, None] = None):
+        """Launch a set of jobs for one configuration - one for each seed."""
+        # 1. Instantiate the experiment class and start a single seed
+        job = self.create_job(queue_counter, resources)
 
         # 2. Launch a single experiment
         job_id = job.schedule()
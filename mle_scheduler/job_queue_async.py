@@ -0,0 +1,324 @@
+import os
+import asyncio
+from mle_scheduler.job import cluster_resources
+from mle_scheduler.job_queue import MLEQueue
+from mle_scheduler.local.async_local import submit_local_async
+from mle_scheduler.cluster.async_cluster import (
+    submit_cluster_async,
+    list_cluster_jobs_async,
+    cancel_cluster_async,
+)
+from mle_scheduler.cloud.gcp.async_gcp import (
+    submit_gcp_async,
+    list_gcp_vms_async,
+    check_completion_marker_async,
+    delete_gcp_vm_async,
+)
+from mle_scheduler.cloud.gcp.status_cache_gcp import (
+    running_vm_states,
+    running_tpu_states,
+)
+from mle_scheduler.ssh.async_ssh import (
+    connect_ssh_async,
+    submit_ssh_async,
+    list_ssh_pids_async,
+    cancel_ssh_async,
+)
+
+
+class AsyncMLEQueue(MLEQueue):
+    """
+    asyncio counterpart of MLEQueue - submission, monitoring & clean up are
+    coroutines driven by one event loop. Status checks of running jobs are
+    batched into one squeue/qstat/gcloud/ps call per `check_interval` for
+    the whole queue. Streamed `job_specs` & `add_jobs` are pulled as slots
+    free up. Use `await queue.run()` (or `queue.run_sync()`).
+    """
+
+    def __init__(self, *args, check_interval: float = 5, **kwargs):
+        super().__init__(*args, **kwargs)
+        if callable(self.job_filename):
+            raise ValueError("AsyncMLEQueue only runs .py/.sh job files.")
+        self.check_interval = check_interval  # secs between status checks
+        self.waiting = {}  # str(job_id) -> [queue entry, future of status]
+        self.ssh_conn = None
+        self.user_name = self.job_context["user_name"]
+
+    def run_sync(self) -> None:
+        """Run queue in a fresh event loop (blocking)."""
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self.run())
+        finally:
+            loop.close()
+
+    async def run(self) -> None:
+        """Schedule & monitor all jobs concurrently -> merge logs."""
+        if self.resource_to_run == "ssh-node":
+            self.ssh_conn = await connect_ssh_async(self.ssh_settings)
+        poller = None
+        if self.resource_to_run != "local":
+            poller = asyncio.ensure_future(self.poll_status())
+        # Reattached jobs of a resumed queue are awaited first
+        tasks = set(
+            asyncio.ensure_future(self.run_entry(i)) for i in list(self.running)
+        )
+        try:
+            while True:
+                # At most `max_running_jobs` jobs are launched/running at once
+                # Streamed job specs are pulled as slots free up
+                num_free = self.max_running_jobs - len(tasks)
+                for i in self.next_pending(self.pull_jobs(num_free)):
+                    with self.lock:
+                        self.queue_counter = i + 1
+                        self.num_pending -= 1
+                    tasks.add(asyncio.ensure_future(self.run_entry(i)))
+                if len(tasks) == 0:
+                    break
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    task.result()
+            self.all_completed()
+        finally:
+            # On error/cancellation: stop remaining jobs & wait for clean up
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if poller is not None:
+                poller.cancel()
+            if self.ssh_conn is not None:
+                self.ssh_conn.close()
+        # Pull remote results & merge logs (one-off blocking transfers)
+        await asyncio.get_event_loop().run_in_executor(None, self.finish)
+
+    async def run_entry(self, i: int) -> None:
+        """Launch (unless reattached), wait & clean up a single queue entry."""
+        entry = self.queue[i]
+        if entry["status"] != 1:
+            await self.launch_async(i)
+        try:
+            status = await self.wait_async(entry)
+            # Relaunch preempted VM (resume signal via MLE_RESUME=1)
+            while status == 2 and entry["job"].can_resubmit:
+                await self.resubmit_async(i, entry)
+                status = await self.wait_async(entry)
+        except asyncio.CancelledError:
+            await self.cancel_async(entry)
+            raise
+        with self.lock:
+            del self.running[i]
+            self.num_completed_jobs += 1
+            self.num_running_jobs -= 1
+            entry["status"] = 0
+        self.journal_update(i, entry)
+        if not self.debug_mode:
+            await self.clean_up_async(entry)
+        if self.spill_completed:
+            self.spill(i)
+        if self.protocol_db is not None:
+            self.protocol_db.update_progress_bar()
+        self.logger.info(
+            f"Completed: {self.num_completed_jobs}/{self.num_total_jobs} Jobs"
+        )
+
+    async def launch_async(self, i: int) -> None:
+        """Create job of queue entry & submit it via backend coroutine."""
+        entry = self.queue[i]
+        resources = None
+        if self.resource_pool is not None:
+            resources = self.resource_pool.try_acquire(self.job_arguments)
+            while resources is None:
+                await asyncio.sleep(0.1)
+                resources = self.resource_pool.try_acquire(self.job_arguments)
+        job = self.create_job(i, resources)
+        entry["job"] = job
+        entry["job_id"] = await self.submit_async(job)
+        job.job_id, job.job_status = entry["job_id"], 1
+        with self.lock:
+            entry["status"] = 1
+            self.running[i] = entry
+            self.num_running_jobs += 1
+        self.journal_update(i, entry)
+
+    async def submit_async(self, job):
+        """Submit job to backend - returns process, job id, VM name or PID."""
+        if self.resource_to_run == "local":
+            if job.job_arguments.get("use_forkserver", False) or (
+                job.job_arguments.get("resource_sample_interval") is not None
+            ):
+                # Forkserver & resource sampling use the blocking launch path
+                return await asyncio.get_event_loop().run_in_executor(
+                    None, job.schedule_local
+                )
+            proc = await submit_local_async(
+                job.job_filename,
+                job.cmd_line_args,
+                job.job_arguments,
+                job.get_log_settings(),
+                job.get_env_vars(),
+                job.get_cpus(),
+            )
+            return proc
+        elif self.resource_to_run in cluster_resources:
+            return await submit_cluster_async(
+                self.resource_to_run,
+                job.job_filename,
+                job.cmd_line_args,
+                job.job_arguments,
+            )
+        elif self.resource_to_run == "gcp-cloud":
+            return await submit_gcp_async(
+                job.job_filename,
+                job.cmd_line_args,
+                job.experiment_dir,
+                job.job_arguments,
+                self.cloud_settings,
+                self.cloud_status_cache,
+            )
+        elif self.resource_to_run == "ssh-node":
+            return await submit_ssh_async(
+                self.ssh_conn,
+                job.job_filename,
+                job.cmd_line_args,
+                job.job_arguments,
+                self.ssh_settings,
+            )
+        raise ValueError(f"{self.resource_to_run} is not implemented.")
+
+    async def wait_async(self, entry: dict) -> int:
+        """Wait for job to exit - 0 if finished & 2 if VM was preempted."""
+        if entry["job_id"] == -1:
+            # Failed submission - nothing to wait for
+            return 0
+        if self.resource_to_run == "local":
+            job = entry["job"]
+            if isinstance(entry["job_id"], asyncio.subprocess.Process):
+                entry["exit_code"] = await entry["job_id"].wait()
+                job.release_resources()
+                return 0
+            # Process of blocking launch path - poll w/o blocking the loop
+            while job.monitor_local(entry["job_id"], False) == 1:
+                await asyncio.sleep(0.1)
+            entry["exit_code"] = job.exit_code
+            if job.sampler is not None:
+                entry["resource_usage"] = job.sampler.time_series
+                entry["resource_stats"] = job.sampler.stats
+            return 0
+        # Resolved by the batched status poller
+        future = asyncio.get_event_loop().create_future()
+        self.waiting[str(entry["job_id"])] = [entry, future]
+        return await future
+
+    async def poll_status(self) -> None:
+        """Check status of all waiting jobs with one backend call per tick."""
+        while True:
+            if len(self.waiting) > 0:
+                try:
+                    finished = await self.list_finished()
+                except Exception as e:
+                    # Surface backend errors in waiting jobs instead of hanging
+                    for entry, future in self.waiting.values():
+                        if not future.done():
+                            future.set_exception(e)
+                    self.waiting.clear()
+                    finished = {}
+                for job_id, status in finished.items():
+                    # Job may have been cancelled in the meantime
+                    entry, future = self.waiting.pop(job_id, (None, None))
+                    if future is not None and not future.done():
+                        future.set_result(status)
+            await asyncio.sleep(self.check_interval)
+
+    async def list_finished(self) -> dict:
+        """Get str(job_id) -> exit status of waiting jobs which are done."""
+        waiting = list(self.waiting.keys())
+        if self.resource_to_run in cluster_resources:
+            running = await list_cluster_jobs_async(
+                self.resource_to_run, self.user_name
+            )
+            if running is None:
+                return {}
+            return {job_id: 0 for job_id in waiting if job_id not in running}
+        elif self.resource_to_run == "ssh-node":
+            running = await list_ssh_pids_async(
+                self.ssh_conn, [int(job_id) for job_id in waiting]
+            )
+            return {
+                job_id: 0 for job_id in waiting if int(job_id) not in running
+            }
+        # GCP: VMs are listed via queue label (TPUs per zone)
+        finished = {}
+        for use_tpus in set(
+            self.waiting[job_id][0]["job"].job_arguments.get("use_tpus", 0)
+            for job_id in waiting
+        ):
+            vm_info = await list_gcp_vms_async(
+                use_tpus,
+                self.cloud_status_cache.queue_id,
+                self.cloud_status_cache.tpu_zones,
+            )
+            if vm_info is None:
+                continue
+            alive_states = running_tpu_states if use_tpus else running_vm_states
+            alive_states = alive_states + ["PROVISIONING"]
+            for job_id in waiting:
+                job = self.waiting[job_id][0]["job"]
+                if job.job_arguments.get("use_tpus", 0) != use_tpus:
+                    continue
+                info = vm_info.get(job_id)
+                if info is None or info["status"] not in alive_states:
+                    # VM gone/stopped - preempted if no completion marker
+                    done = await check_completion_marker_async(
+                        job_id, self.cloud_settings
+                    )
+                    # Marker state unknown - check again at next tick
+                    if done is not None:
+                        finished[job_id] = 0 if done else 2
+        return finished
+
+    async def resubmit_async(self, i: int, entry: dict) -> None:
+        """Delete preempted VM & launch job again (resume from checkpoint)."""
+        job = entry["job"]
+        await delete_gcp_vm_async(entry["job_id"], job.job_arguments)
+        num_preemptions = job.job_arguments.get("num_preemptions", 0) + 1
+        job.job_arguments["num_preemptions"] = num_preemptions
+        resume_flag = self.cloud_settings.get("resume_flag")
+        if resume_flag is not None and num_preemptions == 1:
+            job.cmd_line_args += f" -{resume_flag}"
+        entry["job_id"] = await self.submit_async(job)
+        job.job_id = entry["job_id"]
+        self.journal_update(i, entry)
+
+    async def cancel_async(self, entry: dict) -> None:
+        """Stop running job of queue entry (e.g. when run is cancelled)."""
+        job_id = entry["job_id"]
+        self.waiting.pop(str(job_id), None)
+        if job_id is None or job_id == -1:
+            return
+        if self.resource_to_run == "local":
+            if job_id.returncode is None:
+                job_id.terminate()
+            entry["job"].release_resources()
+        elif self.resource_to_run in cluster_resources:
+            await cancel_cluster_async(self.resource_to_run, job_id)
+        elif self.resource_to_run == "gcp-cloud":
+            await delete_gcp_vm_async(job_id, entry["job"].job_arguments)
+        elif self.resource_to_run == "ssh-node":
+            await cancel_ssh_async(self.ssh_conn, job_id)
+
+    async def clean_up_async(self, entry: dict) -> None:
+        """Delete VM of finished job (other resources: cheap file clean up)."""
+        if self.resource_to_run == "gcp-cloud":
+            if entry["job_id"] != -1:
+                await delete_gcp_vm_async(
+                    entry["job_id"], entry["job"].job_arguments
+                )
+            if entry["job"].delete_config:
+                try:
+                    os.remove(entry["job"].config_filename)
+                except Exception:
+                    pass
+        else:
+            entry["job"].clean_up(entry["job_id"])
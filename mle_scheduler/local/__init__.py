@@ -3,8 +3,13 @@ from .manage_local import (
     submit_conda,
     submit_local,
     submit_subprocess,
+    resolve_env,
     random_id,
 )
+from .forkserver_local import submit_forkserver, ForkserverProcess
+from .resources_local import LocalResourcePool, declares_resources
+from .sampler_local import ResourceSampler
+from .pool_local import submit_callable, get_callable_pool, CallablePool
 
 
 __all__ = [
@@ -12,5 +17,14 @@ __all__ = [
     "submit_conda",
     "submit_local",
     "submit_subprocess",
+    "resolve_env",
     "random_id",
+    "submit_forkserver",
+    "ForkserverProcess",
+    "LocalResourcePool",
+    "declares_resources",
+    "ResourceSampler",
+    "submit_callable",
+    "get_callable_pool",
+    "CallablePool",
 ]
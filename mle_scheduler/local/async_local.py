@@ -0,0 +1,80 @@
+import os
+import asyncio
+from typing import List, Tuple, Union
+from .manage_local import (
+    PYTHON_EXECUTABLE,
+    get_job_cmd,
+    resolve_env,
+    get_env,
+    pin_cpus_hook,
+)
+
+
+async def run_cmd_async(
+    cmd: List[str], stdin_fname: Union[str, None] = None
+) -> Tuple[int, bytes, bytes]:
+    """Run cmd as asyncio subprocess - return exit code, stdout & stderr."""
+    stdin = asyncio.subprocess.DEVNULL
+    if stdin_fname is not None:
+        stdin = open(stdin_fname, "rb")
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=stdin,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    finally:
+        if stdin_fname is not None:
+            stdin.close()
+    out, err = await proc.communicate()
+    return proc.returncode, out, err
+
+
+def local_python_env(job_arguments: dict) -> Tuple[str, tuple]:
+    """Python executable & activation env variables of conda/venv job."""
+    env_name = job_arguments.get("env_name")
+    if job_arguments.get("use_conda_venv", False):
+        current_env = os.environ.get("CONDA_PREFIX")
+        if not (
+            env_name is None
+            or current_env is None
+            or env_name in [current_env, os.path.basename(current_env)]
+        ):
+            return resolve_env(env_name, use_conda=True)
+    elif job_arguments.get("use_venv_venv", False):
+        return resolve_env(env_name, use_conda=False)
+    return PYTHON_EXECUTABLE, ()
+
+
+async def submit_local_async(
+    filename: str,
+    cmd_line_arguments: str,
+    job_arguments: dict,
+    log_settings: Union[dict, None] = None,
+    env_vars: Union[dict, None] = None,
+    cpus: Union[List[int], None] = None,
+) -> asyncio.subprocess.Process:
+    """Launch local .py/.sh job as asyncio subprocess (output to log files)."""
+    python_executable, env_activate = local_python_env(job_arguments)
+    cmd = get_job_cmd(filename, cmd_line_arguments, python_executable)
+    log_fname = None if log_settings is None else log_settings["log_fname"]
+    if log_fname is None:
+        stdout = stderr = asyncio.subprocess.DEVNULL
+    else:
+        os.makedirs(os.path.dirname(log_fname) or ".", exist_ok=True)
+        stdout, stderr = open(log_fname + ".log", "ab"), open(log_fname + ".err", "ab")
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=stdout,
+            stderr=stderr,
+            env=get_env(env_activate, env_vars),
+            preexec_fn=pin_cpus_hook(cpus),
+        )
+    finally:
+        # Child process holds its own copy of the log file descriptors
+        if log_fname is not None:
+            stdout.close()
+            stderr.close()
+    return proc
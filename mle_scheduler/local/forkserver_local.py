@@ -0,0 +1,237 @@
+import os
+import sys
+import time
+import runpy
+import shlex
+import atexit
+import importlib
+import threading
+import multiprocessing as mp
+from multiprocessing import util  # noqa: F401 - registers its atexit hook first
+from typing import List, Union
+from .log_stream_local import read_log_tail
+
+
+# Servers are shared by all local jobs of a Python session - one server per
+# set of preloaded modules. Idle servers of another set are stopped.
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def run_script(
+    filename: str,
+    argv: List[str],
+    log_fname: Union[str, None] = None,
+    env_vars: Union[dict, None] = None,
+    cpus: Union[List[int], None] = None,
+    cwd: Union[str, None] = None,
+) -> None:
+    """Run python script as `__main__` inside of forked worker process."""
+    # Modules preloaded by the server already sized their thread pools -
+    # thread env variables only affect modules imported by the job itself
+    os.environ.update(env_vars or {})
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    if cwd is not None:
+        os.chdir(cwd)
+    # Redirect stdout/stderr file descriptors to per-job log files
+    if log_fname is not None:
+        os.makedirs(os.path.dirname(log_fname) or ".", exist_ok=True)
+        for stream, ext in [(sys.stdout, ".log"), (sys.stderr, ".err")]:
+            stream.flush()
+            fd = os.open(log_fname + ext, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+            os.dup2(fd, stream.fileno())
+            os.close(fd)
+    script_path = os.path.abspath(filename)
+    sys.argv = [filename] + argv
+    sys.path.insert(0, os.path.dirname(script_path))
+    runpy.run_path(script_path, run_name="__main__")
+
+
+def serve(preload_modules: List[str], conn) -> None:
+    """Server loop - fork jobs from warm interpreter & report exit codes."""
+    for module in preload_modules:
+        importlib.import_module(module)
+    fork_context = mp.get_context("fork")
+    jobs = {}
+    while True:
+        try:
+            cmd, args = conn.recv()
+        except EOFError:
+            break
+        try:
+            if cmd == "start":
+                process = fork_context.Process(target=run_script, args=args)
+                process.start()
+                jobs[process.pid] = process
+                reply = process.pid
+            elif cmd == "poll":
+                reply = jobs[args].exitcode
+            elif cmd == "terminate":
+                reply = jobs[args].terminate()
+            elif cmd == "kill":
+                reply = jobs[args].kill()
+            elif cmd == "close":
+                # Release sentinel of finished process
+                reply = jobs.pop(args).close()
+            elif cmd == "num_alive":
+                reply = sum(job.exitcode is None for job in jobs.values())
+            else:
+                # Stop - running jobs are joined before the server exits
+                conn.send(None)
+                break
+        except Exception as e:
+            reply = e
+        conn.send(reply)
+
+
+class PreloadServer(object):
+    """Process which imports `preload_modules` once & forks jobs from it."""
+
+    def __init__(self, preload_modules: List[str]):
+        self.preload_modules = preload_modules
+        # Spawned (not forked) - server does not inherit threads/locks
+        context = mp.get_context("spawn")
+        self.conn, server_conn = context.Pipe()
+        self.process = context.Process(
+            target=serve, args=(preload_modules, server_conn)
+        )
+        self.process.start()
+        server_conn.close()
+        self.lock = threading.Lock()
+
+    def request(self, cmd: str, args=None):
+        """Send command to server & return its reply (errors are raised)."""
+        with self.lock:
+            self.conn.send((cmd, args))
+            reply = self.conn.recv()
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def stop(self) -> None:
+        """Stop server once its running jobs finished."""
+        if self.process.is_alive():
+            self.request("stop")
+        self.process.join()
+        self.conn.close()
+
+
+def get_forkserver(preload_modules: Union[List[str], None] = None):
+    """Get (or start) server which pre-imports the given modules once."""
+    if "fork" not in mp.get_all_start_methods():
+        raise ValueError(
+            "Forking jobs is not available on this platform."
+            " Please set `use_forkserver` to False."
+        )
+    key = tuple(sorted(set(preload_modules or [])))
+    with _servers_lock:
+        # Stop idle servers of other preload sets
+        for other_key, server in list(_servers.items()):
+            if other_key != key and server.request("num_alive") == 0:
+                server.stop()
+                del _servers[other_key]
+        if key not in _servers:
+            _servers[key] = PreloadServer(list(key))
+        return _servers[key]
+
+
+@atexit.register
+def stop_forkservers() -> None:
+    """Stop all servers (before multiprocessing joins its children)."""
+    with _servers_lock:
+        for server in _servers.values():
+            server.stop()
+        _servers.clear()
+
+
+class ForkserverProcess(object):
+    """Popen-like handle of a job forked from a warm server."""
+
+    def __init__(
+        self, server: PreloadServer, pid: int, log_settings: Union[dict, None] = None
+    ):
+        self.server = server
+        self.pid = pid
+        self.log_settings = log_settings
+        self.exitcode = None  # Kept once job finished
+        self.closed = False
+
+    @property
+    def returncode(self) -> Union[int, None]:
+        return self.poll()
+
+    def poll(self) -> Union[int, None]:
+        """Return exit code if job finished & None otherwise."""
+        if self.exitcode is None:
+            self.exitcode = self.server.request("poll", self.pid)
+        return self.exitcode
+
+    def wait(self, timeout: Union[float, None] = None) -> Union[int, None]:
+        """Wait for job to finish & return exit code."""
+        end_time = None if timeout is None else time.time() + timeout
+        while self.poll() is None:
+            if end_time is not None and time.time() >= end_time:
+                break
+            time.sleep(0.05)
+        return self.exitcode
+
+    def close(self) -> None:
+        """Release process handle of finished job in the server."""
+        if not self.closed and self.poll() is not None:
+            self.server.request("close", self.pid)
+            self.closed = True
+
+    def communicate(self):
+        """Wait for job & return tails of stdout/stderr log files."""
+        self.wait()
+        if self.log_settings is None or self.log_settings["log_fname"] is None:
+            return None, None
+        return tuple(
+            read_log_tail(
+                self.log_settings["log_fname"] + ext,
+                self.log_settings.get("tail_lines", 100),
+            )
+            for ext in [".log", ".err"]
+        )
+
+    def terminate(self) -> None:
+        if self.poll() is None:
+            self.server.request("terminate", self.pid)
+
+    def kill(self) -> None:
+        if self.poll() is None:
+            self.server.request("kill", self.pid)
+
+
+def submit_forkserver(
+    filename: str,
+    cmd_line_arguments: str,
+    job_arguments: dict,
+    log_settings: Union[dict, None] = None,
+    env_vars: Union[dict, None] = None,
+    cpus: Union[List[int], None] = None,
+) -> ForkserverProcess:
+    """
+    Fork a python job from server with pre-imported modules. Output is
+    appended to the `log_settings` log files (no rotation) if provided.
+    """
+    f_name, f_extension = os.path.splitext(filename)
+    if f_extension != ".py":
+        raise ValueError(
+            f"Script with {f_extension} cannot be run via forkserver."
+            " Only .py experiments can be forked from a warm interpreter."
+        )
+    server = get_forkserver(job_arguments.get("preload_modules", []))
+    pid = server.request(
+        "start",
+        (
+            filename,
+            shlex.split(cmd_line_arguments),
+            None if log_settings is None else log_settings["log_fname"],
+            env_vars,
+            cpus,
+            os.getcwd(),
+        ),
+    )
+    return ForkserverProcess(server, pid, log_settings)
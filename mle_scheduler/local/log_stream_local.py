@@ -0,0 +1,125 @@
+import os
+import gzip
+import shutil
+import threading
+import subprocess as sp
+from collections import deque
+from typing import List, Union
+
+
+class LogStreamer(object):
+    """Drain a job output pipe into a (rotated) log file in the background."""
+
+    def __init__(
+        self,
+        stream,
+        log_fname: Union[str, None] = None,
+        max_bytes: Union[int, None] = None,
+        backup_count: int = 3,
+        compress: bool = True,
+        tail_lines: int = 100,
+    ):
+        self.stream = stream
+        self.log_fname = log_fname
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        # Bounded tail of output lines kept in memory for error reporting
+        self.tail = deque(maxlen=tail_lines)
+        self.log_file = None
+        if self.log_fname is not None:
+            os.makedirs(os.path.dirname(self.log_fname) or ".", exist_ok=True)
+            self.log_file = open(self.log_fname, "ab", buffering=0)
+        self.thread = threading.Thread(target=self.pump, daemon=True)
+        self.thread.start()
+
+    def pump(self) -> None:
+        """Read output line by line until the job closes the pipe."""
+        try:
+            for line in iter(self.stream.readline, b""):
+                self.tail.append(line)
+                if self.log_file is not None:
+                    self.log_file.write(line)
+                    if self.max_bytes is not None:
+                        if self.log_file.tell() >= self.max_bytes:
+                            self.rotate()
+        finally:
+            self.stream.close()
+            if self.log_file is not None:
+                self.log_file.close()
+
+    def rotate(self) -> None:
+        """Shift backups (log.1 -> log.2, ...) & start a fresh log file."""
+        self.log_file.close()
+        ext = ".gz" if self.compress else ""
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.log_fname}.{i}{ext}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.log_fname}.{i + 1}{ext}")
+        if self.backup_count > 0:
+            if self.compress:
+                with open(self.log_fname, "rb") as f_in:
+                    with gzip.open(f"{self.log_fname}.1.gz", "wb") as f_out:
+                        shutil.copyfileobj(f_in, f_out)
+            else:
+                os.replace(self.log_fname, f"{self.log_fname}.1")
+        self.log_file = open(self.log_fname, "wb", buffering=0)
+
+    def join(self, timeout: Union[float, None] = None) -> None:
+        self.thread.join(timeout)
+
+    def get_tail(self) -> bytes:
+        return b"".join(self.tail)
+
+
+class LoggedPopen(sp.Popen):
+    """Popen whose stdout/stderr are streamed to per-job log files."""
+
+    def __init__(
+        self,
+        cmd: Union[str, List[str]],
+        log_fname: Union[str, None] = None,
+        max_bytes: Union[int, None] = None,
+        backup_count: int = 3,
+        compress: bool = True,
+        tail_lines: int = 100,
+        **kwargs,
+    ):
+        super().__init__(cmd, stdout=sp.PIPE, stderr=sp.PIPE, **kwargs)
+        self.streamers = [
+            LogStreamer(
+                stream,
+                None if log_fname is None else log_fname + ext,
+                max_bytes,
+                backup_count,
+                compress,
+                tail_lines,
+            )
+            for stream, ext in [(self.stdout, ".log"), (self.stderr, ".err")]
+        ]
+        self.tails = None  # Output tails kept once streamers are released
+
+    def communicate(self, input=None, timeout: Union[float, None] = None):
+        """Wait for job & return tails of stdout/stderr (pipes are drained)."""
+        self.wait(timeout)
+        if self.tails is not None:
+            return self.tails
+        for streamer in self.streamers:
+            streamer.join()
+        return tuple(streamer.get_tail() for streamer in self.streamers)
+
+    def close(self) -> None:
+        """Release pipes, log files & reader threads of finished job."""
+        if self.tails is None:
+            self.tails = self.communicate()
+            self.streamers = []
+
+
+def read_log_tail(fname: str, tail_lines: int = 100) -> bytes:
+    """Read last lines of a log file (w/o loading the full file)."""
+    if not os.path.exists(fname):
+        return b""
+    with open(fname, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 200 * tail_lines))
+        return b"".join(f.readlines()[-tail_lines:])
@@ -4,44 +4,123 @@ import string
 import shlex
 import subprocess as sp
 import sys
+import json
+import time
+import functools
+from typing import List, Dict, Tuple, Union
+from .log_stream_local import LoggedPopen
 
 PYTHON_EXECUTABLE = (
     sys.executable
 )  # local executable Python file (more reliable than `python`)
 
 
-def submit_conda(
-    filename: str,
-    cmd_line_arguments: str,
-    job_arguments: dict,
-    debug: bool = True,
-):
-    """Create a local job & submit it based on provided file to execute."""
+def get_job_cmd(
+    filename: str, cmd_line_arguments: str, python_executable: str
+) -> List[str]:
+    """Construct argv list of .py/.sh job (executed w/o shell)."""
     f_name, f_extension = os.path.splitext(filename)
     if f_extension == ".py":
-        cmd = f"{PYTHON_EXECUTABLE} {filename} {cmd_line_arguments}"
+        cmd = [python_executable, filename]
     elif f_extension == ".sh":
-        cmd = f"bash {filename} {cmd_line_arguments}"
+        cmd = ["bash", filename]
     else:
         raise ValueError(
             f"Script with {f_extension} cannot be handled"
             " by mle-launcher. Only base .py, .sh experiments"
             " are so far implemented. Please open an issue."
         )
+    return cmd + shlex.split(cmd_line_arguments)
+
+
+@functools.lru_cache(maxsize=None)
+def conda_env_prefixes() -> Dict[str, str]:
+    """Get prefix paths of all conda envs (single `conda info` call)."""
+    out = sp.run(
+        ["conda", "info", "--json"], stdout=sp.PIPE, stderr=sp.DEVNULL, check=True
+    )
+    conda_info = json.loads(out.stdout.decode("utf-8"))
+    env_prefixes = {"base": conda_info["root_prefix"]}
+    for env_prefix in conda_info["envs"]:
+        if env_prefix != conda_info["root_prefix"]:
+            env_prefixes[os.path.basename(env_prefix)] = env_prefix
+    return env_prefixes
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_env(env_name: str, use_conda: bool = True) -> Tuple[str, tuple]:
+    """Resolve python executable & env variables of conda/venv env once."""
+    if use_conda:
+        if os.path.isdir(env_name):
+            env_prefix = env_name
+        else:
+            try:
+                env_prefix = conda_env_prefixes()[env_name]
+            except KeyError:
+                raise ValueError(f"Conda environment {env_name} not found.")
+        env_vars = {"CONDA_PREFIX": env_prefix, "CONDA_DEFAULT_ENV": env_name}
+    else:
+        env_prefix = os.path.join(os.environ["WORKON_HOME"], env_name)
+        env_vars = {"VIRTUAL_ENV": env_prefix}
+    python_executable = os.path.join(env_prefix, "bin", "python")
+    if not os.path.exists(python_executable):
+        raise ValueError(f"No python executable found in {env_prefix}.")
+    env_vars["PATH"] = os.pathsep.join(
+        [os.path.join(env_prefix, "bin"), os.environ.get("PATH", "")]
+    )
+    return python_executable, tuple(env_vars.items())
 
-    try:
-        env_name = job_arguments["env_name"]
-        current_env = os.environ["CONDA_PREFIX"]
-        if current_env != env_name:
-            # activate the correct conda environment
-            cmd = (
-                "source $(conda info --base)/etc/profile.d/conda.sh           "
-                f"          && conda activate {env_name}                     &&"
-                f" {cmd}"
-            )
-    except Exception:
-        pass
-    proc = submit_subprocess(cmd, debug)
+
+def get_env(
+    env_vars: tuple = (), job_env_vars: Union[dict, None] = None
+) -> Union[dict, None]:
+    """Apply activation & job env variables to copy of current environment."""
+    if len(env_vars) == 0 and not job_env_vars:
+        return None
+    env = os.environ.copy()
+    if len(env_vars) > 0:
+        env.pop("PYTHONHOME", None)
+    env.update(dict(env_vars))
+    env.update(job_env_vars or {})
+    return env
+
+
+def submit_conda(
+    filename: str,
+    cmd_line_arguments: str,
+    job_arguments: dict,
+    debug: bool = True,
+    log_settings: Union[dict, None] = None,
+    env_vars: Union[dict, None] = None,
+    cpus: Union[List[int], None] = None,
+):
+    """Create a local job & submit it based on provided file to execute."""
+    env_name = job_arguments.get("env_name")
+    current_env = os.environ.get("CONDA_PREFIX")
+    if (
+        env_name is None
+        or current_env is None
+        or env_name in [current_env, os.path.basename(current_env)]
+    ):
+        cmd = get_job_cmd(filename, cmd_line_arguments, PYTHON_EXECUTABLE)
+        return submit_subprocess(
+            cmd,
+            debug,
+            get_env(job_env_vars=env_vars),
+            log_settings=log_settings,
+            cpus=cpus,
+        )
+
+    # Run env's python directly instead of sourcing conda.sh & activating
+    python_executable, env_activate = resolve_env(env_name, use_conda=True)
+    cmd = get_job_cmd(filename, cmd_line_arguments, python_executable)
+    proc = submit_subprocess(
+        cmd,
+        debug,
+        get_env(env_activate, env_vars),
+        log_settings=log_settings,
+        cpus=cpus,
+    )
     return proc
 
 
@@ -50,36 +129,89 @@ def submit_venv(
     cmd_line_arguments: str,
     job_arguments: dict,
     debug: bool = True,
+    log_settings: Union[dict, None] = None,
+    env_vars: Union[dict, None] = None,
+    cpus: Union[List[int], None] = None,
 ):
     """Create a local job & submit it based on provided file to execute."""
-    cmd = f"{PYTHON_EXECUTABLE} {filename} {cmd_line_arguments}"
     env_name = job_arguments["env_name"]
-    command_template = '/bin/bash -c "source {}/{}/bin/activate && {}"'
-    cmd = shlex.split(
-        command_template.format(os.environ["WORKON_HOME"], env_name, cmd)
+    python_executable, env_activate = resolve_env(env_name, use_conda=False)
+    cmd = get_job_cmd(filename, cmd_line_arguments, python_executable)
+    proc = submit_subprocess(
+        cmd,
+        debug,
+        get_env(env_activate, env_vars),
+        log_settings=log_settings,
+        cpus=cpus,
     )
-    proc = submit_subprocess(cmd, debug)
     return proc
 
 
-def submit_local(filename: str, cmd_line_arguments: str, debug: bool = True):
+def submit_local(
+    filename: str,
+    cmd_line_arguments: str,
+    debug: bool = True,
+    log_settings: Union[dict, None] = None,
+    env_vars: Union[dict, None] = None,
+    cpus: Union[List[int], None] = None,
+):
     """Create a local job & submit it based on provided file to execute."""
-    cmd = f"{PYTHON_EXECUTABLE} {filename} {cmd_line_arguments}"
-    proc = submit_subprocess(cmd, debug)
+    cmd = get_job_cmd(filename, cmd_line_arguments, PYTHON_EXECUTABLE)
+    proc = submit_subprocess(
+        cmd,
+        debug,
+        get_env(job_env_vars=env_vars),
+        log_settings=log_settings,
+        cpus=cpus,
+    )
     return proc
 
 
-def submit_subprocess(cmd: str, debug: bool = True) -> sp.Popen:
-    """Submit a subprocess & return the process."""
-    # Pipe stdout & stderr to separate files.
-    # if debug:
-    #     cmd += " 2>>err.err 1>>log.txt"
-    while True:
+def pin_cpus_hook(cpus: Union[List[int], None] = None):
+    """Child hook which pins job to its cores before exec (no launch race)."""
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return None
+    return functools.partial(os.sched_setaffinity, 0, cpus)
+
+
+def submit_subprocess(
+    cmd: Union[str, List[str]],
+    debug: bool = True,
+    env: Union[dict, None] = None,
+    max_retries: int = 5,
+    log_settings: Union[dict, None] = None,
+    cpus: Union[List[int], None] = None,
+) -> sp.Popen:
+    """
+    Submit a subprocess & return the process. Shell only for str cmds.
+    With `log_settings` stdout/stderr are streamed to (rotated) log files.
+    """
+    preexec_fn = pin_cpus_hook(cpus)
+    for attempt in range(max_retries):
         try:
-            proc = sp.Popen(cmd, shell=True, stdout=sp.PIPE, stderr=sp.PIPE)
+            if log_settings is not None:
+                proc = LoggedPopen(
+                    cmd,
+                    shell=isinstance(cmd, str),
+                    env=env,
+                    preexec_fn=preexec_fn,
+                    **log_settings,
+                )
+            else:
+                proc = sp.Popen(
+                    cmd,
+                    shell=isinstance(cmd, str),
+                    stdout=sp.PIPE,
+                    stderr=sp.PIPE,
+                    env=env,
+                    preexec_fn=preexec_fn,
+                )
             break
-        except Exception:
-            continue
+        except OSError:
+            # E.g. temporarily out of process slots/file handles
+            if attempt == max_retries - 1:
+                raise
+            time.sleep(0.1 * 2 ** attempt)
     return proc
 
 
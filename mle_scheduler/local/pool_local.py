@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import traceback
+import multiprocessing as mp
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Union
+
+
+class CallablePool(object):
+    """
+    Process pool which executes callable jobs. Workers are recycled after
+    `max_tasks_per_child` tasks (native on Python 3.11+, otherwise by
+    rotating to a fresh executor once all workers would have been used up).
+    """
+
+    def __init__(
+        self,
+        max_workers: Union[int, None] = None,
+        start_method: Union[str, None] = None,
+        max_tasks_per_child: Union[int, None] = None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self.max_tasks_per_child = max_tasks_per_child
+        self.native_recycling = sys.version_info >= (3, 11)
+        self.lock = threading.Lock()
+        self.executor, self.num_submitted = None, 0
+
+    def create_executor(self) -> ProcessPoolExecutor:
+        kwargs = {"max_workers": self.max_workers}
+        if self.start_method is not None:
+            kwargs["mp_context"] = mp.get_context(self.start_method)
+        if self.max_tasks_per_child is not None and self.native_recycling:
+            kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+        return ProcessPoolExecutor(**kwargs)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Submit callable to pool & return its future."""
+        with self.lock:
+            if self.executor is None:
+                self.executor = self.create_executor()
+            elif (
+                self.max_tasks_per_child is not None
+                and not self.native_recycling
+                and self.num_submitted >= self.max_tasks_per_child * self.max_workers
+            ):
+                # Old workers finish their pending tasks & exit afterwards
+                self.executor.shutdown(wait=False)
+                self.executor, self.num_submitted = self.create_executor(), 0
+            self.num_submitted += 1
+            return self.executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=wait)
+                self.executor = None
+
+
+class CallableProcess(object):
+    """Popen-like handle of a callable job running on a process pool."""
+
+    pid = None
+
+    def __init__(self, future: Future):
+        self.future = future
+
+    @property
+    def returncode(self) -> Union[int, None]:
+        if not self.future.done():
+            return None
+        if self.future.cancelled():
+            return 1
+        return int(self.future.exception() is not None)
+
+    def poll(self) -> Union[int, None]:
+        """Return 0/1 if job succeeded/failed & None if still running."""
+        return self.returncode
+
+    def wait(self, timeout: Union[float, None] = None) -> Union[int, None]:
+        """Wait for job to finish & return exit code."""
+        try:
+            self.future.exception(timeout)
+        except FutureTimeoutError:
+            pass
+        return self.returncode
+
+    def terminate(self) -> None:
+        """Cancel job if it has not started (running callables finish)."""
+        self.future.cancel()
+
+    def communicate(self):
+        """Wait for job & return its traceback as error message."""
+        self.wait()
+        if self.future.cancelled():
+            return b"", b"Job cancelled"
+        err = self.future.exception()
+        if err is None:
+            return b"", b""
+        tb = "".join(traceback.format_exception(type(err), err, err.__traceback__))
+        return b"", tb.encode("utf-8")
+
+    @property
+    def result(self) -> Any:
+        """Return value of callable (None if it failed)."""
+        if self.returncode != 0:
+            return None
+        return self.future.result()
+
+
+# Pools are shared by all callable jobs with the same pool settings
+_callable_pools = {}
+_callable_pools_lock = threading.Lock()
+
+
+def get_callable_pool(
+    max_workers: Union[int, None] = None,
+    start_method: Union[str, None] = None,
+    max_tasks_per_child: Union[int, None] = None,
+) -> CallablePool:
+    """Get (or create) shared process pool for callable jobs."""
+    key = (max_workers, start_method, max_tasks_per_child)
+    with _callable_pools_lock:
+        if key not in _callable_pools:
+            _callable_pools[key] = CallablePool(*key)
+        return _callable_pools[key]
+
+
+def submit_callable(
+    fn: Callable,
+    experiment_dir: Union[str, None],
+    config_fname: Union[str, None],
+    seed_id: Union[int, list, None],
+    job_arguments: dict,
+    extra_kwargs: Union[dict, None] = None,
+) -> CallableProcess:
+    """Run `fn(experiment_dir, config_fname, seed_id, **extra)` on a pool."""
+    pool = get_callable_pool(
+        job_arguments.get("pool_workers"),
+        job_arguments.get("pool_start_method"),
+        job_arguments.get("pool_max_tasks_per_child"),
+    )
+    future = pool.submit(
+        fn, experiment_dir, config_fname, seed_id, **(extra_kwargs or {})
+    )
+    return CallableProcess(future)
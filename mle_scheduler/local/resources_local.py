@@ -0,0 +1,227 @@
+import os
+import glob
+import math
+import threading
+import subprocess as sp
+from typing import List, Union
+
+
+def get_cpu_ids() -> List[int]:
+    """Ids of logical cores this process may run on."""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """Parse kernel cpu list format, e.g. '0-3,8-11'."""
+    cpu_ids = []
+    for part in cpu_list.strip().split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            cpu_ids.extend(range(int(start), int(end) + 1))
+        elif part != "":
+            cpu_ids.append(int(part))
+    return cpu_ids
+
+
+def get_numa_nodes(cpu_ids: List[int]) -> List[List[int]]:
+    """Group cores by NUMA node (single group if topology is unknown)."""
+    nodes = []
+    for fname in sorted(glob.glob("/sys/devices/system/node/node*/cpulist")):
+        with open(fname) as f:
+            node_cpus = [i for i in parse_cpu_list(f.read()) if i in cpu_ids]
+        if len(node_cpus) > 0:
+            nodes.append(node_cpus)
+    grouped = [i for node in nodes for i in node]
+    ungrouped = [i for i in cpu_ids if i not in grouped]
+    if len(ungrouped) > 0:
+        nodes.append(ungrouped)
+    return nodes
+
+
+def get_memory_mb() -> Union[int, None]:
+    """Total physical memory of machine in MB (None if unknown)."""
+    try:
+        return int(
+            os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 2
+        )
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def get_gpu_devices() -> List[str]:
+    """Visible GPU device ids (respects `CUDA_VISIBLE_DEVICES`)."""
+    if "CUDA_VISIBLE_DEVICES" in os.environ:
+        devices = os.environ["CUDA_VISIBLE_DEVICES"].strip()
+        return [d for d in devices.split(",") if d != ""]
+    try:
+        out = sp.run(["nvidia-smi", "-L"], stdout=sp.PIPE, stderr=sp.DEVNULL)
+    except OSError:
+        return []
+    if out.returncode != 0:
+        return []
+    num_gpus = len(out.stdout.decode("utf-8").strip().splitlines())
+    return [str(i) for i in range(num_gpus)]
+
+
+# Job arguments which declare local resources (admission by resource pool)
+resource_arguments = [
+    "num_logical_cores",
+    "memory_per_job",
+    "memory_per_cpu",
+    "num_gpus",
+    "pin_cpus",
+]
+
+
+def declares_resources(job_arguments: dict) -> bool:
+    """Check if job arguments declare any cores/memory/GPUs."""
+    return any(key in job_arguments for key in resource_arguments)
+
+
+def job_requirements(job_arguments: dict) -> dict:
+    """Cores, memory (MB) & GPUs declared in the job arguments."""
+    num_cores = job_arguments.get("num_logical_cores", 1)
+    if "memory_per_job" in job_arguments:
+        memory = job_arguments["memory_per_job"]
+    else:
+        memory = job_arguments.get("memory_per_cpu", 0) * num_cores
+    return {
+        "cores": num_cores,
+        "memory": memory,
+        "gpus": job_arguments.get("num_gpus", 0),
+        "pin_cpus": job_arguments.get("pin_cpus", False),
+    }
+
+
+class LocalResourcePool(object):
+    """
+    Slot-based admission of local jobs against machine capacity. Capacity
+    defaults to the cores, memory & GPUs reported by the OS. A single pool
+    can be shared by several queues/jobs (thread-safe). GPU jobs are
+    assigned devices - fractional `num_gpus` (e.g. 0.5) share one device.
+    Jobs with `pin_cpus` get disjoint cores (within one NUMA node if any).
+    """
+
+    def __init__(
+        self,
+        num_cores: Union[int, None] = None,
+        memory_mb: Union[int, None] = None,
+        num_gpus: Union[int, None] = None,
+        gpu_devices: Union[List[Union[int, str]], None] = None,
+        cpu_ids: Union[List[int], None] = None,
+    ):
+        if gpu_devices is None:
+            if num_gpus is None:
+                gpu_devices = get_gpu_devices()
+            else:
+                gpu_devices = list(range(num_gpus))
+        # Cores which can be pinned - grouped by NUMA node
+        if cpu_ids is None:
+            cpu_ids = get_cpu_ids()
+        self.numa_nodes = get_numa_nodes(cpu_ids)
+        # Fraction of each device which is in use
+        self.gpu_load = {str(device): 0.0 for device in gpu_devices}
+        self.capacity = {
+            "cores": len(cpu_ids) if num_cores is None else num_cores,
+            "memory": get_memory_mb() if memory_mb is None else memory_mb,
+            "gpus": len(self.gpu_load),
+        }
+        self.pinned_cpus = set()
+        self.used = {key: 0 for key in self.capacity}
+        self.num_jobs = 0
+        self.cond = threading.Condition()
+
+    def place_gpus(self, num_gpus: float) -> Union[List[str], None]:
+        """Select devices for job - best fit for fractional requests."""
+        if num_gpus <= 0:
+            return []
+        if num_gpus < 1:
+            shared = [
+                device
+                for device, load in self.gpu_load.items()
+                if load + num_gpus <= 1 + 1e-9
+            ]
+            if len(shared) == 0:
+                return None
+            return [max(shared, key=lambda device: self.gpu_load[device])]
+        free = [device for device, load in self.gpu_load.items() if load < 1e-9]
+        if len(free) < math.ceil(num_gpus):
+            return None
+        return free[: math.ceil(num_gpus)]
+
+    def place_cpus(self, num_cores: int) -> List[int]:
+        """Select free cores - best fitting NUMA node first, else spread."""
+        free_nodes = [
+            [i for i in node if i not in self.pinned_cpus]
+            for node in self.numa_nodes
+        ]
+        fitting = [node for node in free_nodes if len(node) >= num_cores]
+        if len(fitting) > 0:
+            return min(fitting, key=len)[:num_cores]
+        free = [i for node in sorted(free_nodes, key=len, reverse=True) for i in node]
+        # Not enough free cores (e.g. oversized job) - don't pin job
+        if len(free) < num_cores:
+            return []
+        return free[:num_cores]
+
+    def allocate(self, requirements: dict) -> Union[dict, None]:
+        """Reserve requirements if they fit. Oversized jobs are run alone."""
+        devices = self.place_gpus(requirements["gpus"])
+        if self.num_jobs > 0:
+            fits = all(
+                self.capacity[key] is None
+                or self.used[key] + requirements[key] <= self.capacity[key]
+                for key in self.capacity
+            )
+            if not fits or devices is None:
+                return None
+        elif devices is None:
+            devices = list(self.gpu_load.keys())
+        for key in self.capacity:
+            self.used[key] += requirements[key]
+        for device in devices:
+            self.gpu_load[device] += min(requirements["gpus"], 1)
+        cpus = []
+        if requirements["pin_cpus"]:
+            cpus = self.place_cpus(requirements["cores"])
+            self.pinned_cpus.update(cpus)
+        self.num_jobs += 1
+        return dict(requirements, devices=devices, cpus=cpus)
+
+    def try_acquire(self, job_arguments: dict) -> Union[dict, None]:
+        """Reserve resources of job if available & None otherwise."""
+        requirements = job_requirements(job_arguments)
+        with self.cond:
+            return self.allocate(requirements)
+
+    def acquire(self, job_arguments: dict) -> dict:
+        """Block until resources of job are available & reserve them."""
+        requirements = job_requirements(job_arguments)
+        with self.cond:
+            allocation = self.allocate(requirements)
+            while allocation is None:
+                self.cond.wait()
+                allocation = self.allocate(requirements)
+        return allocation
+
+    def release(self, allocation: dict) -> None:
+        """Free resources & devices of a finished job."""
+        with self.cond:
+            for key in self.capacity:
+                self.used[key] -= allocation[key]
+            for device in allocation["devices"]:
+                self.gpu_load[device] -= min(allocation["gpus"], 1)
+            self.pinned_cpus.difference_update(allocation["cpus"])
+            self.num_jobs -= 1
+            self.cond.notify_all()
+
+    @property
+    def free(self) -> dict:
+        with self.cond:
+            return {
+                key: None if cap is None else cap - self.used[key]
+                for key, cap in self.capacity.items()
+            }
@@ -0,0 +1,175 @@
+import os
+import time
+import threading
+from typing import Dict, List, Union
+
+
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (ValueError, OSError, AttributeError):
+    CLOCK_TICKS, PAGE_SIZE = 100, 4096
+
+# Child pids are listed per thread if kernel has CONFIG_PROC_CHILDREN
+HAS_PROC_CHILDREN = os.path.exists(f"/proc/self/task/{os.getpid()}/children")
+
+# Full /proc scan (fallback) - shared by the samplers of all running jobs
+_scan = {"time": -float("inf"), "stats": {}, "children": {}}
+_scan_lock = threading.Lock()
+
+
+def read_proc_stat(pid: int) -> Union[dict, None]:
+    """Parent pid, CPU time (secs) & RSS (bytes) from `/proc/<pid>/stat`."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Command name may contain spaces - fields start after closing bracket
+    fields = stat[stat.rfind(")") + 2 :].split()
+    return {
+        "ppid": int(fields[1]),
+        "cpu_time": (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+        "rss": int(fields[21]) * PAGE_SIZE,
+    }
+
+
+def read_proc_io(pid: int) -> Dict[str, int]:
+    """Bytes read from/written to storage (`/proc/<pid>/io`)."""
+    io = {"read_bytes": 0, "write_bytes": 0}
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                key, value = line.split(":")
+                if key in io:
+                    io[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    return io
+
+
+def read_proc_children(pid: int) -> List[int]:
+    """Child pids of all threads (`/proc/<pid>/task/*/children`)."""
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return []
+    children = []
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return children
+
+
+def scan_processes(max_age: float = 0.0) -> tuple:
+    """Stats & child pids of all processes (reused for `max_age` secs)."""
+    with _scan_lock:
+        if time.time() - _scan["time"] > max_age:
+            stats = {}
+            for entry in os.listdir("/proc"):
+                if entry.isdigit():
+                    stat = read_proc_stat(int(entry))
+                    if stat is not None:
+                        stats[int(entry)] = stat
+            children = {}
+            for child, stat in stats.items():
+                children.setdefault(stat["ppid"], []).append(child)
+            _scan.update(time=time.time(), stats=stats, children=children)
+        return _scan["stats"], _scan["children"]
+
+
+def process_tree(pid: int, max_age: float = 0.0) -> Dict[int, dict]:
+    """Stats of process & all of its (grand-)children."""
+    # Walk down from the job's pid - otherwise one /proc scan per tick
+    stats, children = {}, {}
+    if not HAS_PROC_CHILDREN:
+        stats, children = scan_processes(max_age)
+    tree, frontier = {}, [pid]
+    while len(frontier) > 0:
+        parent = frontier.pop()
+        if HAS_PROC_CHILDREN:
+            stat = read_proc_stat(parent)
+            if stat is not None:
+                tree[parent] = stat
+                frontier.extend(read_proc_children(parent))
+        elif parent in stats:
+            tree[parent] = stats[parent]
+            frontier.extend(children.get(parent, []))
+    return tree
+
+
+class ResourceSampler(object):
+    """Sample RSS, CPU time & I/O of a job's process tree in background."""
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        # Cumulative counters per pid - keeps usage of exited children
+        self.counters = {}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            self.sample()
+            if self.stop_event.wait(self.interval):
+                break
+
+    def sample(self) -> None:
+        """Record one sample of the process tree (if still alive)."""
+        if not os.path.isdir("/proc"):
+            return
+        # Samplers of other jobs reuse a scan of the last half interval
+        tree = process_tree(self.pid, self.interval / 2)
+        if len(tree) == 0:
+            return
+        for pid, stat in tree.items():
+            self.counters[pid] = dict(read_proc_io(pid), cpu_time=stat["cpu_time"])
+        sample = {
+            "time": time.time(),
+            "rss_mb": sum(stat["rss"] for stat in tree.values()) / 1024 ** 2,
+            "num_procs": len(tree),
+        }
+        for key in ["cpu_time", "read_bytes", "write_bytes"]:
+            sample[key] = sum(c[key] for c in self.counters.values())
+        self.samples.append(sample)
+
+    def stop(self) -> None:
+        """Stop sampling (called once job exited)."""
+        self.stop_event.set()
+        self.thread.join()
+
+    @property
+    def time_series(self) -> Dict[str, List[float]]:
+        """Samples as time series - one list per metric."""
+        if len(self.samples) == 0:
+            return {}
+        return {key: [s[key] for s in self.samples] for key in self.samples[0]}
+
+    @property
+    def stats(self) -> dict:
+        """Peak/mean memory, mean CPU utilization & total CPU time/I/O."""
+        if len(self.samples) == 0:
+            return {}
+        rss = [s["rss_mb"] for s in self.samples]
+        last, duration = self.samples[-1], 0.0
+        if len(self.samples) > 1:
+            duration = last["time"] - self.samples[0]["time"]
+        return {
+            "peak_rss_mb": max(rss),
+            "mean_rss_mb": sum(rss) / len(rss),
+            "cpu_time": last["cpu_time"],
+            "mean_cpu_percent": (
+                100 * (last["cpu_time"] - self.samples[0]["cpu_time"]) / duration
+                if duration > 0
+                else 0.0
+            ),
+            "read_mb": last["read_bytes"] / 1024 ** 2,
+            "write_mb": last["write_bytes"] / 1024 ** 2,
+            "duration": duration,
+        }
@@ -0,0 +1,84 @@
+import os
+from typing import List, Union
+
+
+class QueueEntry(object):
+    """
+    Compact record of a single queue job. Supports the dict-style access
+    of queue entries (entry["status"], entry.get, entry.update) but stores
+    fields in slots & derives base_str, seed_ids & log_dir on access.
+    """
+
+    __slots__ = (
+        "config_fname",
+        "seed_id",
+        "experiment_dir",
+        "status",
+        "job",
+        "job_id",
+        "merged_logs",
+        "resource_usage",
+        "resource_stats",
+        "result",
+        "exit_code",
+    )
+    derived = ("base_str", "seed_ids", "log_dir")
+
+    def __init__(
+        self,
+        config_fname: str,
+        seed_id: Union[int, List[int]],
+        experiment_dir: str,
+    ):
+        self.config_fname = config_fname
+        self.seed_id = seed_id
+        self.experiment_dir = experiment_dir  # Shared by entries of a config
+        # 3 status types: -1 - not started yet; 0 - completed, 1 - running
+        self.status = -1
+        self.job = None
+        self.job_id = None
+        self.merged_logs = False
+        self.resource_usage = None
+        self.resource_stats = None
+        self.result = None
+        self.exit_code = None
+
+    @property
+    def base_str(self) -> str:
+        return os.path.basename(self.experiment_dir)
+
+    @property
+    def seed_ids(self) -> List[int]:
+        return self.seed_id if isinstance(self.seed_id, list) else [self.seed_id]
+
+    @property
+    def log_dir(self) -> str:
+        return os.path.join(self.experiment_dir, "/logs")
+
+    def keys(self) -> List[str]:
+        return list(self.__slots__) + list(self.derived)
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__ and key not in self.derived:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ or key in self.derived
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self else default
+
+    def update(self, **kwargs) -> None:
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __repr__(self) -> str:
+        return "QueueEntry({})".format(
+            ", ".join(f"{key}={getattr(self, key)!r}" for key in self.__slots__)
+        )
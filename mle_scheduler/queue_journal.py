@@ -0,0 +1,204 @@
+import os
+import json
+import pickle
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Union
+
+
+# File systems on which SQLite's WAL mode is unsafe (no shared memory)
+network_fs_types = [
+    "nfs",
+    "nfs4",
+    "lustre",
+    "gpfs",
+    "cifs",
+    "smb3",
+    "smbfs",
+    "beegfs",
+    "ceph",
+    "glusterfs",
+    "fuse.sshfs",
+]
+
+
+def is_network_fs(path: str) -> bool:
+    """Check if path lives on a network file system (Linux mount table)."""
+    path = os.path.realpath(os.path.dirname(os.path.abspath(path)))
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    # File system type of the longest mount point containing the path
+    mount_point, fs_type = "", None
+    for point, point_type in mounts:
+        inside = os.path.commonpath([path, point]) == point
+        if inside and len(point) > len(mount_point):
+            mount_point, fs_type = point, point_type
+    return fs_type in network_fs_types
+
+
+class QueueJournal(object):
+    """
+    Crash-safe on-disk journal of queue entries & status transitions.
+    Entries are keyed by queue index, config & seed(s) - duplicate specs
+    are journaled separately. Stored in SQLite (WAL mode).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self._conn = None
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " key TEXT PRIMARY KEY,"
+                " config_fname TEXT,"
+                " seed_id TEXT,"
+                " status INTEGER,"
+                " job_id TEXT,"
+                " resource TEXT,"
+                " job_arguments TEXT,"
+                " updated REAL)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            # Outputs of completed jobs spilled from memory (pickled)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS results"
+                " (key TEXT PRIMARY KEY, outputs BLOB)"
+            )
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection to the journal - reopened after `close`."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL: appends instead of rewriting pages, readers don't block
+            # writer. Its shared-memory index requires a local file system
+            if is_network_fs(self.db_path):
+                self._conn.execute("PRAGMA journal_mode=DELETE")
+            else:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    @staticmethod
+    def entry_key(
+        index: int, config_fname: str, seed_id: Union[int, List[int]]
+    ) -> str:
+        return json.dumps([index, config_fname, seed_id])
+
+    def reset(self, entries: List[tuple], resource: str) -> None:
+        """Start a fresh journal with all entries pending."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM jobs")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.execute("DELETE FROM results")
+        self.add(entries, resource)
+
+    def add(self, entries: List[tuple], resource: str) -> None:
+        """Add pending (queue index, entry) pairs (existing ones are kept)."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs VALUES (?, ?, ?, -1, NULL, ?, NULL, ?)",
+                [
+                    (
+                        self.entry_key(i, e["config_fname"], e["seed_id"]),
+                        e["config_fname"],
+                        json.dumps(e["seed_id"]),
+                        resource,
+                        time.time(),
+                    )
+                    for i, e in entries
+                ],
+            )
+
+    def update(
+        self,
+        index: int,
+        config_fname: str,
+        seed_id: Union[int, List[int]],
+        status: int,
+        job_id=None,
+        job_arguments: Union[dict, None] = None,
+    ) -> None:
+        """Record status transition (& id of job which can be reattached)."""
+        # Only cluster/SSH ids & VM names outlive the launching process
+        if not isinstance(job_id, (int, str)):
+            job_id = None
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, job_id = ?, job_arguments = ?,"
+                " updated = ? WHERE key = ?",
+                (
+                    status,
+                    json.dumps(job_id),
+                    json.dumps(job_arguments, default=str),
+                    time.time(),
+                    self.entry_key(index, config_fname, seed_id),
+                ),
+            )
+
+    def set_meta(self, key: str, value) -> None:
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+    def get_meta(self, key: str, default=None):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def load(self) -> Dict[str, dict]:
+        """Get journaled status & job id of all entries."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT key, status, job_id, resource, job_arguments FROM jobs"
+            ).fetchall()
+        return {
+            key: {
+                "status": status,
+                "job_id": None if job_id is None else json.loads(job_id),
+                "resource": resource,
+                "job_arguments": None if job_args is None else json.loads(job_args),
+            }
+            for key, status, job_id, resource, job_args in rows
+        }
+
+    def add_outputs(
+        self,
+        index: int,
+        config_fname: str,
+        seed_id: Union[int, List[int]],
+        outputs: dict,
+    ) -> None:
+        """Store outputs of completed entry (result, exit code, usage)."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?)",
+                (
+                    self.entry_key(index, config_fname, seed_id),
+                    pickle.dumps(outputs),
+                ),
+            )
+
+    def load_outputs(self) -> Dict[str, dict]:
+        """Get stored outputs of all completed entries."""
+        with self.lock:
+            rows = self.conn.execute("SELECT key, outputs FROM results").fetchall()
+        return {key: pickle.loads(outputs) for key, outputs in rows}
+
+    def close(self) -> None:
+        """Release the database file (e.g. once all jobs completed)."""
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
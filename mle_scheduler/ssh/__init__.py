@@ -1,5 +1,5 @@
 from .ssh_manager import SSH_Manager
-from .job_manage_ssh import submit_ssh, monitor_ssh
+from .job_manage_ssh import submit_ssh, monitor_ssh, cancel_ssh
 from .file_manage_ssh import send_dir_ssh, copy_dir_ssh, delete_dir_ssh
 
 
@@ -7,6 +7,7 @@ __all__ = [
     "SSH_Manager",
     "submit_ssh",
     "monitor_ssh",
+    "cancel_ssh",
     "send_dir_ssh",
     "copy_dir_ssh",
     "delete_dir_ssh",
@@ -0,0 +1,56 @@
+from typing import List, Set
+from .helpers_launch_ssh import ssh_get_submission_cmd
+
+
+async def connect_ssh_async(ssh_settings: dict):
+    """Open asyncssh connection to main server (through jump host)."""
+    try:
+        import asyncssh
+    except ImportError:
+        raise ImportError(
+            "You need to install `asyncssh` to use the asyncio SSH backend."
+        )
+    connect_kwargs = {
+        "port": ssh_settings["ssh_port"],
+        "username": ssh_settings["user_name"],
+        "client_keys": [ssh_settings["pkey_path"]],
+        "known_hosts": None,
+    }
+    tunnel = None
+    jump_server = ssh_settings.get("jump_server", "")
+    if jump_server not in ["", ssh_settings["main_server"]]:
+        tunnel = await asyncssh.connect(jump_server, **connect_kwargs)
+    return await asyncssh.connect(
+        ssh_settings["main_server"], tunnel=tunnel, **connect_kwargs
+    )
+
+
+async def submit_ssh_async(
+    conn,
+    filename: str,
+    cmd_line_arguments: str,
+    job_arguments: dict,
+    ssh_settings: dict,
+) -> int:
+    """Launch job on SSH server via open connection & return its PID."""
+    script_cmd = ssh_get_submission_cmd(
+        filename, cmd_line_arguments, job_arguments, ssh_settings
+    )
+    proc = await conn.create_process(script_cmd)
+    pid = int(await proc.stdout.readline())
+    return pid
+
+
+async def list_ssh_pids_async(conn, pids: List[int]) -> Set[int]:
+    """Get PIDs which are still running - one `ps` call for all jobs."""
+    if len(pids) == 0:
+        return set()
+    result = await conn.run(
+        "ps -o pid= -p " + ",".join(str(pid) for pid in pids), check=False
+    )
+    return set(int(pid) for pid in result.stdout.split())
+
+
+async def cancel_ssh_async(conn, pid: int) -> None:
+    """Kill PID of job running on SSH server."""
+    await conn.run(f"kill {pid}", check=False)
@@ -59,6 +59,18 @@ def monitor_ssh(job_id: Union[list, int], ssh_settings: dict):
     return counter > 1
 
 
+def cancel_ssh(job_id: int, ssh_settings: dict):
+    """Kill PID of a job running on an SSH server."""
+    ssh_manager = SSH_Manager(
+        user_name=ssh_settings["user_name"],
+        pkey_path=ssh_settings["pkey_path"],
+        main_server=ssh_settings["main_server"],
+        jump_server=ssh_settings["jump_server"],
+        ssh_port=ssh_settings["ssh_port"],
+    )
+    ssh_manager.execute_command([f"kill {job_id}"])
+
+
 def send_dir_ssh(
     ssh_settings: dict,
     local_dir: Union[str, None] = None,
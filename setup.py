@@ -69,6 +69,15 @@ setup(
                 CURRENT_DIR, "requirements", "requirements-examples.txt"
             )
         ),
-        "full": ["google-cloud-storage", "paramiko", "sshtunnel", "scp"],
+        "full": [
+            "google-cloud-storage",
+            "paramiko",
+            "sshtunnel",
+            "scp",
+            "asyncssh",
+        ],
+    },
+    entry_points={
+        "console_scripts": ["mle-scheduler=mle_scheduler.cli:main"],
     },
 )
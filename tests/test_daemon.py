@@ -0,0 +1,43 @@
+import os
+import time
+import shutil
+import threading
+from mle_scheduler.daemon import MLEDaemon, DaemonClient
+
+
+def test_daemon():
+    # Submit queue to daemon via socket & poll its status until done
+    socket_path = os.path.abspath("daemon_test.sock")
+    daemon = MLEDaemon(socket_path)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    while not os.path.exists(socket_path):
+        time.sleep(0.1)
+
+    client = DaemonClient(socket_path)
+    queue_id = client.submit(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 1],
+        experiment_dir="logs_daemon",
+        job_arguments={},
+    )
+    while client.status(queue_id)["state"] == "running":
+        time.sleep(0.5)
+    status = client.status(queue_id)
+    assert status["state"] == "done"
+    assert status["completed"] == 2
+    assert [job["status"] for job in status["jobs"]] == [0, 0]
+    assert "out" in client.tail(queue_id, job_index=1)
+    try:
+        client.tail(queue_id, job_index=2)
+        assert False, "Tail of unknown job did not fail"
+    except RuntimeError as e:
+        assert "No such job" in str(e)
+
+    client.shutdown()
+    thread.join()
+    assert not os.path.exists(socket_path)
+    shutil.rmtree("logs_daemon")
+    return
@@ -1,4 +1,17 @@
-from mle_scheduler.cloud.gcp.helpers_launch_gcp import gcp_get_submission_cmd
+import os
+import time
+from mle_scheduler import MLEQueue
+from mle_scheduler import job as mle_job
+from mle_scheduler.cloud.gcp.helpers_launch_gcp import (
+    gcp_get_submission_cmd,
+    gcp_get_list_cmd,
+    gcp_generate_startup_file,
+    base_gcp_args,
+)
+from mle_scheduler.cloud.gcp.machine_types_gcp import select_machine_type
+from mle_scheduler.cloud.gcp.zones_gcp import GCPZoneSelector, gcp_is_capacity_error
+from mle_scheduler.cloud.gcp import job_manage_gcp, status_cache_gcp
+from mle_scheduler.cloud.gcp.job_manage_gcp import gcp_prepare_submission
 
 vm_name = "temp-vm"
 job_arguments = {
@@ -18,9 +31,7 @@ correct_gcp_launch_cmd = [
     "temp-vm",
     "--preemptible",
     "--zone=us-west1-a",
-    "--custom-cpu=2",
-    "--custom-memory=6144MB",
-    "--custom-vm-type=n1",
+    "--machine-type=n2-custom-2-6144",
     "--image=c1-deeplearning-tf-2-4-cu110-v20210414-debian-10",
     "--image-project=ml-images",
     "--metadata-from-file=startup-script=temp-vm.sh",
@@ -35,7 +46,7 @@ correct_job_gcp_args = {
     "ZONE": "us-west1-a",
     "ACCELERATOR_TYPE": None,
     "ACCELERATOR_COUNT": 0,
-    "MACHINE_TYPE": "n2-highcpu-8",
+    "MACHINE_TYPE": "n2-custom-2-6144",
     "IMAGE_NAME": "c1-deeplearning-tf-2-4-cu110-v20210414-debian-10",
     "IMAGE_PROJECT": "ml-images",
 }
@@ -46,3 +57,338 @@ def test_submission_cmd_gcp():
         vm_name, job_arguments, startup_fname
     )
     return
+
+
+def test_prepare_submission_gcp():
+    cloud_settings = {"remote_dir": "mle-code-dir", "bucket_name": "bucket"}
+    gcp_launch_cmd, startup_fname = gcp_prepare_submission(
+        vm_name, "train.py", "-seed 0", "logs", dict(job_arguments), cloud_settings
+    )
+    assert startup_fname == "temp-vm-startup.sh"
+    assert "--metadata-from-file=startup-script=temp-vm-startup.sh" in gcp_launch_cmd
+    assert os.path.exists(startup_fname)
+    os.remove(startup_fname)
+
+
+def test_labelled_submission_cmd_gcp():
+    gcp_launch_cmd, _ = gcp_get_submission_cmd(
+        vm_name, dict(job_arguments), startup_fname, {"mle_queue": "abc"}
+    )
+    assert gcp_launch_cmd[-1] == "--labels=mle_queue=abc"
+    list_cmd = gcp_get_list_cmd(False, "abc")
+    assert "--filter=labels.mle_queue=abc" in list_cmd
+    assert "--format=json" in list_cmd
+
+
+def test_startup_file_gcp():
+    gcp_generate_startup_file(
+        "mle-code-dir",
+        "bucket",
+        "train.py",
+        "logs",
+        startup_fname,
+        "-seed 0",
+        None,
+        marker_path="gs://bucket/mle-code-dir/.mle_status/temp-vm.done",
+        num_preemptions=1,
+    )
+    with open(startup_fname, "r") as f:
+        startup_script = f.read()
+    os.remove(startup_fname)
+    assert "export MLE_RESUME=1" in startup_script
+    assert (
+        "echo $MLE_EXIT_CODE | gsutil -q cp - "
+        "gs://bucket/mle-code-dir/.mle_status/temp-vm.done"
+    ) in startup_script
+    # No fixed sleeps - sync starts with job & VM shuts down directly
+    assert "sleep 100" not in startup_script
+    assert startup_script.index("MLE_SYNC_PID=$!") < startup_script.index(
+        "mle_phase job_start"
+    )
+    assert startup_script.rstrip().endswith("sudo shutdown now")
+    # Results are uploaded incrementally instead of full rsync loops
+    assert "gsutil rsync" not in startup_script
+    assert "gsutil -m -q cp -I" in startup_script
+
+
+def test_zone_failover_gcp():
+    assert gcp_is_capacity_error(
+        b"ERROR: The zone does not have enough resources available"
+    )
+    assert not gcp_is_capacity_error(b"ERROR: Invalid value for field")
+    selector = GCPZoneSelector()
+    zones = ["us-west1-a", "us-west1-b", "us-central1-a"]
+    selector.record_failure("us-west1-a")
+    selector.record_success("us-central1-a")
+    assert selector.order(zones) == ["us-central1-a", "us-west1-b", "us-west1-a"]
+    # Among failed zones the one which failed longest ago is tried first
+    selector.last_failure["us-west1-a"] = time.time() - 60
+    selector.record_failure("us-west1-b")
+    assert selector.order(zones) == ["us-central1-a", "us-west1-a", "us-west1-b"]
+    gcp_launch_cmd, job_gcp_args = gcp_get_submission_cmd(
+        vm_name, dict(job_arguments, zone="us-west1-b"), startup_fname
+    )
+    assert "--zone=us-west1-b" in gcp_launch_cmd
+    assert base_gcp_args["ZONE"] == "us-west1-a"
+
+
+def test_machine_type_selection_gcp():
+    machine = select_machine_type(4, 8192)
+    assert machine["vcpus"] >= 4 and machine["memory_mb"] >= 8192
+    # Selected type maximizes jobs per dollar among all candidates
+    for family in ["n1", "n2", "e2", "c2"]:
+        other = select_machine_type(4, 8192, [family])
+        assert other["jobs_per_dollar"] <= machine["jobs_per_dollar"]
+    # GPU jobs are restricted to N1 machines & choice is recorded
+    gpu_job_arguments = dict(job_arguments, num_gpus=1, machine_type=None)
+    gcp_launch_cmd, job_gcp_args = gcp_get_submission_cmd(
+        vm_name, gpu_job_arguments, startup_fname
+    )
+    assert gpu_job_arguments["machine_type"].startswith(("n1-", "custom-"))
+    assert f"--machine-type={gpu_job_arguments['machine_type']}" in gcp_launch_cmd
+
+
+class FakeCreateProc(object):
+    """Stand-in for `gcloud ... create` subprocess."""
+
+    def __init__(self, cmd, stderr=None):
+        self.cmd = cmd
+        self.returncode = 0
+
+    def communicate(self):
+        return b"", b""
+
+
+def test_batch_submission_gcp(monkeypatch):
+    # All VMs of a wave are created at once & awaited with one list call
+    created, list_calls = [], []
+
+    def fake_popen(cmd, stderr=None):
+        created.append(cmd[4])
+        return FakeCreateProc(cmd, stderr)
+
+    def fake_list_vms(use_tpus=False, queue_id=None, zones=None):
+        list_calls.append(zones)
+        return {name: {"status": "RUNNING", "running": True} for name in created}
+
+    monkeypatch.setattr(job_manage_gcp.sp, "Popen", fake_popen)
+    monkeypatch.setattr(job_manage_gcp, "gcp_list_vms", fake_list_vms)
+    cloud_settings = {"remote_dir": "mle-code-dir", "bucket_name": "bucket"}
+    job_ids = job_manage_gcp.submit_gcp_batch(
+        ["train.py"] * 3,
+        ["-seed 0", "-seed 1", "-seed 2"],
+        "logs",
+        [dict(job_arguments) for _ in range(3)],
+        cloud_settings,
+        check_interval=0,
+    )
+    assert job_ids == created and len(set(job_ids)) == 3
+    assert len(list_calls) == 1
+
+
+def test_batch_submission_timeout_gcp(monkeypatch):
+    # VM never listed as running - finished jobs kept, others deleted
+    deleted = []
+    monkeypatch.setattr(job_manage_gcp.sp, "Popen", FakeCreateProc)
+    monkeypatch.setattr(
+        job_manage_gcp, "gcp_list_vms", lambda *args, **kwargs: {}
+    )
+    monkeypatch.setattr(
+        job_manage_gcp,
+        "gcp_check_completion_marker",
+        lambda vm_name, cloud_settings: vm_name == "done-vm",
+    )
+    monkeypatch.setattr(
+        job_manage_gcp,
+        "gcp_delete_vm_instance",
+        lambda vm_name, *args: deleted.append(vm_name),
+    )
+    job_ids = job_manage_gcp.gcp_wait_running(
+        ["done-vm", "stuck-vm", -1],
+        [dict(job_arguments, zone="us-west1-a") for _ in range(3)],
+        {"remote_dir": "mle-code-dir", "bucket_name": "bucket"},
+        check_interval=0,
+        running_timeout=0.05,
+    )
+    assert job_ids == ["done-vm", -1, -1]
+    assert deleted == ["stuck-vm"]
+
+
+def test_wait_running_zones_gcp(monkeypatch):
+    # VMs & TPUs are each listed only in the zones of their own jobs
+    list_calls = []
+
+    def fake_list_vms(use_tpus=False, queue_id=None, zones=None):
+        list_calls.append((use_tpus, sorted(zones)))
+        return {name: {"running": True} for name in ["vm-1", "tpu-1"]}
+
+    monkeypatch.setattr(job_manage_gcp, "gcp_list_vms", fake_list_vms)
+    job_ids = job_manage_gcp.gcp_wait_running(
+        ["vm-1", "tpu-1"],
+        [
+            dict(job_arguments, zone="us-west1-a", use_tpus=0),
+            dict(job_arguments, zone="europe-west4-a", use_tpus=1),
+        ],
+        {},
+        check_interval=0,
+    )
+    assert job_ids == ["vm-1", "tpu-1"]
+    assert sorted(list_calls) == [(0, ["us-west1-a"]), (1, ["europe-west4-a"])]
+
+
+def test_parse_vm_list_gcp():
+    vms = [
+        {"name": "vm-1", "status": "RUNNING", "zone": "zones/us-west1-a"},
+        {"name": "vm-2", "status": "TERMINATED", "zone": "zones/us-west1-b"},
+    ]
+    vm_info = status_cache_gcp.gcp_parse_vm_list(vms)
+    assert vm_info["vm-1"] == {
+        "status": "RUNNING",
+        "running": True,
+        "zone": "us-west1-a",
+    }
+    assert not vm_info["vm-2"]["running"]
+    # TPUs are listed with full resource path & 'state' key
+    tpus = [
+        {"name": "projects/p/locations/europe-west4-a/nodes/tpu-1", "state": "READY"}
+    ]
+    tpu_info = status_cache_gcp.gcp_parse_vm_list(tpus, use_tpus=True)
+    assert tpu_info["tpu-1"]["running"]
+    assert tpu_info["tpu-1"]["zone"] == "europe-west4-a"
+
+
+def test_status_cache_gcp(monkeypatch):
+    # N job lookups per tick are served by one listing call
+    list_calls = []
+
+    def fake_list_vms(use_tpus=False, queue_id=None, zones=None):
+        list_calls.append((use_tpus, queue_id, list(zones)))
+        return {f"vm-{i}": {"status": "RUNNING", "running": True} for i in range(5)}
+
+    monkeypatch.setattr(status_cache_gcp, "gcp_list_vms", fake_list_vms)
+    cache = status_cache_gcp.GCPStatusCache("abc", refresh_interval=60)
+    assert cache.labels == {"mle_queue": "abc"}
+    assert all(cache.is_running(f"vm-{i}") for i in range(5))
+    assert not cache.is_running("vm-unknown")
+    assert list_calls == [(False, "abc", [])]
+
+    # Forced refresh lists again - TPUs are listed in registered zones
+    cache.refresh(force=True)
+    cache.add_zone("us-central1-b", use_tpus=True)
+    cache.add_zone("us-central1-b", use_tpus=True)
+    cache.add_zone("us-west1-a", use_tpus=False)
+    cache.is_running("vm-0", use_tpus=True)
+    assert len(list_calls) == 3
+    assert list_calls[-1] == (True, "abc", ["us-central1-b"])
+
+    # Outdated cache is refreshed on next lookup
+    cache.refresh_interval = 0
+    cache.is_running("vm-0")
+    assert len(list_calls) == 4
+
+
+class FakeRun(object):
+    """Stand-in for finished `gsutil stat` subprocess."""
+
+    def __init__(self, returncode: int, stderr: bytes = b""):
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+def test_preemption_resubmit_gcp(tmp_path, monkeypatch):
+    # Missing marker -> preempted -> resubmitted until retry budget is used up
+    stat_err = [b"CommandException: No URLs matched: gs://bucket/vm.done"]
+    submitted, deleted = [], []
+
+    def fake_submit_gcp(*args, **kwargs):
+        submitted.append(f"vm-{len(submitted) + 1}")
+        return submitted[-1]
+
+    monkeypatch.setattr(status_cache_gcp, "gcp_list_vms", lambda *a, **k: {})
+    monkeypatch.setattr(
+        job_manage_gcp.sp, "run", lambda *a, **k: FakeRun(1, stat_err[0])
+    )
+    monkeypatch.setattr(
+        job_manage_gcp,
+        "gcp_delete_vm_instance",
+        lambda vm_name, *args: deleted.append(vm_name),
+    )
+    monkeypatch.setattr(mle_job, "submit_gcp", fake_submit_gcp)
+    cloud_settings = {
+        "remote_dir": "mle-code-dir",
+        "bucket_name": "bucket",
+        "start_up_copy_dir": False,
+        "max_preemption_retries": 2,
+    }
+    queue = MLEQueue(
+        resource_to_run="gcp-cloud",
+        job_filename="train.py",
+        config_filenames=["base_config_1.yaml"],
+        experiment_dir=str(tmp_path),
+        job_arguments=dict(job_arguments, zone="us-west1-a"),
+        cloud_settings=cloud_settings,
+    )
+    job = queue.create_job(0)
+    job.job_status, job.job_id = 1, "vm-0"
+    queue.record_launched([(job, "vm-0")])
+    assert job_manage_gcp.monitor_gcp(
+        "vm-0", job.job_arguments, queue.cloud_status_cache, cloud_settings
+    ) == 2
+
+    # Failed bucket check (e.g. auth error) is no preemption - retry later
+    stat_err[0] = b"AccessDeniedException: 403"
+    queue.step()
+    assert submitted == [] and queue.queue[0]["status"] == 1
+
+    stat_err[0] = b"CommandException: No URLs matched: gs://bucket/vm.done"
+    queue.step()
+    # Resubmitted VM counts as running until it is listed (or times out)
+    queue.step()
+    assert submitted == ["vm-1"] and queue.queue[0]["status"] == 1
+    job.start_deadline = 0
+    queue.step()
+    assert submitted == ["vm-1", "vm-2"]
+    assert job.job_arguments["num_preemptions"] == 2 and not job.can_resubmit
+    job.start_deadline = 0
+    # Retry budget used up - job is marked as done & its VM deleted
+    queue.step()
+    assert queue.num_completed_jobs == 1
+    assert deleted == ["vm-0", "vm-1", "vm-2"]
+
+
+def test_failed_resubmit_gcp(tmp_path, monkeypatch):
+    # VM of preempted job can't be recreated - job fails instead of retrying
+    submitted = []
+
+    def fake_submit_gcp(*args, **kwargs):
+        submitted.append(kwargs["wait_running"])
+        return -1
+
+    monkeypatch.setattr(status_cache_gcp, "gcp_list_vms", lambda *a, **k: {})
+    monkeypatch.setattr(
+        job_manage_gcp.sp,
+        "run",
+        lambda *a, **k: FakeRun(1, b"CommandException: No URLs matched"),
+    )
+    monkeypatch.setattr(job_manage_gcp, "gcp_delete_vm_instance", lambda *a: None)
+    monkeypatch.setattr(mle_job, "submit_gcp", fake_submit_gcp)
+    queue = MLEQueue(
+        resource_to_run="gcp-cloud",
+        job_filename="train.py",
+        config_filenames=["base_config_1.yaml"],
+        experiment_dir=str(tmp_path),
+        job_arguments=dict(job_arguments, zone="us-west1-a"),
+        cloud_settings={
+            "remote_dir": "mle-code-dir",
+            "bucket_name": "bucket",
+            "start_up_copy_dir": False,
+        },
+        use_journal=True,
+    )
+    job = queue.create_job(0)
+    queue.record_launched([(job, "vm-0")])
+    queue.step()
+    # Resubmission does not wait for the VM & its failure is journaled
+    assert submitted == [False] and queue.num_completed_jobs == 1
+    assert queue.queue[0]["job_id"] == -1
+    assert [e["status"] for e in queue.journal.load().values()] == [0]
@@ -0,0 +1,281 @@
+import os
+import sys
+import time
+import shutil
+import subprocess
+from mle_scheduler import MLEJob, MLEQueue
+from mle_scheduler.local import submit_venv, resolve_env, LocalResourcePool
+from mle_scheduler.local import sampler_local
+from mle_scheduler.local.forkserver_local import get_forkserver
+
+
+def test_submit_venv(tmp_path, monkeypatch):
+    # Fake virtual env whose python links to the current interpreter
+    os.makedirs(tmp_path / "venv" / "bin")
+    os.symlink(sys.executable, tmp_path / "venv" / "bin" / "python")
+    monkeypatch.setenv("WORKON_HOME", str(tmp_path))
+    script = tmp_path / "job.py"
+    script.write_text("import os, sys; print(os.environ['VIRTUAL_ENV'], sys.argv[1:])")
+
+    # Job is launched as argv list w. env variables of venv applied
+    proc = submit_venv(str(script), "-seed 1", {"env_name": "venv"})
+    out, err = proc.communicate()
+    assert proc.returncode == 0
+    assert out.decode().split()[0] == str(tmp_path / "venv")
+    assert "'-seed', '1'" in out.decode()
+    assert proc.args[0] == str(tmp_path / "venv" / "bin" / "python")
+
+    # Interpreter resolution is cached
+    hits = resolve_env.cache_info().hits
+    resolve_env("venv", use_conda=False)
+    assert resolve_env.cache_info().hits == hits + 1
+
+
+def test_job_log_rotation(tmp_path):
+    # Job prints far more than the 64KB pipe buffer - must not stall
+    script = tmp_path / "verbose.py"
+    script.write_text("for i in range(20000): print('x' * 50, i)")
+    job = MLEJob(
+        resource_to_run="local",
+        job_filename=str(script),
+        experiment_dir=str(tmp_path / "logs"),
+        seed_id=1,
+        job_arguments={"log_max_bytes": 100000, "log_backup_count": 2},
+    )
+    job.run()
+
+    # Output streamed to rotated & compressed per-job log files
+    log_fname = str(tmp_path / "logs" / "logs" / "job_seed_1.log")
+    assert os.path.exists(log_fname)
+    assert os.path.exists(log_fname + ".1.gz")
+    assert os.path.exists(log_fname + ".2.gz")
+    assert not os.path.exists(log_fname + ".3.gz")
+    assert os.path.getsize(log_fname) < 100000
+
+
+def test_resource_pool():
+    pool = LocalResourcePool(num_cores=4, memory_mb=8000, num_gpus=1)
+    job_args = {"num_logical_cores": 2, "memory_per_job": 3000}
+    # Two jobs fit - third one exceeds cores & memory
+    alloc_1 = pool.try_acquire(job_args)
+    alloc_2 = pool.try_acquire(job_args)
+    assert pool.try_acquire(job_args) is None
+    # GPU job does not fit while 2nd GPU is missing
+    assert pool.try_acquire({"num_gpus": 2}) is None
+    pool.release(alloc_1)
+    assert pool.free == {"cores": 2, "memory": 5000, "gpus": 1}
+    pool.release(alloc_2)
+    # Oversized jobs are admitted if nothing else is running
+    alloc = pool.try_acquire({"num_logical_cores": 8})
+    assert alloc is not None
+    assert pool.try_acquire({"num_logical_cores": 1}) is None
+    pool.release(alloc)
+
+
+def test_queue_default_resource_pool(tmp_path):
+    # Pool (& machine capacity check) only if job arguments declare resources
+    queue_kwargs = {
+        "resource_to_run": "local",
+        "job_filename": "examples/train.py",
+        "config_filenames": ["examples/base_config_1.yaml"],
+        "experiment_dir": str(tmp_path),
+    }
+    assert MLEQueue(**queue_kwargs, job_arguments={}).resource_pool is None
+    queue = MLEQueue(**queue_kwargs, job_arguments={"num_logical_cores": 1})
+    assert isinstance(queue.resource_pool, LocalResourcePool)
+
+
+def test_gpu_device_assignment(tmp_path):
+    # Simulated devices - jobs only see their assigned GPUs
+    pool = LocalResourcePool(num_cores=8, gpu_devices=[0, 1, 2])
+    script = tmp_path / "gpu.py"
+    script.write_text("import os; print(os.environ['CUDA_VISIBLE_DEVICES'])")
+    jobs = [
+        MLEJob(
+            resource_to_run="local",
+            job_filename=str(script),
+            job_arguments={"num_gpus": num_gpus},
+            resource_pool=pool,
+        )
+        for num_gpus in [2, 0.5, 0.5]
+    ]
+    procs = [job.schedule() for job in jobs]
+    assert [job.resources["devices"] for job in jobs] == [["0", "1"], ["2"], ["2"]]
+    assert pool.try_acquire({"num_gpus": 1}) is None
+    for job, proc in zip(jobs, procs):
+        assert job.monitor(proc, continuous=True) == 0
+    assert proc.communicate()[0].strip() == b"2"
+    # Devices are released once monitor sees the jobs exit
+    assert pool.gpu_load == {"0": 0, "1": 0, "2": 0}
+
+
+def test_cpu_pinning(tmp_path):
+    # Disjoint cores per job - best fitting NUMA node first
+    pool = LocalResourcePool(num_cores=8, num_gpus=0, cpu_ids=list(range(8)))
+    pool.numa_nodes = [[0, 1, 2, 3], [4, 5, 6, 7]]
+    cpus = [
+        pool.try_acquire({"num_logical_cores": n, "pin_cpus": True})["cpus"]
+        for n in [3, 2, 1]
+    ]
+    assert cpus == [[0, 1, 2], [4, 5], [3]]
+
+    # Job is pinned before exec & BLAS/OpenMP threads limited to its cores
+    script = tmp_path / "pinned.py"
+    script.write_text(
+        "import os; print(os.environ['OMP_NUM_THREADS'], os.sched_getaffinity(0))"
+    )
+    job = MLEJob(
+        resource_to_run="local",
+        job_filename=str(script),
+        job_arguments={"num_logical_cores": 1, "pin_cpus": True},
+        resource_pool=LocalResourcePool(),
+    )
+    proc = job.schedule()
+    cpu_id = job.resources["cpus"][0]
+    assert job.monitor(proc, continuous=True) == 0
+    assert proc.communicate()[0].decode().split() == ["1", "{%d}" % cpu_id]
+
+    # Threads are only limited if cores are declared explicitly
+    job = MLEJob(
+        resource_to_run="local",
+        job_filename=str(script),
+        job_arguments={"memory_per_job": 100},
+        resource_pool=LocalResourcePool(),
+    )
+    job.resources = job.resource_pool.acquire(job.job_arguments)
+    assert "OMP_NUM_THREADS" not in job.get_env_vars()
+    job.resource_pool.release(job.resources)
+
+
+def test_resource_sampling(tmp_path):
+    # Job allocates ~100MB & burns CPU for a bit
+    script = tmp_path / "hungry.py"
+    script.write_text(
+        "import time\nx = bytearray(100 * 1024 ** 2)\nt = time.time()\n"
+        "while time.time() - t < 0.5: pass\n"
+    )
+    queue = MLEQueue(
+        resource_to_run="local",
+        job_filename=str(script),
+        config_filenames=["examples/base_config_1.yaml"],
+        experiment_dir=str(tmp_path / "logs"),
+        job_arguments={"resource_sample_interval": 0.05},
+    )
+    queue.run()
+    stats = queue.queue[0]["resource_stats"]
+    assert stats["peak_rss_mb"] > 90
+    assert stats["mean_rss_mb"] <= stats["peak_rss_mb"]
+    assert stats["cpu_time"] > 0.2
+    assert len(queue.queue[0]["resource_usage"]["rss_mb"]) > 5
+
+
+def test_process_tree(monkeypatch):
+    # Tree is walked via children files or one (shared) scan of /proc
+    proc = subprocess.Popen(["bash", "-c", "sleep 1 & sleep 1 & wait"])
+    time.sleep(0.2)
+    tree = sampler_local.process_tree(proc.pid)
+    monkeypatch.setattr(sampler_local, "HAS_PROC_CHILDREN", False)
+    assert sorted(sampler_local.process_tree(proc.pid)) == sorted(tree)
+    assert len(tree) == 3
+    proc.wait()
+
+
+def evaluate(experiment_dir: str, config_fname: str, seed_id: int, lrate: float):
+    """Lightweight 'evaluation' run on the process pool."""
+    return {"seed_id": seed_id, "lrate": lrate, "pid": os.getpid()}
+
+
+def test_queue_callable():
+    # Callable jobs run on pool - worker recycled after each task
+    queue = MLEQueue(
+        resource_to_run="local",
+        job_filename=evaluate,
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 1, 2],
+        experiment_dir="logs_callable",
+        job_arguments={
+            "pool_workers": 1,
+            "pool_max_tasks_per_child": 1,
+            "extra_cmd_line_input": {"lrate": 0.1},
+        },
+    )
+    queue.run()
+    results = [job["result"] for job in queue.queue]
+    assert [r["seed_id"] for r in results] == [0, 1, 2]
+    assert all(r["lrate"] == 0.1 for r in results)
+    assert len(set(r["pid"] for r in results)) == 3
+
+
+def test_callable_remote():
+    # Callables can't be shipped to remote backends
+    try:
+        MLEQueue(
+            resource_to_run="slurm-cluster",
+            job_filename=evaluate,
+            config_filenames=["examples/base_config_1.yaml"],
+        )
+        assert False, "Callable job accepted for Slurm queue"
+    except ValueError:
+        pass
+
+
+def test_queue_spill_completed():
+    # Completed entries are moved to the journal - only active ones are kept
+    queue = MLEQueue(
+        resource_to_run="local",
+        job_filename=evaluate,
+        job_specs=(("examples/base_config_1.yaml", s) for s in range(6)),
+        max_running_jobs=2,
+        experiment_dir="logs_spill",
+        job_arguments={"extra_cmd_line_input": {"lrate": 0.1}},
+        use_journal=True,
+        spill_completed=True,
+    )
+    num_active = []
+    step = queue.step
+
+    def tracked_step():
+        num_active.append(len(queue.queue))
+        return step()
+
+    queue.step = tracked_step
+    queue.run(show_progress=False)
+    assert len(queue.queue) == 0 and max(num_active) <= 2
+    assert queue.num_completed_jobs == 6
+    results = queue.get_results()
+    assert [results[i]["seed_id"] for i in range(6)] == list(range(6))
+    assert all(out["exit_code"] == 0 for out in queue.load_outputs().values())
+    shutil.rmtree("logs_spill")
+
+
+def test_job_close_process(tmp_path):
+    # Pipes & output tails of finished local process are released
+    job = MLEJob(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filename="examples/base_config_1.yaml",
+        experiment_dir=str(tmp_path),
+        seed_id=0,
+        job_arguments={},
+    )
+    job_id = job.schedule()
+    assert job.monitor(job_id, continuous=True) == 0
+    assert job_id.returncode == 0 and job_id.streamers == []
+    assert job_id.stdout.closed and job_id.stderr.closed
+
+
+def test_forkserver_preload_change(tmp_path):
+    # Jobs with another preload set run next to each other on own servers
+    script = tmp_path / "sleep.py"
+    script.write_text("import time; time.sleep(2)")
+    procs = []
+    for preload_modules in [["json"], ["csv"]]:
+        job = MLEJob(
+            resource_to_run="local",
+            job_filename=str(script),
+            job_arguments={"use_forkserver": True, "preload_modules": preload_modules},
+        )
+        procs.append((job, job.schedule()))
+    assert get_forkserver(["json"]) is not get_forkserver(["csv"])
+    for job, proc in procs:
+        assert job.monitor(proc, continuous=True) == 0
@@ -1,6 +1,9 @@
 import os
 import shutil
-from mle_scheduler import MLEJob, MLEQueue
+import asyncio
+from mle_scheduler import MLEJob, MLEQueue, AsyncMLEQueue
+from mle_scheduler.local import LocalResourcePool
+from mle_scheduler.queue_entry import QueueEntry
 
 # Only test this locally! For remote - have to run example `run_XXX.py` manually
 
@@ -115,3 +118,308 @@ def test_automerge_configs():
     )
     shutil.rmtree("logs_merge")
     return
+
+
+def test_job_forkserver():
+    # Fork job from warm forkserver w. pre-imported logging module
+    job = MLEJob(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filename="examples/base_config_1.yaml",
+        experiment_dir="logs_forkserver",
+        job_arguments={"use_forkserver": True, "preload_modules": ["mle_logging"]},
+    )
+    job.run()
+
+    # Check existence of expected files
+    assert os.path.exists(
+        os.path.join("logs_forkserver", "base_config_1", "logs/log_seed_1.hdf5")
+    )
+    shutil.rmtree("logs_forkserver")
+    return
+
+
+def test_queue_seeds_per_job():
+    # 3 seeds of one config run by 2 processes (-seeds 0,1 & -seeds 2)
+    queue = MLEQueue(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 1, 2],
+        seeds_per_job=2,
+        experiment_dir="logs_seeds_per_job",
+        job_arguments={},
+    )
+    assert queue.num_total_jobs == 2
+    assert [job["seed_ids"] for job in queue.queue] == [[0, 1], [2]]
+    queue.run()
+    assert "-seeds 0,1" in queue.queue[0]["job"].cmd_line_args
+
+    # Per-seed logs are written as usual & can be merged
+    for seed_id in [0, 1, 2]:
+        assert os.path.exists(
+            os.path.join(
+                "logs_seeds_per_job", f"base_config_1/logs/log_seed_{seed_id}.hdf5"
+            )
+        )
+    queue.merge_seeds(os.path.join("logs_seeds_per_job", "base_config_1"))
+    assert os.path.exists(
+        os.path.join("logs_seeds_per_job", "base_config_1/logs/log.hdf5")
+    )
+    shutil.rmtree("logs_seeds_per_job")
+    return
+
+
+def test_queue_resume():
+    # Journal records completed jobs - resumed queue only runs the rest
+    queue_args = dict(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 1],
+        experiment_dir="logs_queue_resume",
+        job_arguments={},
+        use_journal=True,
+    )
+    queue = MLEQueue(**queue_args)
+    queue.run()
+    # Database is released once all jobs completed - reopened on access
+    assert queue.journal._conn is None
+    journal = queue.journal.load()
+    assert [entry["status"] for entry in journal.values()] == [0, 0]
+
+    # Simulate an interruption after the second job completed
+    queue.journal.update(0, "examples/base_config_1.yaml", 0, -1)
+    queue = MLEQueue(**queue_args, resume=True)
+    assert queue.num_completed_jobs == 1
+    assert queue.num_pending == 1 and queue.queue_counter == 0
+    queue.run()
+    # Queue order is kept - only the interrupted job is rerun
+    assert queue.queue[0]["seed_id"] == 0 and queue.queue[0]["status"] == 0
+    assert queue.queue[1]["job"] is None
+    assert all(e["status"] == 0 for e in queue.journal.load().values())
+    shutil.rmtree("logs_queue_resume")
+    return
+
+
+def test_queue_journal_duplicate_specs():
+    # Duplicate (config, seed) specs are journaled & resumed separately
+    queue_args = dict(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 0],
+        experiment_dir="logs_journal_duplicates",
+        job_arguments={},
+        use_journal=True,
+    )
+    queue = MLEQueue(**queue_args)
+    assert len(queue.journal.load()) == 2
+    queue.journal.update(1, "examples/base_config_1.yaml", 0, 0)
+    queue = MLEQueue(**queue_args, resume=True)
+    assert queue.num_completed_jobs == 1 and queue.num_pending == 1
+    assert [e["status"] for e in queue.queue] == [-1, 0]
+    queue.journal.close()
+    shutil.rmtree("logs_journal_duplicates")
+    return
+
+
+def test_queue_launch_concurrency():
+    # Wave of 3 jobs is submitted by 3 threads - bookkept in queue order
+    queue = MLEQueue(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 1, 2],
+        experiment_dir="logs_launch_concurrency",
+        job_arguments={},
+        launch_concurrency=3,
+        resource_pool=LocalResourcePool(num_cores=3),
+    )
+    queue.launch_wave(3)
+    assert queue.num_running_jobs == 3 and queue.queue_counter == 3
+    for job in queue.queue:
+        assert job["job"].seed_id == job["seed_id"]
+    queue.run()
+    assert queue.num_completed_jobs == 3
+    shutil.rmtree("logs_launch_concurrency")
+    return
+
+
+def test_async_queue():
+    # All jobs are asyncio subprocesses driven by one event loop
+    queue = AsyncMLEQueue(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 1, 2],
+        max_running_jobs=2,
+        experiment_dir="logs_async",
+        job_arguments={},
+        resource_pool=LocalResourcePool(num_cores=2),
+    )
+    asyncio.run(queue.run())
+    assert queue.num_completed_jobs == 3 and queue.num_running_jobs == 0
+    assert all(job["job"].job_id.returncode == 0 for job in queue.queue)
+    assert os.path.exists(
+        os.path.join("logs_async", "base_config_1/logs/log_seed_2.hdf5")
+    )
+    shutil.rmtree("logs_async")
+    return
+
+
+def test_async_queue_forkserver():
+    # Forkserver jobs & resource sampling go through blocking launch path
+    queue = AsyncMLEQueue(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 1],
+        experiment_dir="logs_async_forkserver",
+        job_arguments={
+            "use_forkserver": True,
+            "preload_modules": ["mle_logging"],
+            "resource_sample_interval": 0.1,
+        },
+    )
+    asyncio.run(queue.run())
+    assert [job["exit_code"] for job in queue.queue] == [0, 0]
+    assert all(job["resource_stats"]["peak_rss_mb"] > 0 for job in queue.queue)
+    shutil.rmtree("logs_async_forkserver")
+    return
+
+
+def test_async_queue_job_specs():
+    # Streamed specs & added jobs are pulled as slots free up
+    queue = AsyncMLEQueue(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        job_specs=(("examples/base_config_1.yaml", s) for s in range(2)),
+        max_running_jobs=1,
+        experiment_dir="logs_async_specs",
+        job_arguments={},
+        check_interval=0.1,
+    )
+    queue.add_jobs([("examples/base_config_2.yaml", 0)])
+    asyncio.run(queue.run())
+    assert queue.num_completed_jobs == queue.num_total_jobs == 3
+    assert queue.running == {} and queue.closed
+    shutil.rmtree("logs_async_specs")
+    return
+
+
+def test_job_submit():
+    # Non-blocking submission returns future-like handle
+    job = MLEJob(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filename="examples/base_config_1.yaml",
+        experiment_dir="logs_submit",
+        seed_id=0,
+        job_arguments={},
+    )
+    handle = job.submit()
+    assert handle.result(timeout=60) == 0
+    assert handle.done() and not handle.cancel()
+    shutil.rmtree("logs_submit")
+    return
+
+
+def test_queue_as_completed():
+    # Entries are yielded as soon as their job finished
+    queue = MLEQueue(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 1, 2],
+        experiment_dir="logs_as_completed",
+        job_arguments={},
+    )
+    done, not_done = queue.wait(return_when="FIRST_COMPLETED")
+    assert len(done) >= 1 and len(done) + len(not_done) == 3
+
+    # Already completed jobs are returned w/o driving the queue
+    def step():
+        raise AssertionError("Queue stepped although jobs completed")
+
+    queue.step = step
+    assert queue.wait(return_when="FIRST_COMPLETED")[0] == done
+    del queue.step
+    completed = [job["seed_id"] for job in queue.as_completed(timeout=120)]
+    assert sorted(completed) == [0, 1, 2]
+    assert all(job["exit_code"] == 0 for job in queue.queue)
+    shutil.rmtree("logs_as_completed")
+    return
+
+
+def test_queue_background():
+    # Scheduling loop runs in a thread while status can be inspected
+    queue = MLEQueue(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        config_filenames=["examples/base_config_1.yaml"],
+        random_seeds=[0, 1],
+        experiment_dir="logs_background",
+        job_arguments={},
+    )
+    thread = queue.run(show_progress=False, background=True)
+    assert thread.is_alive() and queue.is_running
+    status = queue.get_status()
+    assert status["total"] == 2 and status["completed"] <= 2
+    queue.join(timeout=120)
+    assert not queue.is_running
+    assert queue.get_status()["completed"] == 2
+    assert sorted(queue.get_results().keys()) == [0, 1]
+    shutil.rmtree("logs_background")
+    return
+
+
+def test_queue_job_specs():
+    # Specs are pulled lazily as slots free up & can be added while running
+    pulled = []
+
+    def job_specs():
+        for seed_id in range(3):
+            pulled.append(seed_id)
+            yield "examples/base_config_1.yaml", seed_id
+
+    queue = MLEQueue(
+        resource_to_run="local",
+        job_filename="examples/train.py",
+        job_specs=job_specs(),
+        max_running_jobs=1,
+        experiment_dir="logs_job_specs",
+        job_arguments={},
+    )
+    assert len(queue.queue) == 0 and len(pulled) == 0
+    queue.submit()
+    assert len(queue.queue) == 1 and pulled == [0]
+    # Ticks only check the running jobs
+    assert list(queue.running) == [0]
+    queue.add_jobs([("examples/base_config_2.yaml", 0)])
+    queue.run(show_progress=False)
+    assert queue.num_completed_jobs == queue.num_total_jobs == 4
+    assert queue.mle_run_ids == ["base_config_1", "base_config_2"]
+    try:
+        queue.add_jobs([("examples/base_config_2.yaml", 1)])
+        assert False, "Completed queue accepted new jobs"
+    except RuntimeError:
+        pass
+    shutil.rmtree("logs_job_specs")
+    return
+
+
+def test_queue_entry():
+    # Slot records support the dict-style access of queue entries
+    entry = QueueEntry("configs/base_config_1.yaml", [0, 1], "logs/base_config_1")
+    assert entry["base_str"] == "base_config_1"
+    assert entry["seed_ids"] == [0, 1] and entry["status"] == -1
+    entry.update(status=1, job_id=3)
+    entry["exit_code"] = 0
+    assert entry.get("job_id") == 3 and entry.get("unknown", 5) == 5
+    try:
+        entry["unknown"] = 1
+        assert False, "Unknown key was set"
+    except KeyError:
+        pass
+    return